@@ -0,0 +1,83 @@
+"""
+Benchmark of SSD selection: substring scan per manufacturer vs compiled matcher
+Uses a synthetic catalogue, e.g. python ssdbench.py --models 1000000 --aliases 3 300 3000
+"""
+
+import argparse
+import random
+import string
+import time
+from typing import List, Tuple
+
+from ssdtest import ManufacturerMatcher, solve
+
+
+def solve_scan(models: list, available: list, manufacturers: list) -> Tuple[List[str], int]:
+    """Previous implementation: every manufacturer is searched in every model"""
+    repair_count = 0
+    ssds = []
+    for model, avail in zip(models, available):
+        if avail == 1:
+            if any(manuf in model for manuf in manufacturers):
+                ssds.append(model)
+                repair_count += 1
+    return ssds, repair_count
+
+
+def make_catalogue(models_count: int, aliases_count: int, seed: int = 0) -> Tuple[list, list, list]:
+    """Listings like '480 ГБ 2.5" SATA накопитель <Brand> <series>'; about a tenth of brands are searched"""
+    rng = random.Random(seed)
+    brands = list(dict.fromkeys(
+        "".join(rng.choice(string.ascii_letters) for _ in range(rng.randint(3, 10)))
+        for _ in range(aliases_count * 10)))
+    models = [f'{rng.choice((240, 256, 480, 500, 960, 1000))} ГБ 2.5" SATA накопитель '
+              f'{rng.choice(brands)} {rng.choice(string.ascii_uppercase)}{rng.randint(100, 999)}'
+              for _ in range(models_count)]
+    available = [rng.randint(0, 1) for _ in range(models_count)]
+    return models, available, rng.sample(brands, aliases_count)
+
+
+def _timed(call) -> Tuple[float, object]:
+    start = time.perf_counter()
+    result = call()
+    return time.perf_counter() - start, result
+
+
+def benchmark_solve(models_count: int = 200000, aliases: Tuple[int, ...] = (3, 30, 300, 3000),
+                    scan_limit: float = 30.0):
+    """Time both implementations per alias count; scan skipped once it would take over scan_limit seconds"""
+    print(f"\n🔍 SSD selection, {models_count} listings")
+    print(f"  {'aliases':>8} {'scan':>10} {'matcher':>10} {'compile':>9} {'speedup':>8}")
+    for aliases_count in aliases:
+        models, available, manufacturers = make_catalogue(models_count, aliases_count)
+        compile_seconds, matcher = _timed(lambda: ManufacturerMatcher(manufacturers))
+        matcher_seconds, result = _timed(lambda: solve(models, available, matcher))
+
+        sample = max(1, models_count // 100)
+        sample_seconds, _ = _timed(lambda: solve_scan(models[:sample], available[:sample], manufacturers))
+        if sample_seconds * models_count / sample > scan_limit:
+            scan_seconds = sample_seconds * models_count / sample
+            scan_label = f"~{scan_seconds:8.2f}s"
+        else:
+            scan_seconds, expected = _timed(lambda: solve_scan(models, available, manufacturers))
+            assert result == expected, "matcher disagrees with substring scan"
+            scan_label = f"{scan_seconds:9.2f}s"
+        print(f"  {aliases_count:>8} {scan_label} {matcher_seconds:9.2f}s {compile_seconds * 1000:7.1f}ms "
+              f"{scan_seconds / matcher_seconds:7.1f}x")
+
+
+def run_benchmarks(argv: List[str] = None):
+    """Execute all benchmarks"""
+    parser = argparse.ArgumentParser(description="Benchmark SSD selection matchers")
+    parser.add_argument("--models", type=int, default=200000)
+    parser.add_argument("--aliases", type=int, nargs="+", default=[3, 30, 300, 3000])
+    parser.add_argument("--scan-limit", type=float, default=30.0,
+                        help="extrapolate scan from 1%% sample when full run would exceed this many seconds")
+    args = parser.parse_args(argv)
+    print("⏱  SSD SELECTION BENCHMARKS")
+    print("=" * 60)
+    benchmark_solve(args.models, tuple(args.aliases), args.scan_limit)
+
+
+if __name__ == '__main__':
+    run_benchmarks()
@@ -1,24 +1,114 @@
 import pytest
-from typing import List, Tuple
+import random
+from collections import deque
+from typing import Iterable, List, Tuple, Union
 
 
-def solve(models: list, available: list, manufacturers: list) -> Tuple[List[str], int]:
+class ManufacturerMatcher:
+    """
+    Check whether a model name contains any of the manufacturer names.
+
+    The names are compiled once into an Aho-Corasick automaton, so each model
+    is scanned in a single pass whatever the number of names. Semantics are
+    those of `any(manuf in model for manuf in manufacturers)`: case-sensitive
+    substrings, and an empty name matches every model. Short lists are
+    checked with plain `in`, which is faster below `SCAN_THRESHOLD` names.
+    """
+
+    SCAN_THRESHOLD = 48
+
+    def __init__(self, manufacturers: Iterable[str]):
+        self.patterns = list(dict.fromkeys(manufacturers))
+        self._transitions = None
+        if len(self.patterns) >= self.SCAN_THRESHOLD:
+            self._compile()
+
+    def _compile(self):
+        """Build trie, failure links and accepting states"""
+        for pattern in self.patterns:
+            if not isinstance(pattern, str):
+                raise TypeError(f"manufacturer must be str, not {type(pattern).__name__}")
+        goto = [{}]
+        accepting = [False]
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    accepting.append(False)
+                state = next_state
+            accepting[state] = True
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                accepting[next_state] = accepting[next_state] or accepting[fail[next_state]]
+                queue.append(next_state)
+
+        self._fail = fail
+        self._accepting = accepting
+        self._transitions = goto  # Grows into a DFA as failure moves get cached
+
+    def _move(self, state: int, char: str) -> int:
+        """Follow failure links for a transition missing from the cache"""
+        next_state = 0
+        if state:
+            fallback = self._fail[state]
+            next_state = self._transitions[fallback].get(char)
+            if next_state is None:
+                next_state = self._move(fallback, char)
+        self._transitions[state][char] = next_state
+        return next_state
+
+    def matches(self, model: str) -> bool:
+        """True if model contains at least one manufacturer name"""
+        if self._transitions is None or not isinstance(model, str):
+            return any(manuf in model for manuf in self.patterns)
+        accepting = self._accepting
+        if accepting[0]:
+            return True
+        transitions = self._transitions
+        state = 0
+        for char in model:
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                next_state = self._move(state, char)
+            if accepting[next_state]:
+                return True
+            state = next_state
+        return False
+
+
+def solve(models: list, available: list,
+          manufacturers: Union[list, ManufacturerMatcher]) -> Tuple[List[str], int]:
     """
     Select SSD drives for repair based on availability and manufacturer criteria.
 
     Args:
         models: List of SSD model names
         available: List of availability flags (1 - available, 0 - not available)
-        manufacturers: List of manufacturer names to filter by
+        manufacturers: List of manufacturer names to filter by, or a matcher
+            compiled from it to reuse across calls
 
     Returns:
         Tuple of (selected_ssds, repair_count)
     """
+    if not isinstance(manufacturers, ManufacturerMatcher):
+        manufacturers = ManufacturerMatcher(manufacturers)
     repair_count = 0
     ssds = []
     for model, avail in zip(models, available):
         if avail == 1:
-            if any(manuf in model for manuf in manufacturers):
+            if manufacturers.matches(model):
                 ssds.append(model)
                 repair_count += 1
     return ssds, repair_count
@@ -293,6 +383,59 @@ class TestParametrizedSSDSelection:
         assert isinstance(result[1], int)
 
 
+# MATCHER TESTS
+class TestManufacturerMatcher:
+    """Tests for compiled multi-manufacturer matcher"""
+
+    @pytest.fixture
+    def aliases(self):
+        """Enough names to use the automaton"""
+        return ['he', 'she', 'his', 'hers'] + [f'Vendor{i}' for i in range(ManufacturerMatcher.SCAN_THRESHOLD)]
+
+    @pytest.mark.parametrize("model, expected", [
+        ('ushers', True),
+        ('ahishers', True),
+        ('hi', False),
+        ('xVendor7y', True),
+        ('Vendor', False),
+        ('', False),
+    ])
+    def test_overlapping_names(self, aliases, model, expected):
+        """Test names that are prefixes and suffixes of each other"""
+        matcher = ManufacturerMatcher(aliases)
+        assert matcher._transitions is not None
+        assert matcher.matches(model) is expected
+
+    def test_agrees_with_substring_scan(self):
+        """Test automaton against `in` on random names and models"""
+        rng = random.Random(0)
+        for trial in range(300):
+            names = [''.join(rng.choice('abc ') for _ in range(rng.randint(1, 4)))
+                     for _ in range(ManufacturerMatcher.SCAN_THRESHOLD + rng.randint(0, 10))]
+            if trial % 10 == 0:
+                names.append('')
+            matcher = ManufacturerMatcher(names)
+            for _ in range(10):
+                model = ''.join(rng.choice('abcd ') for _ in range(rng.randint(0, 12)))
+                assert matcher.matches(model) == any(name in model for name in names), (names, model)
+
+    def test_compiled_matcher_reused_by_solve(self, sample_models, sample_available, aliases):
+        """Test passing compiled matcher instead of list"""
+        matcher = ManufacturerMatcher(aliases + ['Samsung', 'WD'])
+        assert solve(sample_models, sample_available, matcher) == solve(sample_models, sample_available,
+                                                                        aliases + ['Samsung', 'WD'])
+        assert solve(sample_models, sample_available, matcher)[1] == 2
+
+    def test_large_list_keeps_edge_cases(self, aliases):
+        """Test empty name, case sensitivity and None with many names"""
+        assert solve(['x', ''], [1, 1], aliases + ['']) == (['x', ''], 2)
+        assert solve(['vendor1 SSD'], [1], aliases) == ([], 0)
+        with pytest.raises(TypeError):
+            solve([None], [1], aliases)
+        with pytest.raises(TypeError):
+            ManufacturerMatcher(aliases + [None])
+
+
 # FIXTURE-BASED PARAMETRIZED TESTS
 @pytest.fixture(params=[
     # (models, available, manufacturers, expected_description, expected_result)
@@ -1,12 +1,100 @@
+import random
 import unittest
+from collections import deque
+from typing import Iterable
+
+
+class ManufacturerMatcher:
+    """Проверка вхождения любого из производителей в название модели
+
+    Список компилируется один раз в автомат Ахо-Корасик, и каждая модель
+    просматривается за один проход. Семантика как у
+    `any(manuf in model for manuf in manufacturers)`: подстрока с учётом
+    регистра, пустая строка совпадает с любой моделью. Короткие списки
+    (меньше `SCAN_THRESHOLD`) проверяются обычным `in` - так быстрее.
+    """
+
+    SCAN_THRESHOLD = 48
+
+    def __init__(self, manufacturers: Iterable[str]):
+        self.patterns = list(dict.fromkeys(manufacturers))
+        self._transitions = None
+        if len(self.patterns) >= self.SCAN_THRESHOLD:
+            self._compile()
+
+    def _compile(self):
+        """Построение бора, суффиксных ссылок и допускающих состояний"""
+        for pattern in self.patterns:
+            if not isinstance(pattern, str):
+                raise TypeError(f"manufacturer must be str, not {type(pattern).__name__}")
+        goto = [{}]
+        accepting = [False]
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    accepting.append(False)
+                state = next_state
+            accepting[state] = True
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                fallback = fail[state]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[next_state] = goto[fallback].get(char, 0)
+                accepting[next_state] = accepting[next_state] or accepting[fail[next_state]]
+                queue.append(next_state)
+
+        self._fail = fail
+        self._accepting = accepting
+        self._transitions = goto  # Переходы по суффиксным ссылкам кэшируются
+
+    def _move(self, state: int, char: str) -> int:
+        """Переход по суффиксным ссылкам для символа, которого нет в кэше"""
+        next_state = 0
+        if state:
+            fallback = self._fail[state]
+            next_state = self._transitions[fallback].get(char)
+            if next_state is None:
+                next_state = self._move(fallback, char)
+        self._transitions[state][char] = next_state
+        return next_state
+
+    def matches(self, model: str) -> bool:
+        """True, если модель содержит хотя бы одного производителя"""
+        if self._transitions is None or not isinstance(model, str):
+            return any(manuf in model for manuf in self.patterns)
+        accepting = self._accepting
+        if accepting[0]:
+            return True
+        transitions = self._transitions
+        state = 0
+        for char in model:
+            next_state = transitions[state].get(char)
+            if next_state is None:
+                next_state = self._move(state, char)
+            if accepting[next_state]:
+                return True
+            state = next_state
+        return False
 
 
 def solve(models: list, available: list, manufacturers: list):
+    if not isinstance(manufacturers, ManufacturerMatcher):
+        manufacturers = ManufacturerMatcher(manufacturers)
     repair_count = 0
     ssds = []
     for model, avail in zip(models, available):
         if avail == 1:
-            if any(manuf in model for manuf in manufacturers):
+            if manufacturers.matches(model):
                 ssds.append(model)
                 repair_count += 1
     return ssds, repair_count
@@ -135,6 +223,43 @@ class TestSSDSelection(unittest.TestCase):
         self.assertEqual(result, expected)
 
 
+class TestManufacturerMatcher(unittest.TestCase):
+
+    def setUp(self):
+        """Список производителей, достаточный для автомата"""
+        self.aliases = ['he', 'she', 'his', 'hers'] + [f'Vendor{i}' for i in range(ManufacturerMatcher.SCAN_THRESHOLD)]
+
+    def test_overlapping_names(self):
+        """Тестирование вложенных и перекрывающихся имён"""
+        matcher = ManufacturerMatcher(self.aliases)
+        self.assertIsNotNone(matcher._transitions)
+        for model, expected in [('ushers', True), ('ahishers', True), ('hi', False),
+                                ('xVendor7y', True), ('Vendor', False), ('', False)]:
+            with self.subTest(model=model):
+                self.assertIs(matcher.matches(model), expected)
+
+    def test_agrees_with_substring_scan(self):
+        """Сравнение автомата с поиском подстроки на случайных данных"""
+        rng = random.Random(1)
+        for trial in range(300):
+            names = [''.join(rng.choice('abc ') for _ in range(rng.randint(1, 4)))
+                     for _ in range(ManufacturerMatcher.SCAN_THRESHOLD + rng.randint(0, 10))]
+            if trial % 10 == 0:
+                names.append('')
+            matcher = ManufacturerMatcher(names)
+            for _ in range(10):
+                model = ''.join(rng.choice('abcd ') for _ in range(rng.randint(0, 12)))
+                self.assertEqual(matcher.matches(model), any(name in model for name in names), (names, model))
+
+    def test_large_list_keeps_edge_cases(self):
+        """Пустая строка, регистр и None при большом списке"""
+        matcher = ManufacturerMatcher(self.aliases + ['Samsung', 'WD'])
+        self.assertEqual(solve(['Samsung SSD', 'samsung SSD', 'WD'], [1, 1, 1], matcher), (['Samsung SSD', 'WD'], 2))
+        self.assertEqual(solve(['x', ''], [1, 1], self.aliases + ['']), (['x', ''], 2))
+        with self.assertRaises(TypeError):
+            solve([None], [1], self.aliases)
+
+
 # Параметризованные тесты с использованием subTest
 class TestSSDParameterized(unittest.TestCase):
 
@@ -3,59 +3,36 @@ Unit tests for Yandex.Disk REST API
 Test suite for folder creation functionality
 """
 
+import asyncio
+import hashlib
+import json
+import mmap
 import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
 from unittest.mock import patch, Mock
 import requests
+from requests.adapters import HTTPAdapter
 import time
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Optional, Tuple
 
-
-class YandexDiskAPIClient:
-    """Client for Yandex.Disk API operations"""
-
-    def __init__(self, token: str, base_url: str = "https://cloud-api.yandex.net/v1/disk/resources"):
-        self.base_url = base_url
-        self.headers = {
-            "Authorization": f"OAuth {token}",
-            "Content-Type": "application/json"
-        }
-
-    def create_folder(self, path: str, timeout: int = 30) -> requests.Response:
-        """Create folder on Yandex.Disk"""
-        return requests.put(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def get_folder_info(self, path: str, timeout: int = 30) -> requests.Response:
-        """Get folder information"""
-        return requests.get(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def delete_folder(self, path: str, timeout: int = 30) -> requests.Response:
-        """Delete folder from Yandex.Disk"""
-        return requests.delete(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def list_files(self, limit: int = 20, offset: int = 0, timeout: int = 30) -> requests.Response:
-        """List files on Yandex.Disk"""
-        return requests.get(
-            f"{self.base_url}/files",
-            headers=self.headers,
-            params={"limit": limit, "offset": offset},
-            timeout=timeout
-        )
+import yandex2taskclient
+from yandex2taskclient import (
+    ApiError, AsyncYandexDiskAPIClient, CircuitBreaker, CircuitOpenError, FileItem, LatencyHistogram, Link,
+    ListingIndex, MetadataCache, OperationJournal, OperationPoller, RateLimiter, RequestEvent, RequestMetrics,
+    Resource, ResourceList, RetryPolicy, SingleFlight, TreeSync, YandexDiskAPIClient,
+    YandexDiskErrorCodes, decode_file_items, file_item_type, parse_response,
+    _MappedReader, _folder_levels,
+)
 
 
 class TestYandexDiskAPIMocked(unittest.TestCase):
@@ -79,7 +56,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
 
     # POSITIVE TEST CASES
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_success_201(self, mock_put):
         """Should return 201 when folder is successfully created"""
         # Arrange
@@ -103,7 +80,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
             timeout=30
         )
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_already_exists_409(self, mock_put):
         """Should return 409 when folder already exists"""
         # Arrange
@@ -121,8 +98,8 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         self.assertEqual(response.status_code, 409)
         self.assertEqual(response.json()["error"], "DiskPathPointsToExistentDirectoryError")
 
-    @patch.object(requests, 'get')
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'get')
+    @patch.object(requests.Session, 'put')
     def test_folder_appears_in_list_after_creation(self, mock_put, mock_get):
         """Should find created folder in files list"""
         # Arrange
@@ -158,7 +135,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
 
     # NEGATIVE TEST CASES
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_unauthorized_401(self, mock_put):
         """Should return 401 with invalid token"""
         # Arrange
@@ -176,7 +153,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         self.assertEqual(response.status_code, 401)
         self.assertEqual(response.json()["error"], "UnauthorizedError")
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_bad_request_400(self, mock_put):
         """Should return 400 with invalid path"""
         # Arrange
@@ -194,7 +171,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         self.assertEqual(response.status_code, 400)
         self.assertEqual(response.json()["error"], "FieldValidationError")
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_forbidden_403(self, mock_put):
         """Should return 403 when API access is forbidden"""
         # Arrange
@@ -212,7 +189,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         self.assertEqual(response.status_code, 403)
         self.assertEqual(response.json()["error"], "TooManyRequestsError")
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_not_found_404(self, mock_put):
         """Should return 404 when parent folder doesn't exist"""
         # Arrange
@@ -230,7 +207,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         self.assertEqual(response.status_code, 404)
         self.assertEqual(response.json()["error"], "DiskNotFoundError")
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_conflict_409_file_exists(self, mock_put):
         """Should return 409 when path points to existing file"""
         # Arrange
@@ -250,7 +227,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
 
     # NETWORK ERROR TESTS
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_connection_error(self, mock_put):
         """Should raise ConnectionError on network issues"""
         # Arrange
@@ -260,7 +237,7 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
         with self.assertRaises(requests.exceptions.ConnectionError):
             self.client.create_folder(self.test_folder_path)
 
-    @patch.object(requests, 'put')
+    @patch.object(requests.Session, 'put')
     def test_create_folder_timeout_error(self, mock_put):
         """Should raise Timeout on request timeout"""
         # Arrange
@@ -271,16 +248,2050 @@ class TestYandexDiskAPIMocked(unittest.TestCase):
             self.client.create_folder(self.test_folder_path, timeout=5)
 
 
+class TestYandexDiskAPIClientSession(unittest.TestCase):
+    """
+    Unit tests for pooled session lifecycle
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+
+    def test_all_methods_reuse_one_session(self):
+        """Should send every request through the same pooled session"""
+        client = YandexDiskAPIClient(self.token)
+
+        with patch.object(requests.Session, 'request') as mock_request:
+            mock_request.return_value = Mock(status_code=200)
+            client.create_folder("/a")
+            client.get_folder_info("/a")
+            client.list_files()
+            client.delete_folder("/a")
+
+        self.assertEqual(mock_request.call_count, 4)
+        self.assertEqual([c[0][0] for c in mock_request.call_args_list], ["PUT", "GET", "GET", "DELETE"])
+
+    def test_pool_configuration(self):
+        """Should mount adapter with requested pool size and retries"""
+        client = YandexDiskAPIClient(self.token, pool_connections=4, pool_maxsize=32, max_retries=3)
+        adapter = client.session.get_adapter(client.base_url)
+
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 32)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIs(client.session.get_adapter("http://localhost"), adapter)
+
+    def test_keep_alive_disabled(self):
+        """Should ask server to close connection when keep-alive is off"""
+        client = YandexDiskAPIClient(self.token, keep_alive=False)
+        self.assertEqual(client.session.headers["Connection"], "close")
+
+    def test_context_manager_closes_session(self):
+        """Should close pooled connections on exit"""
+        with patch.object(requests.Session, 'close') as mock_close:
+            with YandexDiskAPIClient(self.token) as client:
+                self.assertIsInstance(client, YandexDiskAPIClient)
+            mock_close.assert_called_once_with()
+
+
+class TestYandexDiskBulkCreate(unittest.TestCase):
+    """
+    Unit tests for bulk folder creation with mocked API responses
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.existing = set()
+        self.created_order = []
+        self.lock = threading.Lock()
+
+    def _fake_put(self, url, headers, params, timeout):
+        """Emulate API: 404 for missing parent, 409 for existing folder"""
+        path = params["path"]
+        with self.lock:
+            parent = path.rpartition("/")[0]
+            if parent and parent not in self.existing:
+                return Mock(status_code=404, **{"json.return_value": {"error": "DiskNotFoundError"}})
+            if path in self.existing:
+                return Mock(status_code=409, **{"json.return_value": {"error": "DiskPathPointsToExistentDirectoryError"}})
+            self.existing.add(path)
+            self.created_order.append(path)
+            return Mock(status_code=201)
+
+    @patch.object(requests.Session, 'put')
+    def test_creates_parents_first_once(self, mock_put):
+        """Should create every level once, parents before children"""
+        mock_put.side_effect = self._fake_put
+
+        results = self.client.create_folders(["/a/b/c", "/a/b/d", "/a/e", "/f"])
+
+        self.assertEqual(mock_put.call_count, 6)
+        self.assertEqual(set(results), {"/a", "/f", "/a/b", "/a/e", "/a/b/c", "/a/b/d"})
+        self.assertTrue(all(r.status_code == 201 for r in results.values()))
+        self.assertLess(self.created_order.index("/a"), self.created_order.index("/a/b"))
+        self.assertLess(self.created_order.index("/a/b"), self.created_order.index("/a/b/c"))
+
+    @patch.object(requests.Session, 'put')
+    def test_existing_parent_is_reused(self, mock_put):
+        """Should continue below folders that already exist (409)"""
+        self.existing.add("/a")
+        mock_put.side_effect = self._fake_put
+
+        results = self.client.create_folders(["/a/b"])
+
+        self.assertEqual(results["/a"].status_code, 409)
+        self.assertEqual(results["/a/b"].status_code, 201)
+
+    @patch.object(requests.Session, 'put')
+    def test_failed_parent_skips_descendants(self, mock_put):
+        """Should not send children of a folder that points to a file"""
+        def put(url, headers, params, timeout):
+            if params["path"] == "/file":
+                return Mock(status_code=409, **{"json.return_value": {"error": "DiskPathPointsToFileError"}})
+            return self._fake_put(url, headers, params, timeout)
+
+        mock_put.side_effect = put
+
+        results = self.client.create_folders(["/file/child", "/ok/child"])
+
+        self.assertEqual(results["/file"].status_code, 409)
+        self.assertNotIn("/file/child", results)
+        self.assertEqual(results["/ok/child"].status_code, 201)
+
+    def test_folder_levels_dedupes_prefixes(self):
+        """Should group prefixes by depth without duplicates"""
+        levels = _folder_levels(["/a/b/", "a/b/c", "/a//d"])
+        self.assertEqual(levels, [["/a"], ["/a/b", "/a/d"], ["/a/b/c"]])
+
+
+class TestYandexDiskFilesIterator(unittest.TestCase):
+    """
+    Unit tests for auto-paginating files iterator
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.files = [{"path": f"disk:/file_{i}", "name": f"file_{i}", "type": "file"} for i in range(7)]
+
+    def _fake_get(self, url, headers, params, timeout):
+        """Serve slices of self.files like files endpoint"""
+        page = self.files[params["offset"]:params["offset"] + params["limit"]]
+        response = Mock(status_code=200)
+        response.json.return_value = {"items": page, "limit": params["limit"], "offset": params["offset"]}
+        return response
+
+    @patch.object(requests.Session, 'get')
+    def test_walks_all_pages(self, mock_get):
+        """Should yield every item across pages and stop on short page"""
+        mock_get.side_effect = self._fake_get
+
+        items = list(self.client.iter_files(page_size=3))
+
+        self.assertEqual(items, self.files)
+        self.assertEqual([c[1]["params"]["offset"] for c in mock_get.call_args_list], [0, 3, 6])
+
+    @patch.object(requests.Session, 'get')
+    def test_without_prefetch(self, mock_get):
+        """Should give same result when pages are fetched on demand"""
+        mock_get.side_effect = self._fake_get
+
+        items = list(self.client.iter_files(page_size=7, prefetch=False))
+
+        self.assertEqual(items, self.files)
+        self.assertEqual(mock_get.call_count, 2)  # Full page, then empty one
+
+    @patch.object(requests.Session, 'get')
+    def test_fields_projection(self, mock_get):
+        """Should request only selected item fields"""
+        mock_get.side_effect = self._fake_get
+
+        list(self.client.iter_files(page_size=10, fields=("path", "type")))
+
+        self.assertEqual(mock_get.call_args[1]["params"]["fields"], "items.path,items.type")
+
+    @patch.object(requests.Session, 'get')
+    def test_error_page_raises(self, mock_get):
+        """Should raise HTTPError when page request fails"""
+        response = Mock(status_code=401)
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("401 Client Error")
+        mock_get.return_value = response
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            list(self.client.iter_files())
+
+
+class TestRateLimiter(unittest.TestCase):
+    """
+    Unit tests for adaptive rate limiting
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+
+    def _throttled_response(self, status_code: int, retry_after: Optional[str] = None) -> Mock:
+        response = Mock(status_code=status_code, headers={})
+        response.json.return_value = {"error": "TooManyRequestsError"}
+        if retry_after is not None:
+            response.headers["Retry-After"] = retry_after
+        return response
+
+    def test_bucket_limits_rate(self):
+        """Should not hand out tokens faster than configured rate after burst"""
+        limiter = RateLimiter(rate=100, burst=1)
+        started = time.perf_counter()
+        for _ in range(11):
+            limiter.acquire()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+
+    def test_additive_increase_multiplicative_decrease(self):
+        """Should ramp up slowly on success and halve on throttle"""
+        limiter = RateLimiter(rate=10, max_rate=12, increase=10)
+        limiter.on_success()
+        self.assertAlmostEqual(limiter.rate, 11)
+        limiter.on_success()
+        limiter.on_success()
+        self.assertEqual(limiter.rate, 12)
+        limiter.on_throttle()
+        self.assertEqual(limiter.rate, 6)
+
+    def test_rate_never_below_minimum(self):
+        """Should keep rate at min_rate under sustained throttling"""
+        limiter = RateLimiter(rate=1, min_rate=0.5)
+        for _ in range(5):
+            limiter.on_throttle()
+        self.assertEqual(limiter.rate, 0.5)
+
+    def test_retry_after_pauses_bucket(self):
+        """Should wait for Retry-After before next token"""
+        limiter = RateLimiter(rate=1000)
+        limiter.on_throttle(retry_after=0.1)
+        started = time.perf_counter()
+        limiter.acquire()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+
+    @patch.object(requests.Session, 'put')
+    def test_client_resends_throttled_request(self, mock_put):
+        """Should back off on 429 and 403 TooManyRequestsError, then succeed"""
+        mock_put.side_effect = [
+            self._throttled_response(429, retry_after="0"),
+            self._throttled_response(403),
+            Mock(status_code=201),
+        ]
+        limiter = RateLimiter(rate=1000, decrease=0.5)
+        client = YandexDiskAPIClient(self.token, rate_limiter=limiter)
+
+        response = client.create_folder("/test_folder")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mock_put.call_count, 3)
+        self.assertLess(limiter.rate, 1000)
+
+    @patch.object(requests.Session, 'put')
+    def test_client_gives_up_after_throttle_retries(self, mock_put):
+        """Should return throttled response when retries are exhausted"""
+        mock_put.return_value = self._throttled_response(503)
+        client = YandexDiskAPIClient(self.token, rate_limiter=RateLimiter(rate=1000), throttle_retries=2)
+
+        response = client.create_folder("/test_folder")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(mock_put.call_count, 3)
+
+    @patch.object(requests.Session, 'put')
+    def test_forbidden_without_throttle_error_is_not_retried(self, mock_put):
+        """Should pass plain 403 through untouched"""
+        response = Mock(status_code=403)
+        response.json.return_value = {"error": "ForbiddenError"}
+        mock_put.return_value = response
+        client = YandexDiskAPIClient(self.token, rate_limiter=RateLimiter(rate=1000))
+
+        self.assertEqual(client.create_folder("/test_folder").status_code, 403)
+        mock_put.assert_called_once()
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """
+    Unit tests for retrying transient failures
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+
+    def _error_response(self, status_code: int, error: str) -> Mock:
+        response = Mock(status_code=status_code)
+        response.json.return_value = {"error": error}
+        return response
+
+    def test_backoff_has_full_jitter_within_cap(self):
+        """Should draw delay from [0, min(max_delay, base * 2**attempt)]"""
+        policy = RetryPolicy(base_delay=1, max_delay=3)
+        with patch.object(random, 'uniform', return_value=0.5) as mock_uniform:
+            policy.backoff(0)
+            policy.backoff(1)
+            policy.backoff(5)
+        self.assertEqual([c[0] for c in mock_uniform.call_args_list], [(0, 1), (0, 2), (0, 3)])
+
+    @patch.object(requests.Session, 'put')
+    def test_create_retried_after_connection_error(self, mock_put):
+        """Should retry and return response of the successful attempt"""
+        mock_put.side_effect = [requests.exceptions.ConnectionError("Connection failed"), Mock(status_code=201)]
+
+        response = self.client.create_folder("/test_folder")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(mock_put.call_count, 2)
+
+    @patch.object(requests.Session, 'put')
+    def test_create_409_after_retry_is_success(self, mock_put):
+        """Should treat 'already exists' after timeout as created by first attempt"""
+        mock_put.side_effect = [
+            requests.exceptions.Timeout("Request timed out"),
+            self._error_response(409, "DiskPathPointsToExistentDirectoryError"),
+        ]
+
+        response = self.client.create_folder("/test_folder")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.content, b"")
+        self.assertIsNone(parse_response(response))
+
+    @patch.object(requests.Session, 'put')
+    def test_create_409_on_first_attempt_is_kept(self, mock_put):
+        """Should report genuine conflict when no retry happened"""
+        mock_put.return_value = self._error_response(409, "DiskPathPointsToExistentDirectoryError")
+
+        self.assertEqual(self.client.create_folder("/test_folder").status_code, 409)
+
+    @patch.object(requests.Session, 'put')
+    def test_create_409_file_conflict_after_retry_is_kept(self, mock_put):
+        """Should not hide conflict with an existing file"""
+        mock_put.side_effect = [
+            requests.exceptions.Timeout("Request timed out"),
+            self._error_response(409, "DiskPathPointsToFileError"),
+        ]
+
+        self.assertEqual(self.client.create_folder("/test_folder").status_code, 409)
+
+    @patch.object(requests.Session, 'delete')
+    def test_delete_404_after_retry_is_success(self, mock_delete):
+        """Should treat 'not found' after timeout as deleted by first attempt"""
+        mock_delete.side_effect = [
+            requests.exceptions.Timeout("Request timed out"),
+            self._error_response(404, "DiskNotFoundError"),
+        ]
+
+        self.assertEqual(self.client.delete_folder("/test_folder").status_code, 204)
+
+    @patch.object(requests.Session, 'get')
+    def test_server_error_status_retried(self, mock_get):
+        """Should retry 5xx responses from the policy status list"""
+        mock_get.side_effect = [Mock(status_code=502), Mock(status_code=200)]
+
+        self.assertEqual(self.client.get_folder_info("/test_folder").status_code, 200)
+
+    @patch.object(requests.Session, 'put')
+    def test_gives_up_after_max_attempts(self, mock_put):
+        """Should re-raise last error once attempts are exhausted"""
+        mock_put.side_effect = requests.exceptions.ConnectionError("Connection failed")
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.client.create_folder("/test_folder")
+        self.assertEqual(mock_put.call_count, 3)
+
+
+class TestMetadataCache(unittest.TestCase):
+    """
+    Unit tests for cached folder metadata
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.cache = MetadataCache(maxsize=3, ttl=60)
+        self.client = YandexDiskAPIClient(self.token, metadata_cache=self.cache)
+
+    @patch.object(requests.Session, 'get')
+    def test_repeated_info_served_from_cache(self, mock_get):
+        """Should hit network once for repeated existence checks"""
+        mock_get.return_value = Mock(status_code=200)
+
+        for _ in range(5):
+            self.assertEqual(self.client.get_folder_info("/test_folder").status_code, 200)
+
+        mock_get.assert_called_once()
+        self.assertEqual((self.cache.hits, self.cache.misses), (4, 1))
+
+    @patch.object(requests.Session, 'get')
+    def test_not_found_is_cached_and_errors_are_not(self, mock_get):
+        """Should cache 404 answers but never 5xx"""
+        mock_get.side_effect = [Mock(status_code=404), Mock(status_code=500), Mock(status_code=500)]
+
+        self.client.get_folder_info("/missing")
+        self.client.get_folder_info("/missing")
+        self.client.get_folder_info("/broken")
+        self.client.get_folder_info("/broken")
+
+        self.assertEqual(mock_get.call_count, 3)
+
+    @patch.object(requests.Session, 'get')
+    def test_entries_expire_after_ttl(self, mock_get):
+        """Should refetch once TTL has passed"""
+        mock_get.return_value = Mock(status_code=200)
+        self.cache.ttl = 0.01
+
+        self.client.get_folder_info("/test_folder")
+        time.sleep(0.02)
+        self.client.get_folder_info("/test_folder")
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_lru_eviction_counter(self):
+        """Should evict least recently used entry over maxsize"""
+        for path in ("/a", "/b", "/c"):
+            self.cache.put(path, Mock(status_code=200))
+        self.cache.get("/a")
+        self.cache.put("/d", Mock(status_code=200))
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertIsNone(self.cache.get("/b"))
+        self.assertIsNotNone(self.cache.get("/a"))
+
+    @patch.object(requests.Session, 'put')
+    @patch.object(requests.Session, 'get')
+    def test_create_invalidates_path_and_parent(self, mock_get, mock_put):
+        """Should forget cached 404 and parent listing after create"""
+        mock_get.return_value = Mock(status_code=404)
+        mock_put.return_value = Mock(status_code=201)
+        self.client.get_folder_info("/parent")
+        self.client.get_folder_info("/parent/child")
+
+        self.client.create_folder("/parent/child/")
+
+        self.assertEqual(len(self.cache), 0)
+
+    @patch.object(requests.Session, 'delete')
+    def test_delete_invalidates_descendants(self, mock_delete):
+        """Should drop every cached entry under deleted folder"""
+        mock_delete.return_value = Mock(status_code=204)
+        self.cache.maxsize = 10
+        for path in ("/keep", "/tree", "/tree/a", "/tree/a/b", "/treehouse"):
+            self.cache.put(path, Mock(status_code=200))
+
+        self.client.delete_folder("/tree")
+
+        self.assertIsNotNone(self.cache.get("/keep"))
+        self.assertIsNotNone(self.cache.get("/treehouse"))
+        self.assertIsNone(self.cache.get("/tree/a/b"))
+        self.assertEqual(len(self.cache), 2)
+
+
+class TestConditionalRequests(unittest.TestCase):
+    """
+    Unit tests for ETag/md5 revalidation of cached metadata
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.cache = MetadataCache(ttl=0, revalidate=True)
+        self.client = YandexDiskAPIClient(self.token, metadata_cache=self.cache)
+
+    def _response(self, status_code: int, json_data: Optional[dict] = None, etag: Optional[str] = None) -> Mock:
+        response = Mock(status_code=status_code, headers={"ETag": etag} if etag else {})
+        response.json.return_value = json_data or {}
+        return response
+
+    @patch.object(requests.Session, 'get')
+    def test_not_modified_returns_cached_body(self, mock_get):
+        """Should send If-None-Match and reuse cached response on 304"""
+        original = self._response(200, {"name": "test_folder"}, etag='"abc"')
+        mock_get.side_effect = [original, self._response(304)]
+
+        self.client.get_folder_info("/test_folder")
+        response = self.client.get_folder_info("/test_folder")
+
+        self.assertIs(response, original)
+        self.assertEqual(mock_get.call_args[1]["headers"]["If-None-Match"], '"abc"')
+        self.assertEqual(mock_get.call_args[1]["headers"]["Authorization"], f"OAuth {self.token}")
+        self.assertEqual(self.cache.revalidated, 1)
+
+    @patch.object(requests.Session, 'get')
+    def test_modified_resource_replaces_cache(self, mock_get):
+        """Should store new body when validator no longer matches"""
+        updated = self._response(200, {"name": "test_folder"}, etag='"def"')
+        mock_get.side_effect = [self._response(200, etag='"abc"'), updated, self._response(304)]
+
+        self.client.get_folder_info("/test_folder")
+        self.assertIs(self.client.get_folder_info("/test_folder"), updated)
+        self.client.get_folder_info("/test_folder")
+
+        self.assertEqual(mock_get.call_args[1]["headers"]["If-None-Match"], '"def"')
+
+    @patch.object(requests.Session, 'get')
+    def test_md5_used_without_etag_header(self, mock_get):
+        """Should fall back to resource md5 as validator"""
+        mock_get.side_effect = [self._response(200, {"md5": "d41d8cd9"}), self._response(304)]
+
+        self.client.get_folder_info("/file.txt")
+        self.client.get_folder_info("/file.txt")
+
+        self.assertEqual(mock_get.call_args[1]["headers"]["If-None-Match"], '"d41d8cd9"')
+
+    @patch.object(requests.Session, 'get')
+    def test_files_listing_revalidated(self, mock_get):
+        """Should poll files listing with conditional request per page"""
+        page = self._response(200, {"items": []}, etag='"page-0"')
+        mock_get.side_effect = [page, self._response(304), self._response(200, {"items": []})]
+
+        self.client.list_files(limit=100)
+        self.assertIs(self.client.list_files(limit=100), page)
+        self.client.list_files(limit=100, offset=100)
+
+        self.assertNotIn("If-None-Match", mock_get.call_args[1]["headers"])
+
+    @patch.object(requests.Session, 'get')
+    def test_full_scan_pages_not_cached(self, mock_get):
+        """Should keep iter_files pages out of the metadata cache"""
+        def pages():
+            for start in range(0, 60, 10):
+                payload = {"items": [{"path": f"disk:/{i}"} for i in range(start, min(start + 10, 50))]}
+                page = self._response(200, payload, etag=f'"page-{start}"')
+                page.content = json.dumps(payload).encode()
+                yield page
+
+        for compact in (False, True):
+            mock_get.side_effect = pages()
+            self.assertEqual(len(list(self.client.iter_files(page_size=10, prefetch=False, compact=compact))), 50)
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertNotIn("If-None-Match", mock_get.call_args[1]["headers"])
+
+    @patch.object(requests.Session, 'get')
+    def test_plain_cache_sends_unconditional_requests(self, mock_get):
+        """Should not add validators when revalidation is off"""
+        client = YandexDiskAPIClient(self.token, metadata_cache=MetadataCache(ttl=0))
+        mock_get.return_value = self._response(200, etag='"abc"')
+
+        client.get_folder_info("/test_folder")
+        client.get_folder_info("/test_folder")
+
+        self.assertIs(mock_get.call_args[1]["headers"], client.headers)
+
+
+class TestCompactFileItems(unittest.TestCase):
+    """
+    Unit tests for fast decoding of files listing into compact records
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.body = json.dumps({
+            "items": [
+                {"path": "disk:/test_folder", "name": "test_folder", "type": "dir", "created": "2024-01-01"},
+                {"path": "disk:/a.txt", "name": "a.txt", "type": "file", "size": 10},
+            ],
+            "limit": 20,
+            "offset": 0
+        }).encode("utf-8")
+
+    def test_records_keep_only_requested_fields(self):
+        """Should build __slots__ records without per-item dict"""
+        items = decode_file_items(self.body, ("path", "type"))
+
+        self.assertEqual([(i.path, i.type) for i in items], [("disk:/test_folder", "dir"), ("disk:/a.txt", "file")])
+        self.assertFalse(hasattr(items[0], "__dict__"))
+        self.assertFalse(hasattr(items[0], "name"))
+
+    def test_missing_field_is_none(self):
+        """Should fill fields absent from item with None"""
+        items = decode_file_items(self.body, ("name", "size"))
+        self.assertEqual([i.size for i in items], [None, 10])
+
+    def test_record_type_reused_per_field_set(self):
+        """Should create one record class per distinct field tuple"""
+        self.assertIs(file_item_type(("path", "name")), file_item_type(("path", "name")))
+        self.assertEqual(file_item_type(("path",))("disk:/x"), file_item_type(("path",))("disk:/x"))
+
+    def test_invalid_fields_rejected(self):
+        """Should reject keywords, duplicates and non-identifiers before generating code"""
+        for fields in (("path", "class"), ("path", "path"), ("self",), ("media-type",)):
+            with self.subTest(fields=fields), self.assertRaises(ValueError):
+                file_item_type(fields)
+
+    def test_stdlib_fallback_gives_same_records(self):
+        """Should decode identically without fast backend"""
+        fast = decode_file_items(self.body)
+        with patch.object(yandex2taskclient, "_json_loads", json.loads):
+            slow = decode_file_items(self.body)
+        self.assertEqual(fast, slow)
+
+    @patch.object(requests.Session, 'get')
+    def test_list_file_items_projects_request(self, mock_get):
+        """Should ask API for the same fields it decodes"""
+        mock_get.return_value = Mock(status_code=200, content=self.body)
+
+        items = self.client.list_file_items()
+
+        self.assertEqual(mock_get.call_args[1]["params"]["fields"], "items.path,items.name,items.type")
+        folder_found = any(item.path == "disk:/test_folder" and item.type == "dir" for item in items)
+        self.assertTrue(folder_found)
+
+    @patch.object(requests.Session, 'get')
+    def test_iter_files_compact(self, mock_get):
+        """Should yield FileItem records when compact mode is on"""
+        mock_get.return_value = Mock(status_code=200, content=self.body)
+
+        items = list(self.client.iter_files(page_size=20, compact=True))
+
+        self.assertEqual([item.name for item in items], ["test_folder", "a.txt"])
+        self.assertIsInstance(items[0], FileItem)
+
+
+class TestResourceModels(unittest.TestCase):
+    """
+    Unit tests for parsed __slots__ result objects
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+
+    def _response(self, status_code: int, json_data: Optional[dict] = None) -> Mock:
+        content = json.dumps(json_data).encode("utf-8") if json_data is not None else b""
+        return Mock(status_code=status_code, content=content)
+
+    def test_folder_with_embedded_items(self):
+        """Should parse folder and its embedded listing"""
+        response = self._response(200, {
+            "path": "disk:/test_folder", "name": "test_folder", "type": "dir",
+            "_embedded": {"items": [{"path": "disk:/test_folder/a.txt", "name": "a.txt", "type": "file",
+                                     "size": 3, "mime_type": "text/plain"}],
+                          "limit": 20, "offset": 0, "total": 1, "path": "disk:/test_folder"}
+        })
+
+        resource = parse_response(response)
+
+        self.assertIsInstance(resource, Resource)
+        self.assertTrue(resource.is_dir)
+        self.assertEqual(resource.embedded.total, 1)
+        self.assertEqual([item.size for item in resource.embedded], [3])
+        self.assertFalse(hasattr(resource, "__dict__"))
+        response.close.assert_called_once_with()
+
+    def test_files_listing(self):
+        """Should parse files listing into ResourceList"""
+        listing = parse_response(self._response(200, {
+            "items": [{"path": "disk:/test_folder", "name": "test_folder", "type": "dir"}],
+            "limit": 20, "offset": 0
+        }))
+
+        self.assertIsInstance(listing, ResourceList)
+        self.assertEqual(len(listing), 1)
+        self.assertEqual(listing.items[0].path, "disk:/test_folder")
+
+    def test_created_link_and_no_content(self):
+        """Should parse 201 link answer and return None for 204"""
+        link = parse_response(self._response(201, {"href": "https://x/?path=/a", "method": "GET", "templated": False}))
+        self.assertIsInstance(link, Link)
+        self.assertEqual(link.href, "https://x/?path=/a")
+        self.assertIsNone(parse_response(self._response(204)))
+
+    def test_error_mapped_to_error_codes(self):
+        """Should expose YandexDiskErrorCodes name of API error"""
+        error = parse_response(self._response(409, {
+            "message": "Resource already exists",
+            "description": "Specified resource '/test_folder' already exists",
+            "error": "DiskPathPointsToExistentDirectoryError"
+        }))
+
+        self.assertIsInstance(error, ApiError)
+        self.assertEqual(error.code, "ALREADY_EXISTS_DIRECTORY")
+        self.assertEqual(error.status_code, 409)
+
+    def test_non_json_error_body(self):
+        """Should still return ApiError for HTML error pages"""
+        error = parse_response(Mock(status_code=502, content=b"<html>Bad Gateway</html>"))
+        self.assertEqual((error.status_code, error.error, error.code), (502, None, None))
+
+    @patch.object(requests.Session, 'get')
+    def test_client_typed_methods(self, mock_get):
+        """Should return parsed objects from get_resource and list_resources"""
+        mock_get.side_effect = [
+            self._response(200, {"path": "disk:/test_folder", "name": "test_folder", "type": "dir"}),
+            self._response(401, {"error": "UnauthorizedError"}),
+        ]
+
+        self.assertEqual(self.client.get_resource("/test_folder").name, "test_folder")
+        self.assertEqual(self.client.list_resources().code, "UNAUTHORIZED")
+
+
+class TestTreeSync(unittest.TestCase):
+    """
+    Unit tests for mirroring local directory layout against offline fake server
+    """
+
+    def setUp(self):
+        """Create local tree: root/{a/{b}, c}"""
+        from yandex2taskserver import FakeYandexDiskServer
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.server = FakeYandexDiskServer(tokens=[self.token]).start()
+        self.addCleanup(self.server.stop)
+        self.client = YandexDiskAPIClient(self.token, base_url=self.server.base_url)
+        self.addCleanup(self.client.close)
+        self.local = tempfile.TemporaryDirectory()
+        self.addCleanup(self.local.cleanup)
+        os.makedirs(os.path.join(self.local.name, "a", "b"))
+        os.makedirs(os.path.join(self.local.name, "c"))
+
+    def _remote(self, *folders: str):
+        for folder in folders:
+            self.server.disk.create_folder(folder)
+
+    def _sent(self, method: str) -> List[str]:
+        return [path for sent_method, path in self.server.requests if sent_method == method]
+
+    def test_unchanged_tree_single_listing(self):
+        """Should read an unchanged tree holding files in one listing pass and send nothing else"""
+        self._remote("/backup", "/backup/a", "/backup/a/b", "/backup/c", "/other")
+        self.server.disk.put_file("/backup/a/b/x.txt", b"x")
+        self.server.disk.put_file("/backup/c/y.txt", b"y")
+        self.server.disk.put_file("/other/z.txt", b"z")
+
+        plan = TreeSync(self.client, self.local.name, "/backup").run()
+
+        self.assertFalse(plan)
+        self.assertEqual(str(plan), "Nothing to do")
+        self.assertEqual(self.server.requests, [("GET", "/v1/disk/resources/files")])
+
+    def test_empty_folders_from_earlier_run_not_recreated(self):
+        """Should check folders the listing does not imply instead of creating them again"""
+        TreeSync(self.client, self.local.name, "/backup").run()
+        self.server.requests.clear()
+
+        plan = TreeSync(self.client, self.local.name, "/backup").run()
+
+        self.assertFalse(plan)
+        self.assertEqual(self._sent("GET").count("/v1/disk/resources/files"), 1)
+        self.assertEqual(len(self._sent("GET")), 5)  # listing, /backup, /backup/a, /backup/a/b, /backup/c
+        self.assertEqual(self._sent("PUT"), [])
+
+    def test_folders_below_missing_parent_not_checked(self):
+        """Should not look up folders whose parent is already known to be missing"""
+        self._remote("/backup")
+        self.server.disk.put_file("/backup/x.txt", b"x")
+
+        plan = TreeSync(self.client, self.local.name, "/backup").plan()
+
+        self.assertEqual(plan.creates, ["/backup/a", "/backup/c", "/backup/a/b"])
+        self.assertEqual(len(self._sent("GET")), 3)  # listing, /backup/a, /backup/c
+
+    def test_dry_run_plans_missing_folders(self):
+        """Should list parent-first creates without sending them"""
+        self._remote("/backup", "/backup/c")
+
+        plan = TreeSync(self.client, self.local.name, "/backup/").run(dry_run=True)
+
+        self.assertEqual(plan.creates, ["/backup/a", "/backup/a/b"])
+        self.assertEqual(str(plan), "mkdir /backup/a\nmkdir /backup/a/b")
+        self.assertEqual(self._sent("PUT"), [])
+
+    def test_apply_creates_and_deletes_minimal_set(self):
+        """Should create only missing folders and delete only top-most extras, empty ones included"""
+        self._remote("/backup", "/backup/a", "/backup/c", "/backup/old", "/backup/old/deep", "/backup/empty")
+        self.server.disk.put_file("/backup/old/deep/x.txt", b"x")
+        self.server.disk.put_file("/backup/c/x.bin", b"x")
+
+        plan = TreeSync(self.client, self.local.name, "/backup", delete=True).run()
+
+        self.assertEqual(plan.creates, ["/backup/a/b"])
+        self.assertEqual(plan.deletes, ["/backup/empty", "/backup/old"])
+        self.assertEqual(set(plan.results), {"/backup/a/b", "/backup/empty", "/backup/old"})
+        self.assertEqual(sorted(path for path, entry in self.server.disk.resources.items()
+                                if entry["type"] == "dir" and path.startswith("/backup")),
+                         ["/backup", "/backup/a", "/backup/a/b", "/backup/c"])
+
+    def test_missing_root_created_with_parents(self):
+        """Should create remote root and its ancestors first"""
+        plan = TreeSync(self.client, self.local.name, "/backups/host").run()
+
+        self.assertEqual(plan.creates[0], "/backups/host")
+        self.assertEqual(set(plan.results), {"/backups", "/backups/host", "/backups/host/a", "/backups/host/a/b",
+                                             "/backups/host/c"})
+        self.assertEqual(len(self._sent("PUT")), 5)
+
+    def test_extras_kept_without_delete(self):
+        """Should not plan deletes unless asked"""
+        self._remote("/backup", "/backup/a", "/backup/a/b", "/backup/c", "/backup/old")
+
+        self.assertFalse(TreeSync(self.client, self.local.name, "/backup").plan())
+
+
+class TestDeleteTree(unittest.TestCase):
+    """
+    Unit tests for parallel delete with async operation polling
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.client._poller = OperationPoller(self.client, interval=0.01, max_interval=0.02)
+        self.addCleanup(self.client.close)
+        self.operation_href = "https://cloud-api.yandex.net/v1/disk/operations/42"
+
+    def _response(self, status_code: int, json_data: Optional[dict] = None) -> Mock:
+        response = Mock(status_code=status_code)
+        response.json.return_value = json_data or {}
+        return response
+
+    @patch.object(requests.Session, 'get')
+    @patch.object(requests.Session, 'delete')
+    def test_async_operation_polled_until_done(self, mock_delete, mock_get):
+        """Should poll 202 operation link until success"""
+        mock_delete.return_value = self._response(202, {"href": self.operation_href, "method": "GET"})
+        mock_get.side_effect = [
+            self._response(200, {"status": "in-progress"}),
+            requests.exceptions.ConnectionError("Connection failed"),
+            self._response(200, {"status": "success"}),
+        ]
+
+        results = self.client.delete_tree(["/big_folder"])
+
+        self.assertEqual(results, {"/big_folder": "success"})
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual(mock_get.call_args[0][0], self.operation_href)
+
+    @patch.object(requests.Session, 'delete')
+    def test_mixed_outcomes_and_nested_paths(self, mock_delete):
+        """Should drop nested paths and report every outcome"""
+        def delete(url, headers, params, timeout):
+            if params["path"] == "/missing":
+                return self._response(404, {"error": "DiskNotFoundError"})
+            return self._response(204)
+
+        mock_delete.side_effect = delete
+        reported = []
+
+        results = self.client.delete_tree(["/a", "/a/b/", "/ab", "/missing"],
+                                          progress=lambda path, status: reported.append(path))
+
+        self.assertEqual(results, {"/a": "success", "/ab": "success", "/missing": "DiskNotFoundError"})
+        self.assertEqual(sorted(reported), ["/a", "/ab", "/missing"])
+        self.assertEqual(mock_delete.call_count, 3)
+
+    @patch.object(requests.Session, 'delete')
+    def test_nested_paths_dropped_next_to_similar_siblings(self, mock_delete):
+        """Should drop nested paths even when siblings sort between them and their ancestor"""
+        mock_delete.return_value = self._response(204)
+
+        results = self.client.delete_tree(["/a", "/a b", "/a/c", "/a-x/y", "/a-x"])
+
+        self.assertEqual(results, {"/a": "success", "/a b": "success", "/a-x": "success"})
+        self.assertEqual(sorted(c[1]["params"]["path"] for c in mock_delete.call_args_list), ["/a", "/a b", "/a-x"])
+
+    @patch.object(requests.Session, 'get')
+    @patch.object(requests.Session, 'delete')
+    def test_request_error_reported_per_path(self, mock_delete, mock_get):
+        """Should report a raised error as that path's status and keep other results"""
+        def delete(url, headers, params, timeout):
+            if params["path"] == "/a":
+                raise requests.exceptions.ConnectionError("Connection aborted")
+            if params["path"] == "/c":
+                return self._response(202, {"href": self.operation_href})
+            return self._response(204)
+
+        mock_delete.side_effect = delete
+        mock_get.return_value = self._response(200, {"status": "success"})
+
+        results = self.client.delete_tree(["/a", "/b", "/c"])
+
+        self.assertEqual(results, {"/a": "ConnectionError", "/b": "success", "/c": "success"})
+
+    @patch.object(requests.Session, 'get')
+    @patch.object(requests.Session, 'delete')
+    def test_one_poller_for_many_operations(self, mock_delete, mock_get):
+        """Should track all operations on single shared poller thread"""
+        mock_delete.side_effect = lambda url, headers, params, timeout: self._response(
+            202, {"href": f"{self.operation_href}{params['path']}"})
+        mock_get.return_value = self._response(200, {"status": "failed"})
+        threads_before = threading.active_count()
+
+        results = self.client.delete_tree([f"/folder_{i}" for i in range(20)], workers=5)
+
+        self.assertEqual(set(results.values()), {"failed"})
+        self.assertLessEqual(threading.active_count(), threads_before + 1)
+
+    @patch.object(requests.Session, 'get')
+    @patch.object(requests.Session, 'delete')
+    def test_wait_timeout_reports_in_progress(self, mock_delete, mock_get):
+        """Should stop waiting after wait_timeout"""
+        mock_delete.return_value = self._response(202, {"href": self.operation_href})
+        mock_get.return_value = self._response(200, {"status": "in-progress"})
+
+        results = self.client.delete_tree(["/slow"], wait_timeout=0.05)
+
+        self.assertEqual(results, {"/slow": "in-progress"})
+
+
+class _TransferStubHandler(BaseHTTPRequestHandler):
+    """Local stub of upload/download link handshake with failure injection"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    files = {}
+    failures = {"upload": 0, "download": 0}
+    range_requests = []
+    if_range_requests = []
+    honor_if_range = True
+
+    def _json(self, status_code: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = parse_qs(url.query).get("path", [""])[0]
+        host = f"http://127.0.0.1:{self.server.server_address[1]}"
+        if url.path.endswith("/resources/upload"):
+            self._json(200, {"href": f"{host}/upload{path}", "method": "PUT", "templated": False})
+        elif url.path.endswith("/resources/download"):
+            if path not in self.files:
+                self._json(404, {"error": "DiskNotFoundError"})
+            else:
+                self._json(200, {"href": f"{host}/download{path}", "method": "GET", "templated": False})
+        elif url.path.startswith("/download/"):
+            self._send_file(self.files[url.path[len("/download"):]])
+
+    def _send_file(self, data: bytes):
+        offset = 0
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        self.range_requests.append(range_header)
+        self.if_range_requests.append(if_range)
+        if range_header and not (self.honor_if_range and if_range and if_range != etag):
+            offset = int(range_header[len("bytes="):].rstrip("-"))
+            if offset >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {offset}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data) - offset))
+        self.end_headers()
+        if self.failures["download"]:
+            self.failures["download"] -= 1
+            self.wfile.write(data[offset:offset + (len(data) - offset) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data[offset:])
+
+    def do_PUT(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.failures["upload"]:
+            self.failures["upload"] -= 1
+            self.close_connection = True
+            return
+        self.files[url.path[len("/upload"):]] = body
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFileTransfers(unittest.TestCase):
+    """
+    Unit tests for streamed file transfers against local stub server
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _TransferStubHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        """Test setup"""
+        _TransferStubHandler.files.clear()
+        _TransferStubHandler.failures.update(upload=0, download=0)
+        _TransferStubHandler.range_requests.clear()
+        _TransferStubHandler.if_range_requests.clear()
+        _TransferStubHandler.honor_if_range = True
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/disk/resources"
+        self.client = YandexDiskAPIClient("y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA", base_url=base_url)
+        self.addCleanup(self.client.close)
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+        self.payload = os.urandom(300_000)
+        self.local_file = os.path.join(self.workdir.name, "artifact.bin")
+        with open(self.local_file, "wb") as f:
+            f.write(self.payload)
+
+    def test_upload_streams_file(self):
+        """Should upload file via upload link and report throughput"""
+        result = self.client.upload_file(self.local_file, "/artifact.bin", chunk_size=64 * 1024)
+
+        self.assertEqual(_TransferStubHandler.files["/artifact.bin"], self.payload)
+        self.assertEqual((result.size, result.attempts), (len(self.payload), 1))
+        self.assertGreater(result.mb_per_second, 0)
+
+    def test_upload_memory_mapped(self):
+        """Should send identical bytes from memory-mapped file"""
+        result = self.client.upload_file(self.local_file, "/artifact.bin", chunk_size=10_000, memory_map=True)
+
+        self.assertEqual(_TransferStubHandler.files["/artifact.bin"], self.payload)
+        self.assertEqual(result.size, len(self.payload))
+
+    def test_upload_memory_mapped_empty_file(self):
+        """Should upload empty file, which cannot be mapped"""
+        empty = os.path.join(self.workdir.name, "empty.bin")
+        open(empty, "wb").close()
+
+        self.client.upload_file(empty, "/empty.bin", memory_map=True)
+
+        self.assertEqual(_TransferStubHandler.files["/empty.bin"], b"")
+
+    def test_mapped_reader_yields_memoryview_slices(self):
+        """Should hand out page-aligned views without copying"""
+        with open(self.local_file, "rb") as source:
+            with _MappedReader(source, len(self.payload), 10_000) as reader:
+                chunks = list(reader)
+                self.assertIsInstance(chunks[0], memoryview)
+                self.assertEqual(len(chunks[0]) % mmap.PAGESIZE, 0)
+                self.assertEqual(b"".join(chunks), self.payload)
+                del chunks
+
+    def test_upload_retried_with_fresh_link(self):
+        """Should restart upload after dropped connection"""
+        _TransferStubHandler.failures["upload"] = 1
+
+        result = self.client.upload_file(self.local_file, "/artifact.bin")
+
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(_TransferStubHandler.files["/artifact.bin"], self.payload)
+
+    def test_download_resumes_with_range(self):
+        """Should continue interrupted download from received offset"""
+        _TransferStubHandler.files["/artifact.bin"] = self.payload
+        _TransferStubHandler.failures["download"] = 1
+        target = os.path.join(self.workdir.name, "copy.bin")
+
+        result = self.client.download_file("/artifact.bin", target, chunk_size=16 * 1024)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), self.payload)
+        self.assertEqual(result.attempts, 2)
+        self.assertIsNone(_TransferStubHandler.range_requests[0])
+        self.assertTrue(_TransferStubHandler.range_requests[1].startswith("bytes="))
+        self.assertEqual(_TransferStubHandler.if_range_requests[1], f'"{hashlib.md5(self.payload).hexdigest()}"')
+        self.assertFalse(os.path.exists(target + ".part"))
+        self.assertFalse(os.path.exists(target + ".part.json"))
+
+    def test_download_discards_stale_part(self):
+        """Should restart from zero when leftover part has no recorded remote state"""
+        _TransferStubHandler.files["/artifact.bin"] = b"NEW"
+        target = os.path.join(self.workdir.name, "copy.bin")
+        with open(target + ".part", "wb") as f:
+            f.write(b"OLD-CONTENT")
+
+        self.client.download_file("/artifact.bin", target)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"NEW")
+        self.assertEqual(_TransferStubHandler.range_requests, [None])
+
+    def _leave_part(self, target: str, data: bytes, remote: bytes):
+        """Part file holding `data`, recorded as the start of `remote`"""
+        with open(target + ".part", "wb") as f:
+            f.write(data)
+        with open(target + ".part.json", "w", encoding="utf-8") as f:
+            json.dump({"etag": f'"{hashlib.md5(remote).hexdigest()}"', "size": len(remote)}, f)
+
+    def test_download_changed_remote_restarts(self):
+        """Should take the full new file when If-Range shows remote changed since the part"""
+        _TransferStubHandler.files["/artifact.bin"] = b"XYZW"
+        target = os.path.join(self.workdir.name, "copy.bin")
+        self._leave_part(target, b"ne", b"neXY")
+
+        result = self.client.download_file("/artifact.bin", target)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"XYZW")
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(_TransferStubHandler.if_range_requests, [f'"{hashlib.md5(b"neXY").hexdigest()}"'])
+
+    def test_download_changed_remote_caught_by_etag(self):
+        """Should not append range with another ETag when server ignores If-Range"""
+        _TransferStubHandler.files["/artifact.bin"] = b"XYZW"
+        _TransferStubHandler.honor_if_range = False
+        target = os.path.join(self.workdir.name, "copy.bin")
+        self._leave_part(target, b"ne", b"neXY")
+
+        result = self.client.download_file("/artifact.bin", target)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"XYZW")
+        self.assertEqual(result.attempts, 1)
+        self.assertEqual(_TransferStubHandler.range_requests, ["bytes=2-", None])
+
+    def test_download_mismatched_part_caught_by_md5(self):
+        """Should discard assembled file failing md5 check and download it again"""
+        _TransferStubHandler.files["/artifact.bin"] = b"XYZW"
+        target = os.path.join(self.workdir.name, "copy.bin")
+        self._leave_part(target, b"ne", b"XYZW")
+
+        result = self.client.download_file("/artifact.bin", target)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"XYZW")
+        self.assertEqual(result.attempts, 2)
+        self.assertEqual(_TransferStubHandler.range_requests, ["bytes=2-", None])
+
+    def test_download_mismatch_raises_after_retries(self):
+        """Should raise IOError and keep no part when every attempt fails verification"""
+        _TransferStubHandler.files["/artifact.bin"] = b"XYZW"
+        target = os.path.join(self.workdir.name, "copy.bin")
+        self._leave_part(target, b"ne", b"XYZW")
+
+        with self.assertRaises(IOError):
+            self.client.download_file("/artifact.bin", target, retries=0)
+
+        self.assertFalse(os.path.exists(target))
+        self.assertFalse(os.path.exists(target + ".part"))
+
+    def test_download_full_part_not_trusted(self):
+        """Should download again instead of taking a 416 as proof the part is complete"""
+        _TransferStubHandler.files["/artifact.bin"] = b"XYZW"
+        target = os.path.join(self.workdir.name, "copy.bin")
+        self._leave_part(target, b"ABCDEF", b"ABCD")
+
+        self.client.download_file("/artifact.bin", target)
+
+        with open(target, "rb") as f:
+            self.assertEqual(f.read(), b"XYZW")
+        self.assertEqual(_TransferStubHandler.range_requests, [None])
+
+    def test_download_missing_file_raises(self):
+        """Should raise HTTPError when API has no such file"""
+        with self.assertRaises(requests.exceptions.HTTPError):
+            self.client.download_file("/missing.bin", os.path.join(self.workdir.name, "missing.bin"))
+
+    def test_concurrent_transfers(self):
+        """Should run several uploads and downloads in parallel"""
+        uploads = [(self.local_file, f"/copy_{i}.bin") for i in range(4)]
+        results = self.client.upload_files(uploads, workers=4)
+        downloads = [(f"/copy_{i}.bin", os.path.join(self.workdir.name, f"copy_{i}.bin")) for i in range(4)]
+        results += self.client.download_files(downloads, workers=4)
+
+        self.assertEqual([r.size for r in results], [len(self.payload)] * 8)
+        for _, local in downloads:
+            self.assertEqual(os.path.getsize(local), len(self.payload))
+
+
+class TestLazyImports(unittest.TestCase):
+    """
+    Unit tests for cheap import of the client module
+    """
+
+    def _modules_after(self, code: str) -> set:
+        """Heavy modules loaded by a fresh interpreter running code"""
+        script = (f"import sys\n{code}\n"
+                  "print(' '.join(m for m in ('requests', 'urllib3', 'asyncio', 'sqlite3', 'unittest', "
+                  "'concurrent.futures', 'orjson') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        return set(output.split())
+
+    def test_import_loads_no_heavy_modules(self):
+        """Should import client module and error codes without HTTP stack"""
+        self.assertEqual(self._modules_after("from yandex2taskclient import YandexDiskErrorCodes"), set())
+
+    def test_client_loads_http_stack_on_first_use(self):
+        """Should import requests when the first client is built"""
+        loaded = self._modules_after("import yandex2taskclient\nyandex2taskclient.YandexDiskAPIClient('t')")
+
+        self.assertIn("requests", loaded)
+        self.assertNotIn("asyncio", loaded)
+        self.assertNotIn("unittest", loaded)
+
+    def test_lazy_exception_class(self):
+        """Should build CircuitOpenError once as a requests exception"""
+        self.assertIs(yandex2taskclient.CircuitOpenError, CircuitOpenError)
+        self.assertTrue(issubclass(CircuitOpenError, requests.exceptions.RequestException))
+        self.assertEqual(CircuitOpenError.__module__, "yandex2taskclient")
+
+
+class TestCommandLine(unittest.TestCase):
+    """
+    Unit tests for bulk operations command-line tool against offline fake server
+    """
+
+    def setUp(self):
+        """Test setup"""
+        from yandex2taskserver import FakeYandexDiskServer
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.server = FakeYandexDiskServer(tokens=[self.token]).start()
+        self.addCleanup(self.server.stop)
+
+    def _run(self, *argv: str, lines: Iterable[str] = ()) -> Tuple[int, List[dict], str]:
+        """Exit code, parsed NDJSON records and stderr summary of one run"""
+        import io
+        from yandex2taskcli import parse_args, run
+        args = parse_args(list(argv) + ["--token", self.token, "--base-url", self.server.base_url])
+        output, errors = io.StringIO(), io.StringIO()
+        code = run(args, lines, output, errors)
+        return code, [json.loads(line) for line in output.getvalue().splitlines()], errors.getvalue()
+
+    def test_create_streams_record_per_path(self):
+        """Should create every listed folder and skip blank lines"""
+        paths = [f"/bulk_{i}" for i in range(25)]
+
+        code, records, summary = self._run("create", "--workers", "4", lines=[p + "\n" for p in paths] + ["\n"])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(record["path"] for record in records), sorted(paths))
+        self.assertTrue(all(record["ok"] and record["status"] == 201 for record in records))
+        self.assertTrue(all(path in self.server.disk.resources for path in paths))
+        self.assertEqual(summary.strip(), "create: 25 ok, 0 failed")
+
+    def test_input_consumed_lazily(self):
+        """Should not read far ahead of the requests in flight"""
+        consumed = []
+
+        def lines():
+            for i in range(1000):
+                consumed.append(i)
+                yield f"/lazy_{i}\n"
+
+        from yandex2taskcli import parse_args, run
+        args = parse_args(["info", "--workers", "2", "--token", self.token, "--base-url", self.server.base_url])
+        output = Mock()
+        output.write.side_effect = lambda line: self.assertLessEqual(len(consumed), 2 * 2 + 1 + output.write.call_count)
+
+        run(args, lines(), output, Mock())
+
+        self.assertEqual(output.write.call_count, 1000)
+
+    def test_info_and_list_report_results_and_failures(self):
+        """Should print resource details, child names and errors with exit code 1"""
+        self.server.disk.create_folder("/docs")
+        self.server.disk.put_file("/docs/a.txt", b"a")
+
+        info_code, info, _ = self._run("info", lines=["/docs\n", "/missing\n"])
+        list_code, listing, _ = self._run("list", lines=["/docs\n", "/missing\n"])
+
+        by_path = {record["path"]: record for record in info}
+        self.assertEqual(info_code, 1)
+        self.assertEqual((by_path["/docs"]["ok"], by_path["/docs"]["type"]), (True, "dir"))
+        self.assertEqual((by_path["/missing"]["ok"], by_path["/missing"]["status"]), (False, 404))
+        self.assertEqual(by_path["/missing"]["error"], "DiskNotFoundError")
+        by_path = {record["path"]: record for record in listing}
+        self.assertEqual(list_code, 1)
+        self.assertEqual(by_path["/docs"]["items"], ["a.txt"])
+        self.assertFalse(by_path["/missing"]["ok"])
+
+    def test_retries_and_rate_options(self):
+        """Should retry injected 5xx failures and respect --rate"""
+        self.server.inject(500, count=2)
+        start = time.monotonic()
+
+        code, records, _ = self._run("create", "--rate", "20", "--retries", "3", "--workers", "2",
+                                     lines=[f"/rated_{i}\n" for i in range(10)])
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(records), 10)
+        self.assertEqual(len(self.server.requests), 12)
+        self.assertGreaterEqual(time.monotonic() - start, 11 / 20)
+
+    def test_retries_throttling_without_rate(self):
+        """Should retry 429 and 503 replies when --rate is not given"""
+        self.server.inject(503, count=1)
+        self.server.inject(429, count=1)
+
+        code, records, summary = self._run("create", "--retries", "3", "--workers", "1",
+                                           lines=["/throttled_0\n", "/throttled_1\n"])
+
+        self.assertEqual(code, 0)
+        self.assertTrue(all(record["ok"] and record["status"] == 201 for record in records))
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertEqual(summary.strip(), "create: 2 ok, 0 failed")
+
+    def test_main_reads_file_and_requires_token(self):
+        """Should read paths from file argument and reject missing token"""
+        from yandex2taskcli import main
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("/from_file\n")
+        self.addCleanup(os.unlink, f.name)
+
+        with patch("sys.stdout"), patch("sys.stderr"):
+            code = main(["create", f.name, "--token", self.token, "--base-url", self.server.base_url])
+        with patch.dict(os.environ, {"YANDEX_DISK_TOKEN": ""}), patch("sys.stderr"), \
+                self.assertRaises(SystemExit):
+            main(["create"])
+
+        self.assertEqual(code, 0)
+        self.assertIn("/from_file", self.server.disk.resources)
+
+
+class TestOperationJournal(unittest.TestCase):
+    """
+    Unit tests for crash-safe journaled bulk folder creation
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.addCleanup(self.client.close)
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.journal_path = os.path.join(workdir.name, "provision.journal")
+
+    def test_write_error_is_sticky(self):
+        """Should raise a failed write from every later flush, waiting done and close"""
+        journal = OperationJournal(self.journal_path)
+        disk_full = OSError(28, "No space left on device")
+
+        with patch.object(os, "fsync", side_effect=disk_full):
+            journal.done("create_folder", "/a")
+            with self.assertRaises(OSError):
+                journal.flush()
+        journal.done("create_folder", "/b")
+
+        with self.assertRaises(OSError):
+            journal.flush()
+        with self.assertRaises(OSError):
+            journal.done("create_folder", "/c", wait=True)
+        with self.assertRaises(OSError):
+            journal.close()
+
+    def test_restarted_job_skips_completed_work(self):
+        """Should resend only creates the crashed run did not finish"""
+        paths = ["/a/b", "/a/c", "/d"]
+        crash = requests.exceptions.ConnectionError("crash")
+
+        with OperationJournal(self.journal_path) as journal:
+            with patch('requests.Session.put', side_effect=[Mock(status_code=201)] * 2 + [crash] * 2):
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    self.client.create_folders(paths, workers=1, journal=journal)
+
+        with OperationJournal(self.journal_path) as journal:
+            self.assertEqual(journal.pending("create_folder"), ["/a/b", "/a/c"])
+            with patch('requests.Session.put', return_value=Mock(status_code=201)) as mock_put:
+                results = self.client.create_folders(paths, workers=1, journal=journal)
+
+        self.assertEqual(sorted(results), ["/a/b", "/a/c"])
+        self.assertEqual(mock_put.call_count, 2)
+        with OperationJournal(self.journal_path) as journal:
+            self.assertEqual(journal.pending(), [])
+
+    def test_torn_tail_discarded(self):
+        """Should drop a partially written last record on recovery"""
+        with OperationJournal(self.journal_path) as journal:
+            journal.done("create_folder", "/a", 201, wait=True)
+        with open(self.journal_path, "ab") as f:
+            f.write(b'{"op": "create_folder", "path": "/b", "sta')
+
+        with OperationJournal(self.journal_path) as journal:
+            self.assertTrue(journal.is_done("create_folder", "/a"))
+            self.assertFalse(journal.is_done("create_folder", "/b"))
+            journal.done("create_folder", "/c", 201, wait=True)
+
+        with open(self.journal_path, "rb") as f:
+            self.assertEqual([json.loads(line)["path"] for line in f], ["/a", "/c"])
+
+    def test_group_commit_shares_fsync(self):
+        """Should write concurrent durable records in fewer commits"""
+        with OperationJournal(self.journal_path) as journal:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                list(executor.map(lambda i: journal.done("create_folder", f"/f{i}", 201, wait=True), range(400)))
+
+            self.assertEqual(journal.records, 400)
+            self.assertLess(journal.commits, 400)
+            self.assertEqual(len(journal.completed), 400)
+
+
+class TestListingIndex(unittest.TestCase):
+    """
+    Unit tests for persistent listing index against offline fake server
+    """
+
+    def setUp(self):
+        """Test setup"""
+        from yandex2taskserver import FakeYandexDiskServer
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.server = FakeYandexDiskServer(tokens=[self.token]).start()
+        self.addCleanup(self.server.stop)
+        self.client = YandexDiskAPIClient(self.token, base_url=self.server.base_url)
+        self.addCleanup(self.client.close)
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.db_path = os.path.join(workdir.name, "index.sqlite")
+        for folder in ("/docs", "/docs/2024", "/photos"):
+            self.server.disk.create_folder(folder)
+        for path in ("/docs/2024/a.txt", "/docs/b.txt", "/photos/c.jpg"):
+            self.server.disk.put_file(path, path.encode())
+
+    def test_refresh_and_offline_lookup(self):
+        """Should answer file, folder and missing paths without network"""
+        with ListingIndex(self.db_path) as index:
+            counts = index.refresh(self.client, page_size=2)
+            requests_made = len(self.server.requests)
+
+            types = index.lookup(["/docs/b.txt", "disk:/docs/2024", "/docs/", "/", "/nope", "/docs/b.txt"])
+
+        self.assertEqual(counts, {"added": 7, "updated": 0, "unchanged": 0, "removed": 0})
+        self.assertEqual(types, {"/docs/b.txt": "file", "disk:/docs/2024": "dir", "/docs/": "dir", "/": "dir",
+                                 "/nope": None})
+        self.assertEqual(len(self.server.requests), requests_made)
+
+    def test_lookup_not_blocked_by_running_refresh(self):
+        """Should answer from the previous refresh while a slow one is in progress"""
+        with ListingIndex(self.db_path) as index:
+            index.refresh(self.client)
+            self.server.latency = 0.2
+            refreshing = threading.Thread(target=index.refresh, args=(self.client,), kwargs={"page_size": 1})
+            refreshing.start()
+            time.sleep(0.1)
+
+            started = time.perf_counter()
+            found = index.exists(["/docs/b.txt"])
+            elapsed = time.perf_counter() - started
+            still_running = refreshing.is_alive()
+            refreshing.join()
+
+        self.assertTrue(still_running)
+        self.assertEqual(found, {"/docs/b.txt": True})
+        self.assertLess(elapsed, 0.1)
+
+    def test_index_persists_between_runs(self):
+        """Should answer from file written by an earlier process"""
+        with ListingIndex(self.db_path) as index:
+            index.refresh(self.client)
+
+        with ListingIndex(self.db_path) as index:
+            self.assertEqual(index.exists(["/photos/c.jpg", "/photos/d.jpg"]),
+                             {"/photos/c.jpg": True, "/photos/d.jpg": False})
+            self.assertIsNotNone(index.refreshed_at)
+
+    def test_incremental_refresh(self):
+        """Should rewrite only changed rows and drop vanished paths"""
+        with ListingIndex(self.db_path) as index:
+            index.refresh(self.client)
+            self.server.disk.delete("/photos", operation_polls=0)
+            self.server.disk.put_file("/docs/new.txt", b"new")
+            self.server.disk.resources["/docs/b.txt"]["modified"] = "2030-01-01T00:00:00+00:00"
+
+            counts = index.refresh(self.client)
+
+            self.assertEqual(counts, {"added": 1, "updated": 1, "unchanged": 4, "removed": 2})
+            self.assertEqual(index.lookup(["/photos", "/docs/new.txt"]), {"/photos": None, "/docs/new.txt": "file"})
+
+    def test_failed_refresh_keeps_previous_index(self):
+        """Should roll back when listing fails midway"""
+        with ListingIndex(self.db_path) as index:
+            index.refresh(self.client)
+            self.server.disk.delete("/photos", operation_polls=0)
+            self.server.inject(500, "InternalServerError", path_prefix="/v1/disk/resources/files")
+
+            with self.assertRaises(requests.exceptions.HTTPError):
+                index.refresh(self.client)
+
+            self.assertTrue(index.exists(["/photos/c.jpg"])["/photos/c.jpg"])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Unit tests for circuit breaker state machine and client integration
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.transitions = []
+        self.breaker = CircuitBreaker(failure_rate=0.5, window=4, min_requests=4, reset_timeout=0.05,
+                                      on_state_change=[lambda old, new: self.transitions.append((old, new))])
+
+    def _client(self, **kwargs) -> YandexDiskAPIClient:
+        client = YandexDiskAPIClient(self.token, circuit_breaker=self.breaker, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_opens_at_error_rate_and_fails_fast(self):
+        """Should stop sending once half of the window failed"""
+        client = self._client()
+        responses = [Mock(status_code=201), Mock(status_code=503), Mock(status_code=201), Mock(status_code=500)]
+
+        with patch('requests.Session.put', side_effect=responses) as mock_put:
+            statuses = [client.create_folder(f"/f{i}").status_code for i in range(4)]
+            with self.assertRaises(CircuitOpenError):
+                client.create_folder("/f4")
+
+        self.assertEqual(statuses, [201, 503, 201, 500])
+        self.assertEqual(mock_put.call_count, 4)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(self.breaker.rejected, 1)
+        self.assertEqual(self.transitions, [("closed", "open")])
+
+    def test_below_min_requests_stays_closed(self):
+        """Should not judge error rate on too few requests"""
+        for _ in range(3):
+            self.breaker.allow()
+            self.breaker.record(True)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Should admit one probe after reset timeout and act on its outcome"""
+        for _ in range(4):
+            self.breaker.record(True)
+        time.sleep(0.06)
+
+        self.breaker.allow()  # Probe
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()  # Only one probe at a time
+        self.breaker.record(True)
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+        time.sleep(0.06)
+        self.breaker.allow()
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.transitions, [("closed", "open"), ("open", "half_open"), ("half_open", "open"),
+                                            ("open", "half_open"), ("half_open", "closed")])
+
+    def test_stale_outcome_is_not_a_probe(self):
+        """Should ignore outcome of a request admitted before the circuit opened"""
+        stale = self.breaker.allow()
+        for _ in range(4):
+            self.breaker.record(True)
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+
+        self.breaker.record(False, stale)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.HALF_OPEN)
+        probe = self.breaker.allow()  # Probe slot still free
+        self.breaker.record(False, probe)
+        self.assertEqual(self.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_slow_calls_and_exceptions_count_as_failures(self):
+        """Should trip on timeouts and answers slower than slow_call"""
+        self.breaker.slow_call = 0.01
+        client = self._client()
+
+        def slow_ok(*args, **kwargs):
+            time.sleep(0.02)
+            return Mock(status_code=200)
+
+        with patch('requests.Session.get', side_effect=slow_ok):
+            client.get_folder_info("/a")
+            client.get_folder_info("/b")
+        with patch('requests.Session.get', side_effect=requests.exceptions.ReadTimeout()):
+            for path in ("/c", "/d"):
+                with self.assertRaises(requests.exceptions.ReadTimeout):
+                    client.get_folder_info(path)
+
+        self.assertEqual(self.breaker.state, CircuitBreaker.OPEN)
+
+    def test_state_exposed_through_instrumentation(self):
+        """Should tag events with circuit state and export it as gauge"""
+        metrics = RequestMetrics()
+        events = []
+        client = self._client(instrumentation=[metrics, events.append])
+        for _ in range(4):
+            self.breaker.record(True)
+
+        with patch('requests.Session.get') as mock_get:
+            with self.assertRaises(CircuitOpenError):
+                client.get_folder_info("/a")
+
+        mock_get.assert_not_called()
+        self.assertEqual((events[0].error, events[0].circuit), ("CircuitOpenError", "open"))
+        self.assertIn('yandex_disk_circuit_state{state="open"} 1', metrics.to_prometheus())
+
+
+class TestThreadSafety(unittest.TestCase):
+    """
+    Unit tests for sharing one client across threads
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.client = YandexDiskAPIClient(self.token)
+        self.addCleanup(self.client.close)
+
+    def test_session_per_thread(self):
+        """Should give each thread its own session and close all of them"""
+        sessions = [self.client.session]
+        worker = threading.Thread(target=lambda: sessions.append(self.client.session))
+        worker.start()
+        worker.join()
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertIs(self.client.session, sessions[0])
+        with patch.object(requests.Session, 'close') as mock_close:
+            self.client.close()
+        self.assertEqual(mock_close.call_count, 2)
+
+    def test_finished_thread_sessions_released(self):
+        """Should drop sessions of dead threads when new ones are created"""
+        for _ in range(3):
+            worker = threading.Thread(target=lambda: self.client.session)
+            worker.start()
+            worker.join()
+
+        self.assertEqual(len(self.client._sessions), 2)  # Creator and the last worker
+
+    def test_threads_share_warm_connection_pool(self):
+        """Should reuse connections opened by earlier calls' worker threads"""
+        from yandex2taskserver import FakeYandexDiskServer
+        server = FakeYandexDiskServer(tokens=[self.token]).start()
+        self.addCleanup(server.stop)
+        client = YandexDiskAPIClient(self.token, base_url=server.base_url)
+        self.addCleanup(client.close)
+        workers = []
+        worker = threading.Thread(target=lambda: workers.append(client.session))
+        worker.start()
+        worker.join()
+
+        for run in range(5):
+            client.create_folders([f"/run_{run}/{i}" for i in range(8)], workers=4)
+
+        pools = list(client._adapter.poolmanager.pools._container.values())
+        self.assertIs(workers[0].get_adapter(server.base_url), client.session.get_adapter(server.base_url))
+        self.assertLessEqual(sum(pool.num_connections for pool in pools), 5)
+
+    def test_headers_read_only(self):
+        """Should reject mutation of shared headers"""
+        with self.assertRaises(TypeError):
+            self.client.headers["Authorization"] = "OAuth other"
+
+    def test_map_concurrent_yields_in_completion_order(self):
+        """Should yield fast results before slow ones"""
+        delays = {"/slow": 0.1, "/fast": 0.0}
+
+        def op(path):
+            time.sleep(delays[path])
+            return path.upper()
+
+        results = list(self.client.map_concurrent(op, ["/slow", "/fast"], workers=2))
+
+        self.assertEqual(results, [("/fast", "/FAST"), ("/slow", "/SLOW")])
+
+    def test_map_concurrent_bounded_memory(self):
+        """Should pull paths lazily, at most two per worker ahead"""
+        pulled = []
+
+        def paths():
+            for i in range(1000):
+                pulled.append(i)
+                yield f"/p{i}"
+
+        results = self.client.map_concurrent(lambda path: path, paths(), workers=4)
+        next(results)
+        self.assertLessEqual(len(pulled), 9)
+        self.assertEqual(sum(1 for _ in results), 999)
+
+    def test_map_concurrent_method_name_and_errors(self):
+        """Should call client method by name and surface failures"""
+        with patch('requests.Session.put') as mock_put:
+            mock_put.side_effect = [Mock(status_code=201), requests.exceptions.ConnectionError("down")]
+            results = dict(self.client.map_concurrent("create_folder", ["/a", "/b"], workers=1,
+                                                      return_exceptions=True, timeout=5))
+
+        self.assertEqual(results["/a"].status_code, 201)
+        self.assertIsInstance(results["/b"], requests.exceptions.ConnectionError)
+        self.assertEqual(mock_put.call_args[1]["timeout"], 5)
+
+        with patch('requests.Session.put', side_effect=requests.exceptions.ConnectionError("down")):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                list(self.client.map_concurrent("create_folder", ["/a", "/b"]))
+
+
+class TestRequestCoalescing(unittest.TestCase):
+    """
+    Unit tests for single-flight reads and sibling existence batching
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+
+    def _concurrently(self, call, count: int) -> list:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(call) for _ in range(count)]
+            return [future.result() for future in futures]
+
+    def test_concurrent_reads_share_one_request(self):
+        """Should send one GET for concurrent get_folder_info of one path"""
+        client = YandexDiskAPIClient(self.token)
+        self.addCleanup(client.close)
+        release = threading.Event()
+        response = Mock(status_code=200)
+
+        def slow_get(*args, **kwargs):
+            release.wait(1)
+            return response
+
+        with patch('requests.Session.get', side_effect=slow_get) as mock_get:
+            timer = threading.Timer(0.05, release.set)
+            timer.start()
+            results = self._concurrently(lambda: client.get_folder_info("/shared"), 8)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertTrue(all(result is response for result in results))
+        self.assertEqual(client._inflight.shared, 7)
+
+    def test_errors_shared_and_not_remembered(self):
+        """Should raise leader's exception to waiters, then retry afresh"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(1)
+            raise requests.exceptions.ConnectionError("down")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(flight.do, "key", failing)
+            started.wait(1)
+            follower = executor.submit(flight.do, "key", lambda: "unused")
+            time.sleep(0.02)
+            release.set()
+            for future in (leader, follower):
+                with self.assertRaises(requests.exceptions.ConnectionError):
+                    future.result()
+
+        self.assertEqual(flight.do("key", lambda: "fresh"), "fresh")
+        self.assertEqual(flight.executed, 2)
+
+    def test_siblings_batched_into_parent_listing(self):
+        """Should answer more than K sibling checks with one listing"""
+        from yandex2taskserver import FakeYandexDiskServer
+        with FakeYandexDiskServer(tokens=[self.token]) as server:
+            server.disk.create_folder("/photos")
+            for name in ("a", "b", "c"):
+                server.disk.create_folder(f"/photos/{name}")
+            client = YandexDiskAPIClient(self.token, base_url=server.base_url, batch_siblings=3,
+                                         batch_window=0.05)
+            self.addCleanup(client.close)
+            names = ["a", "b", "c", "x", "y"]
+
+            with ThreadPoolExecutor(max_workers=len(names)) as executor:
+                found = dict(zip(names, executor.map(lambda n: client.folder_exists(f"/photos/{n}"), names)))
+
+            self.assertEqual(found, {"a": True, "b": True, "c": True, "x": False, "y": False})
+            self.assertEqual(len(server.requests), 1)
+
+    def test_small_sibling_groups_checked_individually(self):
+        """Should fall back to info requests at or below threshold"""
+        from yandex2taskserver import FakeYandexDiskServer
+        with FakeYandexDiskServer(tokens=[self.token]) as server:
+            server.disk.create_folder("/docs")
+            client = YandexDiskAPIClient(self.token, base_url=server.base_url, batch_siblings=3,
+                                         batch_window=0.01)
+            self.addCleanup(client.close)
+
+            self.assertTrue(client.folder_exists("/docs"))
+            self.assertFalse(client.folder_exists("/missing"))
+            self.assertEqual(len(server.requests), 2)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Unit tests for request instrumentation hooks and metrics export
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+        self.base_url = "https://cloud-api.yandex.net/v1/disk/resources"
+
+    def _response(self, status_code: int, payload: dict) -> Mock:
+        response = Mock()
+        response.status_code = status_code
+        response.headers = {}
+        response.json.return_value = payload
+        response.elapsed = timedelta(milliseconds=5)
+        return response
+
+    def test_events_carry_operation_status_and_error(self):
+        """Should report one event per request with operation and API error code"""
+        events = []
+        client = YandexDiskAPIClient(self.token, instrumentation=[events.append])
+        self.addCleanup(client.close)
+
+        with patch('requests.Session.put', return_value=self._response(201, {})), \
+                patch('requests.Session.get', return_value=self._response(404, {"error": "DiskNotFoundError"})):
+            client.create_folder("/a")
+            client.get_folder_info("/missing")
+
+        self.assertEqual([(e.operation, e.method, e.status_code, e.error) for e in events], [
+            ("create_folder", "PUT", 201, None),
+            ("get_folder_info", "GET", 404, "DiskNotFoundError"),
+        ])
+        self.assertAlmostEqual(events[0].ttfb, 0.005)
+        self.assertIsNone(events[0].dns)  # Mocked transport opens no connection
+
+    def test_exception_reported_and_reraised(self):
+        """Should emit event named after exception and propagate it"""
+        events = []
+        client = YandexDiskAPIClient(self.token, instrumentation=[events.append])
+        self.addCleanup(client.close)
+
+        with patch('requests.Session.get', side_effect=requests.exceptions.ConnectTimeout()):
+            with self.assertRaises(requests.exceptions.ConnectTimeout):
+                client.get_folder_info("/a")
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0].error, "ConnectTimeout")
+        self.assertIsNone(events[0].status_code)
+        self.assertIsNone(events[0].ttfb)
+
+    def test_disabled_keeps_plain_adapter(self):
+        """Should not install timed connections without hooks"""
+        client = YandexDiskAPIClient(self.token)
+        self.addCleanup(client.close)
+
+        self.assertEqual(client.instrumentation, ())
+        self.assertIs(type(client.session.get_adapter(self.base_url)), HTTPAdapter)
+
+    def test_histogram_percentiles_within_precision(self):
+        """Should estimate percentiles within bucket relative error"""
+        histogram = LatencyHistogram(precision_bits=6)
+        for millisecond in range(1, 1001):
+            histogram.record(millisecond / 1000)
+
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.min, 0.001)
+        self.assertEqual(histogram.max, 1.0)
+        for quantile, expected in ((0.5, 0.5), (0.95, 0.95), (0.99, 0.99)):
+            self.assertAlmostEqual(histogram.percentile(quantile), expected, delta=expected / 64)
+        self.assertLess(len(histogram.buckets), 1000)
+
+    def test_metrics_export_json_and_prometheus(self):
+        """Should aggregate events per operation into both export formats"""
+        metrics = RequestMetrics()
+        metrics(RequestEvent("create_folder", "PUT", 201, None, {"ttfb": 0.01}, 0.02))
+        metrics(RequestEvent("create_folder", "PUT", 409, "DiskPathPointsToExistentDirectoryError",
+                             {"ttfb": 0.01}, 0.03))
+
+        snapshot = json.loads(metrics.to_json())
+        self.assertEqual(snapshot["create_folder"]["requests"], 2)
+        self.assertEqual(snapshot["create_folder"]["phases"]["total"]["count"], 2)
+        self.assertNotIn("dns", snapshot["create_folder"]["phases"])
+
+        text = metrics.to_prometheus()
+        self.assertIn('yandex_disk_request_duration_seconds_count{operation="create_folder",phase="total"} 2',
+                      text)
+        self.assertIn('yandex_disk_requests_total{operation="create_folder",status="409",'
+                      'error="DiskPathPointsToExistentDirectoryError"} 1', text)
+
+    def test_phase_timings_against_local_server(self):
+        """Should time DNS and connect once per pooled connection"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _TransferStubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        _TransferStubHandler.files.clear()
+        metrics = RequestMetrics()
+        events = []
+        base_url = f"http://localhost:{server.server_address[1]}/v1/disk/resources"
+        client = YandexDiskAPIClient(self.token, base_url=base_url, instrumentation=[metrics, events.append])
+        self.addCleanup(client.close)
+
+        for _ in range(3):
+            client._send("upload_file", "get", f"{base_url}/upload", {"path": "/a"}, 5)
+
+        self.assertIsNotNone(events[0].dns)
+        self.assertIsNotNone(events[0].connect)
+        self.assertIsNone(events[0].tls)
+        self.assertTrue(all(e.dns is None and e.connect is None for e in events[1:]))
+        self.assertTrue(all(e.total >= e.ttfb >= 0 for e in events))
+        self.assertEqual(metrics.snapshot()["upload_file"]["phases"]["dns"]["count"], 1)
+
+    def test_timed_connection_falls_back_across_addresses(self):
+        """Should try next resolved address when the first one refuses, as urllib3 does"""
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _TransferStubHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_address[1]
+        real_getaddrinfo = socket.getaddrinfo
+
+        def getaddrinfo(host, *args, **kwargs):
+            if host != "yandex-disk.test":
+                return real_getaddrinfo(host, *args, **kwargs)
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))
+                    for address in ("127.0.0.2", "127.0.0.1")]  # Nothing listens on the first one
+
+        events = []
+        base_url = f"http://yandex-disk.test:{port}/v1/disk/resources"
+        client = YandexDiskAPIClient(self.token, base_url=base_url, instrumentation=[events.append])
+        self.addCleanup(client.close)
+
+        with patch.object(socket, "getaddrinfo", getaddrinfo):
+            response = client._send("upload_file", "get", f"{base_url}/upload", {"path": "/a"}, 5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(events[0].dns)
+
+
+class TestAsyncYandexDiskAPIClient(unittest.TestCase):
+    """
+    Unit tests for asyncio client with mocked session
+    """
+
+    def setUp(self):
+        """Test setup"""
+        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+
+    @patch.object(requests.Session, 'put')
+    def test_create_folder_success_201(self, mock_put):
+        """Should return 201 from awaited create"""
+        mock_put.return_value = Mock(status_code=201)
+
+        client = AsyncYandexDiskAPIClient(self.token)
+
+        async def scenario():
+            async with client:
+                return await client.create_folder("/test_folder")
+
+        response = asyncio.run(scenario())
+
+        self.assertEqual(response.status_code, 201)
+        mock_put.assert_called_once_with(
+            client.base_url,
+            headers=client.headers,
+            params={"path": "/test_folder"},
+            timeout=30
+        )
+
+    @patch.object(requests.Session, 'put')
+    def test_aclose_does_not_block_event_loop(self, mock_put):
+        """Should keep other coroutines running while in-flight requests finish"""
+        release = threading.Event()
+        mock_put.side_effect = lambda *args, **kwargs: release.wait(5) and Mock(status_code=201)
+        client = AsyncYandexDiskAPIClient(self.token)
+
+        async def scenario():
+            request = asyncio.ensure_future(client.create_folder("/slow"))
+            await asyncio.sleep(0.01)
+            closing = asyncio.ensure_future(client.aclose())
+            await asyncio.sleep(0.01)
+            ran_while_closing = not closing.done()
+            release.set()
+            await closing
+            return ran_while_closing, (await request).status_code
+
+        self.assertEqual(asyncio.run(scenario()), (True, 201))
+
+    @patch.object(requests.Session, 'get')
+    def test_list_files_passes_paging(self, mock_get):
+        """Should forward limit and offset to files listing"""
+        mock_get.return_value = Mock(status_code=200)
+
+        async def scenario():
+            async with AsyncYandexDiskAPIClient(self.token) as client:
+                return await client.list_files(limit=5, offset=10)
+
+        asyncio.run(scenario())
+
+        self.assertEqual(mock_get.call_args[1]["params"], {"limit": 5, "offset": 10})
+
+    @patch.object(requests.Session, 'put')
+    def test_concurrency_is_bounded(self, mock_put):
+        """Should keep at most `concurrency` requests in flight and overlap them"""
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_put(*args, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.05)
+            with lock:
+                in_flight -= 1
+            return Mock(status_code=201)
+
+        mock_put.side_effect = slow_put
+
+        async def scenario():
+            async with AsyncYandexDiskAPIClient(self.token, concurrency=4) as client:
+                return await asyncio.gather(*(client.create_folder(f"/tenant_{i}") for i in range(16)))
+
+        started = time.perf_counter()
+        responses = asyncio.run(scenario())
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual([r.status_code for r in responses], [201] * 16)
+        self.assertEqual(peak, 4)
+        self.assertLess(elapsed, 16 * 0.05 / 2)
+
+
 class TestYandexDiskAPIReal(unittest.TestCase):
     """
     Integration tests with real Yandex.Disk API
-    Requires valid OAuth token and internet connection
+    Requires valid OAuth token and internet connection,
+    or YANDEX_DISK_FAKE=1 to run against the offline fake server
     """
 
+    token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
+    use_fake = False
+
+    @classmethod
+    def setUpClass(cls):
+        """Start offline fake server when requested"""
+        cls.fake = None
+        cls.base_url = "https://cloud-api.yandex.net/v1/disk/resources"
+        if cls.use_fake or os.environ.get("YANDEX_DISK_FAKE"):
+            from yandex2taskserver import FakeYandexDiskServer
+            cls.fake = FakeYandexDiskServer(tokens=[cls.token]).start()
+            cls.base_url = cls.fake.base_url
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.fake is not None:
+            cls.fake.stop()
+
     def setUp(self):
         """Test setup with unique folder names"""
-        self.token = "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
-        self.client = YandexDiskAPIClient(self.token)
+        self.client = YandexDiskAPIClient(self.token, base_url=self.base_url)
+        self.addCleanup(self.client.close)
         self.test_folder = f"/test_api_{int(time.time())}_{hash(self)}"
 
     def tearDown(self):
@@ -290,7 +2301,7 @@ class TestYandexDiskAPIReal(unittest.TestCase):
     def _safe_delete_folder(self, path: str):
         """Safely delete folder ignoring errors"""
         try:
-            self.client.delete_folder(path, timeout=5)
+            self.client.delete_tree([path], timeout=5, wait_timeout=30)
         except (requests.exceptions.RequestException, KeyError):
             pass  # Folder might not exist or already deleted
 
@@ -344,7 +2355,7 @@ class TestYandexDiskAPIReal(unittest.TestCase):
     def test_create_folder_with_invalid_token(self):
         """Should reject request with invalid token"""
         # Arrange
-        invalid_client = YandexDiskAPIClient("invalid_token_12345")
+        invalid_client = YandexDiskAPIClient("invalid_token_12345", base_url=self.base_url)
 
         # Act
         response = invalid_client.create_folder(self.test_folder)
@@ -391,16 +2402,83 @@ class TestYandexDiskAPIReal(unittest.TestCase):
             self.addCleanup(lambda: self._safe_delete_folder(self.test_folder))
 
 
-class YandexDiskErrorCodes:
-    """Constants for Yandex.Disk API error codes"""
-    UNAUTHORIZED = "UnauthorizedError"
-    VALIDATION_ERROR = "FieldValidationError"
-    NOT_FOUND = "DiskNotFoundError"
-    ALREADY_EXISTS_DIRECTORY = "DiskPathPointsToExistentDirectoryError"
-    ALREADY_EXISTS_RESOURCE = "DiskPathPointsToExistentResourceError"  # Альтернативное название
-    PATH_POINTS_TO_FILE = "DiskPathPointsToFileError"
-    TOO_MANY_REQUESTS = "TooManyRequestsError"
-    INSUFFICIENT_STORAGE = "DiskSpaceExhaustedError"
+class TestYandexDiskAPIFake(TestYandexDiskAPIReal):
+    """
+    Real API tests replayed against offline fake server,
+    plus its latency, failure injection and throttling knobs
+    """
+
+    use_fake = True
+
+    def setUp(self):
+        """Test setup on a clean fake disk"""
+        self.fake.reset()
+        self.fake.latency = 0.0
+        self.fake.rate_limit = None
+        super().setUp()
+
+    def test_missing_parent_not_found(self):
+        """Should answer 404 DiskNotFoundError when parent folder is missing"""
+        response = self.client.create_folder(f"{self.test_folder}/child")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["error"], YandexDiskErrorCodes.NOT_FOUND)
+
+    def test_create_folder_over_file(self):
+        """Should answer DiskPathPointsToFileError and not descend below the file"""
+        self.fake.disk.put_file(self.test_folder, b"data")
+
+        response = self.client.create_folder(self.test_folder)
+        results = self.client.create_folders([f"{self.test_folder}/child"])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["error"], YandexDiskErrorCodes.PATH_POINTS_TO_FILE)
+        self.assertEqual(set(results), {self.test_folder})
+
+    def test_listing_and_async_delete(self):
+        """Should list created tree and delete non-empty folder via operation"""
+        self.client.create_folders([f"{self.test_folder}/a/b", f"{self.test_folder}/c"])
+
+        info = parse_response(self.client.get_folder_info(self.test_folder))
+        self.assertEqual([item.name for item in info.embedded.items], ["a", "c"])
+
+        self.fake.operation_polls = 1
+        self.addCleanup(setattr, self.fake, "operation_polls", 0)
+        self.client.operation_poller.interval = 0.01
+        self.assertEqual(self.client.delete_tree([self.test_folder], wait_timeout=5),
+                         {self.test_folder: "success"})
+        self.assertEqual(self.client.get_folder_info(self.test_folder).status_code, 404)
+        self.assertEqual(self.fake.requests.count(("DELETE", "/v1/disk/resources")), 1)
+
+    def test_injected_failure_retried(self):
+        """Should serve injected 500 once so retry policy recovers"""
+        self.fake.inject(500, "InternalServerError", method="PUT")
+        client = YandexDiskAPIClient(self.token, base_url=self.base_url,
+                                     retry_policy=RetryPolicy(base_delay=0.001))
+        self.addCleanup(client.close)
+
+        response = client.create_folder(self.test_folder)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([method for method, _ in self.fake.requests], ["PUT", "PUT"])
+
+    def test_throttling_reproduced(self):
+        """Should answer 429 with Retry-After above configured rate"""
+        self.fake.rate_limit = 2
+
+        statuses = [self.client.get_folder_info("/").status_code for _ in range(4)]
+
+        self.assertIn(429, statuses)
+        self.assertEqual(statuses[:2], [200, 200])
+
+    def test_injected_latency(self):
+        """Should delay every request by configured latency"""
+        self.fake.latency = 0.05
+
+        started = time.perf_counter()
+        self.client.get_folder_info("/")
+
+        self.assertGreaterEqual(time.perf_counter() - started, 0.05)
 
 
 def run_tests():
@@ -413,6 +2491,28 @@ def run_tests():
 
     # Mocked tests (fast, isolated)
     mocked_suite = loader.loadTestsFromTestCase(TestYandexDiskAPIMocked)
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestYandexDiskAPIClientSession))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestYandexDiskBulkCreate))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestYandexDiskFilesIterator))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestRateLimiter))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestRetryPolicy))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestMetadataCache))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestConditionalRequests))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestCompactFileItems))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestResourceModels))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestTreeSync))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestDeleteTree))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestFileTransfers))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestListingIndex))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestOperationJournal))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestLazyImports))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestCommandLine))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestCircuitBreaker))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestThreadSafety))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestRequestCoalescing))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestInstrumentation))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestAsyncYandexDiskAPIClient))
+    mocked_suite.addTests(loader.loadTestsFromTestCase(TestYandexDiskAPIFake))
 
     # Real API tests (integration)
     real_suite = loader.loadTestsFromTestCase(TestYandexDiskAPIReal)
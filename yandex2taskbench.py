@@ -0,0 +1,551 @@
+"""
+Benchmarks for Yandex.Disk REST API client
+Runs against a local stub HTTP server, no network or token required
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from yandex2taskclient import (AsyncYandexDiskAPIClient, LatencyHistogram, YandexDiskAPIClient,
+                               decode_file_items, orjson)
+from yandex2taskserver import FakeYandexDiskServer
+
+
+class StubYandexDiskHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive capable handler answering like resources endpoint"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def _reply(self, status_code: int, payload: dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_PUT(self):
+        if self.path.startswith("/upload"):
+            remaining = int(self.headers["Content-Length"])
+            while remaining:
+                remaining -= len(self.rfile.read(min(remaining, 1024 * 1024)))
+        self._reply(201, {"href": self.path, "method": "GET", "templated": False})
+
+    def do_GET(self):
+        if self.path.startswith("/v1/disk/resources/upload"):
+            host = f"http://127.0.0.1:{self.server.server_address[1]}"
+            self._reply(200, {"href": f"{host}/upload/bench", "method": "PUT", "templated": False})
+            return
+        self._reply(200, {"path": self.path, "type": "dir", "items": []})
+
+    def do_DELETE(self):
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_stub_server() -> ThreadingHTTPServer:
+    """Start stub server on a free local port in a daemon thread"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubYandexDiskHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _measure(call, iterations: int) -> list:
+    """Return per-call latencies in milliseconds"""
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def _report(title: str, latencies: list):
+    print(f"{title:<28} mean {statistics.mean(latencies):7.3f} ms   "
+          f"median {statistics.median(latencies):7.3f} ms   max {max(latencies):7.3f} ms")
+
+
+def benchmark_connection_pooling(iterations: int = 500):
+    """Compare per-call latency of one-shot requests against pooled session"""
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1/disk/resources"
+    headers = {"Authorization": "OAuth stub", "Content-Type": "application/json"}
+
+    try:
+        before = _measure(
+            lambda: requests.get(base_url, headers=headers, params={"path": "/bench"}, timeout=30),
+            iterations
+        )
+        with YandexDiskAPIClient("stub", base_url=base_url) as client:
+            client.get_folder_info("/bench")  # Warm up pooled connection
+            after = _measure(lambda: client.get_folder_info("/bench"), iterations)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    print(f"\n🔌 CONNECTION POOLING ({iterations} GET calls)")
+    print("-" * 50)
+    _report("Before (requests.get):", before)
+    _report("After (pooled session):", after)
+    print(f"Speedup: {statistics.mean(before) / statistics.mean(after):.2f}x")
+
+
+def _listing_body(count: int) -> bytes:
+    """Files listing payload shaped like the real API"""
+    items = [
+        {
+            "path": f"disk:/bench/file_{i}.bin", "name": f"file_{i}.bin", "type": "file",
+            "size": i * 1024, "created": "2024-01-01T00:00:00+00:00", "modified": "2024-01-02T00:00:00+00:00",
+            "md5": "d41d8cd98f00b204e9800998ecf8427e", "mime_type": "application/octet-stream",
+            "resource_id": f"1234:{i:064x}", "revision": 1700000000000000 + i,
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"items": items, "limit": count, "offset": 0}).encode("utf-8")
+
+
+def _measure_decode(decode, body: bytes, rounds: int) -> tuple:
+    """Return (mean milliseconds per decode, peak KiB retained by result)"""
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(body)
+    elapsed = (time.perf_counter() - started) * 1000 / rounds
+
+    tracemalloc.start()
+    result = decode(body)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, size / 1024
+
+
+def benchmark_json_decoding(count: int = 10000, rounds: int = 20):
+    """Compare full dict decoding against compact FileItem records"""
+    body = _listing_body(count)
+    backend = "orjson" if orjson else "json"
+
+    full_ms, full_kib = _measure_decode(lambda b: json.loads(b)["items"], body, rounds)
+    compact_ms, compact_kib = _measure_decode(decode_file_items, body, rounds)
+
+    print(f"\n🧾 FILES LISTING DECODING ({count} items, {len(body) / 1024:.0f} KiB body)")
+    print("-" * 50)
+    print(f"{'json.loads dicts:':<28} {full_ms:8.2f} ms   {full_kib:9.0f} KiB retained")
+    print(f"{f'{backend} + FileItem:':<28} {compact_ms:8.2f} ms   {compact_kib:9.0f} KiB retained")
+
+
+_UPLOAD_SCRIPT = """
+import resource, sys
+from yandex2taskclient import YandexDiskAPIClient
+base_url, path, mode = sys.argv[1:4]
+with YandexDiskAPIClient("stub", base_url=base_url) as client:
+    if mode == "bytes":
+        with open(path, "rb") as f:
+            data = f.read()
+        client.session.put(client.base_url.replace("/v1/disk/resources", "/upload/bench"), data=data)
+    else:
+        client.upload_file(path, "/bench.bin", memory_map=mode == "mmap")
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def benchmark_upload_memory(sizes_mb: tuple = (16, 64, 256)):
+    """Peak RSS of a process uploading files of growing size"""
+    server = start_stub_server()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1/disk/resources"
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    print("\n📦 UPLOAD PEAK RSS (child process, MiB)")
+    print("-" * 50)
+    print(f"{'File size':<12}{'read() bytes':>14}{'chunked':>14}{'mmap':>14}")
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for size_mb in sizes_mb:
+                path = os.path.join(workdir, f"artifact_{size_mb}.bin")
+                with open(path, "wb") as f:
+                    block = os.urandom(1024 * 1024)
+                    for _ in range(size_mb):
+                        f.write(block)
+                row = []
+                for mode in ("bytes", "chunked", "mmap"):
+                    output = subprocess.run(
+                        [sys.executable, "-c", _UPLOAD_SCRIPT, base_url, path, mode],
+                        cwd=here, capture_output=True, text=True, check=True
+                    ).stdout
+                    row.append(int(output.split()[-1]) / 1024)  # ru_maxrss is KiB on Linux
+                print(f"{f'{size_mb} MiB':<12}" + "".join(f"{value:>14.1f}" for value in row))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+LOAD_TOKEN = "bench"
+DEFAULT_MIX = {"create": 4, "info": 3, "list": 2, "delete": 1}
+
+
+def load_schedule(requests_count: int, mix: Dict[str, float], seed: int = 0) -> List[Tuple[str, str]]:
+    """Deterministic (operation, path) sequence following the weighted mix
+
+    Info and delete target folders created earlier in the schedule. The
+    runners start a step only after the previous step on the same path has
+    finished (see _predecessors), so the same seed yields the same hit/miss
+    pattern at any concurrency.
+    """
+    rng = random.Random(seed)
+    operations, weights = zip(*mix.items())
+    created = []
+    schedule = []
+    for i in range(requests_count):
+        operation = rng.choices(operations, weights)[0]
+        if operation == "list":
+            path = "/load"
+        elif operation == "create" or not created:
+            operation, path = "create", f"/load/folder_{i}"
+            created.append(path)
+        else:
+            path = created.pop(rng.randrange(len(created))) if operation == "delete" else rng.choice(created)
+        schedule.append((operation, path))
+    return schedule
+
+
+def _predecessors(schedule: List[Tuple[str, str]]) -> List[Optional[int]]:
+    """Index of the previous step on the same folder for every step (lists are independent)"""
+    last: Dict[str, int] = {}
+    previous = []
+    for index, (operation, path) in enumerate(schedule):
+        if operation == "list":
+            previous.append(None)
+            continue
+        previous.append(last.get(path))
+        last[path] = index
+    return previous
+
+
+class LoadStats:
+    """Per-operation latency histograms and outcome counters of one run"""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, operation: str, seconds: float, status: str, error: bool):
+        self.histograms.setdefault(operation, LatencyHistogram()).record(seconds)
+        counts = self.statuses.setdefault(operation, {})
+        counts[status] = counts.get(status, 0) + 1
+        self.errors[operation] = self.errors.get(operation, 0) + error
+
+    def summary(self, seconds: float) -> dict:
+        overall = LatencyHistogram()
+        by_operation = {}
+        for operation, histogram in sorted(self.histograms.items()):
+            for lowest, count in histogram.buckets.items():
+                overall.buckets[lowest] = overall.buckets.get(lowest, 0) + count
+            overall.count += histogram.count
+            overall.sum += histogram.sum
+            overall.min = histogram.min if overall.min is None else min(overall.min, histogram.min)
+            overall.max = histogram.max if overall.max is None else max(overall.max, histogram.max)
+            by_operation[operation] = {
+                "count": histogram.count,
+                "errors": self.errors[operation],
+                "latency_ms": _latency_ms(histogram),
+                "statuses": dict(sorted(self.statuses[operation].items())),
+            }
+        errors = sum(self.errors.values())
+        return {
+            "operations": overall.count,
+            "seconds": round(seconds, 4),
+            "ops_per_second": round(overall.count / seconds, 1) if seconds else None,
+            "errors": errors,
+            "error_rate": round(errors / overall.count, 4) if overall.count else 0.0,
+            "latency_ms": _latency_ms(overall),
+            "by_operation": by_operation,
+        }
+
+
+def _latency_ms(histogram: LatencyHistogram) -> dict:
+    return {name: round(histogram.percentile(quantile) * 1000, 3)
+            for name, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))}
+
+
+def _outcome(call) -> Tuple[float, str, bool]:
+    """Run request; return (seconds, status label, is error)"""
+    started = time.perf_counter()
+    try:
+        status_code = call().status_code
+    except requests.exceptions.RequestException as error:
+        return time.perf_counter() - started, type(error).__name__, True
+    return time.perf_counter() - started, str(status_code), status_code >= 400
+
+
+def _sync_call(client: YandexDiskAPIClient, operation: str, path: str):
+    if operation == "create":
+        return lambda: client.create_folder(path)
+    if operation == "info":
+        return lambda: client.get_folder_info(path)
+    if operation == "list":
+        return lambda: client.list_files(limit=100)
+    return lambda: client.delete_folder(path)
+
+
+def _run_sync(base_url: str, schedule: List[Tuple[str, str]], concurrency: int) -> Tuple[LoadStats, float]:
+    """Shared pooled client driven by `concurrency` threads"""
+    stats = LoadStats()
+    previous = _predecessors(schedule)
+    finished = [threading.Event() for _ in schedule]
+    with YandexDiskAPIClient(LOAD_TOKEN, base_url=base_url, pool_maxsize=concurrency) as client:
+        def run(index: int):
+            operation, path = schedule[index]
+            if previous[index] is not None:
+                finished[previous[index]].wait()  # Picked up earlier by the FIFO pool, so never blocked by us
+            try:
+                seconds, status, error = _outcome(_sync_call(client, operation, path))
+            finally:
+                finished[index].set()
+            return operation, seconds, status, error
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for result in pool.map(run, range(len(schedule))):
+                stats.record(*result)
+        return stats, time.perf_counter() - started
+
+
+def _run_async(base_url: str, schedule: List[Tuple[str, str]], concurrency: int) -> Tuple[LoadStats, float]:
+    """AsyncYandexDiskAPIClient with `concurrency` requests in flight"""
+    stats = LoadStats()
+    previous = _predecessors(schedule)
+
+    async def drive():
+        in_flight = asyncio.Semaphore(concurrency)  # Time requests, not the queue in front of them
+        finished = [asyncio.Event() for _ in schedule]
+        async with AsyncYandexDiskAPIClient(LOAD_TOKEN, base_url=base_url, concurrency=concurrency) as client:
+            calls = {
+                "create": client.create_folder,
+                "info": client.get_folder_info,
+                "delete": client.delete_folder,
+            }
+
+            async def run(index: int):
+                operation, path = schedule[index]
+                if previous[index] is not None:
+                    await finished[previous[index]].wait()  # Before taking a slot, or waiters could hold them all
+                try:
+                    await measure(operation, path)
+                finally:
+                    finished[index].set()
+
+            async def measure(operation: str, path: str):
+                async with in_flight:
+                    started = time.perf_counter()
+                    try:
+                        if operation == "list":
+                            response = await client.list_files(limit=100)
+                        else:
+                            response = await calls[operation](path)
+                    except requests.exceptions.RequestException as error:
+                        stats.record(operation, time.perf_counter() - started, type(error).__name__, True)
+                        return
+                stats.record(operation, time.perf_counter() - started, str(response.status_code),
+                             response.status_code >= 400)
+
+            await asyncio.gather(*(run(index) for index in range(len(schedule))))
+
+    started = time.perf_counter()
+    asyncio.run(drive())
+    return stats, time.perf_counter() - started
+
+
+LOAD_VARIANTS = {"sync": _run_sync, "async": _run_async}
+
+
+def benchmark_load(concurrency: Tuple[int, ...] = (1, 8, 32), requests_count: int = 1000,
+                   mix: Optional[Dict[str, float]] = None, latency: float = 0.0,
+                   failure_rate: float = 0.0, variants: Tuple[str, ...] = ("sync", "async"),
+                   seed: int = 0) -> dict:
+    """Drive clients against the fake server; return JSON-ready report
+
+    Each (variant, concurrency) run starts from an empty fake disk holding
+    only /load, replays the same seeded schedule and reports ops/s,
+    p50/p95/p99 latency and error rates overall and per operation.
+    4xx answers (e.g. 409 on create, 404 on info after delete) count as
+    errors, so error rates stay comparable between runs.
+    """
+    mix = mix or DEFAULT_MIX
+    schedule = load_schedule(requests_count, mix, seed)
+    report = {
+        "schema": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {"requests": requests_count, "mix": mix, "latency": latency,
+                   "failure_rate": failure_rate, "seed": seed},
+        "results": [],
+    }
+
+    print(f"\n🏋  LOAD TEST ({requests_count} ops, mix {mix}, latency {latency * 1000:g} ms)")
+    print("-" * 50)
+    print(f"{'Variant':<8}{'Workers':>8}{'ops/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}")
+    with FakeYandexDiskServer(tokens=[LOAD_TOKEN], failure_rate=failure_rate, seed=seed) as server:
+        for variant in variants:
+            for workers in concurrency:
+                server.reset()
+                server.latency = 0.0
+                server.disk.create_folder("/load")
+                server.latency = latency
+                stats, seconds = LOAD_VARIANTS[variant](server.base_url, schedule, workers)
+                result = {"variant": variant, "concurrency": workers, **stats.summary(seconds)}
+                report["results"].append(result)
+                latency_ms = result["latency_ms"]
+                print(f"{variant:<8}{workers:>8}{result['ops_per_second']:>10.1f}{latency_ms['p50']:>9.2f}"
+                      f"{latency_ms['p95']:>9.2f}{latency_ms['p99']:>9.2f}{result['error_rate']:>9.1%}")
+    return report
+
+
+def compare_load(report: dict, baseline: dict, tolerance: float = 0.1) -> List[str]:
+    """Regressions of ops/s or p99 beyond `tolerance` against baseline report"""
+    previous = {(r["variant"], r["concurrency"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["variant"], result["concurrency"]))
+        if before is None:
+            continue
+        name = f"{result['variant']} x{result['concurrency']}"
+        if result["ops_per_second"] < before["ops_per_second"] * (1 - tolerance):
+            regressions.append(f"{name}: ops/s {before['ops_per_second']} -> {result['ops_per_second']}")
+        if result["latency_ms"]["p99"] > before["latency_ms"]["p99"] * (1 + tolerance):
+            regressions.append(f"{name}: p99 {before['latency_ms']['p99']} -> {result['latency_ms']['p99']} ms")
+    return regressions
+
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        operation, _, weight = part.partition("=")
+        if operation not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"unknown operation {operation!r}")
+        mix[operation] = float(weight or 1)
+    return mix
+
+
+def run_load(argv: Optional[List[str]] = None) -> int:
+    """Command line entry of the load test; exit code 1 on regression"""
+    parser = argparse.ArgumentParser(description="Load test YandexDiskAPIClient against fake server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--mix", type=_parse_mix, default=None, help="e.g. create=4,info=3,list=2,delete=1")
+    parser.add_argument("--latency", type=float, default=0.0, help="injected server latency, seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--variants", nargs="+", choices=sorted(LOAD_VARIANTS), default=["sync", "async"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON report to file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    report = benchmark_load(tuple(args.concurrency), args.requests, args.mix, args.latency,
+                            args.failure_rate, tuple(args.variants), args.seed)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_load(report, json.load(f))
+        for line in regressions:
+            print(f"❌ {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+def _import_profile(module: str) -> Tuple[float, List[Tuple[int, str]]]:
+    """Wall time and per-module cumulative microseconds of a cold interpreter importing module"""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    subprocess.run(command, env=env, capture_output=True, check=True)  # Populate __pycache__ first
+    start = time.perf_counter()
+    stderr = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stderr
+    wall_ms = (time.perf_counter() - start) * 1000
+    entries = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            entries.append((int(parts[1]), parts[2].strip()))
+    return wall_ms, entries
+
+
+def benchmark_import_time(modules: Tuple[str, ...] = ("yandex2taskclient", "yandex2task"), top: int = 5,
+                          budget_ms: Optional[float] = None) -> Dict[str, float]:
+    """Import cost of the client module compared with the test module that re-exports it"""
+    print("\n📦 Import time (python -X importtime, warm bytecode cache)")
+    baseline_ms, startup = _import_profile("sys")
+    startup_modules = {name for _, name in startup}  # site and .pth imports every interpreter pays
+    results = {}
+    for module in modules:
+        wall_ms, entries = _import_profile(module)
+        own_us = next((cumulative for cumulative, name in entries if name == module), 0)
+        results[module] = own_us / 1000
+        print(f"  {module:20} self+deps={own_us / 1000:7.1f}ms  process={wall_ms - baseline_ms:7.1f}ms over bare")
+        own_entries = [(cumulative, name) for cumulative, name in entries if name not in startup_modules]
+        for cumulative, name in sorted(own_entries, reverse=True)[:top]:
+            print(f"      {cumulative / 1000:7.1f}ms  {name}")
+
+    script = ("import time; start = time.perf_counter(); import yandex2taskclient; "
+              "imported = time.perf_counter(); yandex2taskclient.YandexDiskAPIClient('token'); "
+              "print((imported - start) * 1000, (time.perf_counter() - imported) * 1000)")
+    import_ms, construct_ms = map(float, subprocess.run([sys.executable, "-c", script], capture_output=True,
+                                                        text=True, check=True).stdout.split())
+    print(f"  import={import_ms:.1f}ms, first client construction (loads requests)={construct_ms:.1f}ms")
+    if budget_ms is not None:
+        status = "✅" if results[modules[0]] <= budget_ms else "❌"
+        print(f"  {status} budget {budget_ms:.1f}ms for {modules[0]}")
+    return results
+
+
+def run_import_time(argv: Optional[List[str]] = None) -> int:
+    """Command line entry of the import-time benchmark; exit code 1 over budget"""
+    parser = argparse.ArgumentParser(description="Measure import cost of the client module")
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+    results = benchmark_import_time(top=args.top, budget_ms=args.budget_ms)
+    if args.budget_ms is not None and results["yandex2taskclient"] > args.budget_ms:
+        return 1
+    return 0
+
+
+def run_benchmarks():
+    """Execute all benchmarks"""
+    print("⏱  YANDEX.DISK API CLIENT BENCHMARKS")
+    print("=" * 60)
+    benchmark_connection_pooling()
+    benchmark_json_decoding()
+    benchmark_upload_memory()
+    benchmark_load()
+    benchmark_import_time()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ["load"]:
+        sys.exit(run_load(sys.argv[2:]))
+    if sys.argv[1:2] == ["importtime"]:
+        sys.exit(run_import_time(sys.argv[2:]))
+    run_benchmarks()
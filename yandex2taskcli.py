@@ -0,0 +1,128 @@
+"""
+Command-line tool for bulk Yandex.Disk operations
+Reads paths one per line from stdin or a file and prints one JSON result per
+line as each request completes, e.g.
+
+    python yandex2taskcli.py create --workers 16 --rate 20 < folders.txt > results.ndjson
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from yandex2taskclient import ApiError, RateLimiter, RetryPolicy, YandexDiskAPIClient, parse_response
+
+OPERATIONS = {
+    "create": "create_folder",
+    "delete": "delete_folder",
+    "info": "get_folder_info",
+    "list": "list_folder",
+}
+
+# Throttling replies are retried even without --rate, when no rate limiter handles them
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def read_paths(lines: Iterable[str]) -> Iterator[str]:
+    """Stripped non-empty lines; the input is never held in memory as a whole"""
+    for line in lines:
+        path = line.strip()
+        if path:
+            yield path
+
+
+def result_record(operation: str, path: str, result: object) -> dict:
+    """JSON-serializable outcome of one operation on one path"""
+    record = {"op": operation, "path": path}
+    if isinstance(result, Exception):
+        record.update(ok=False, status=None, error=type(result).__name__, message=str(result))
+        return record
+    if operation == "list":
+        if result is None:
+            record.update(ok=False, status=404, error="DiskNotFoundError")
+        else:
+            record.update(ok=True, status=200, items=result)
+        return record
+
+    status = result.status_code
+    parsed = parse_response(result)
+    record.update(ok=not isinstance(parsed, ApiError), status=status)
+    if isinstance(parsed, ApiError):
+        record.update(error=parsed.error, message=parsed.message)
+    elif operation == "info":
+        record.update(type=parsed.type, size=parsed.size, modified=parsed.modified)
+    return record
+
+
+def build_client(args: argparse.Namespace) -> YandexDiskAPIClient:
+    """Client sized for `--workers` with optional rate limit and retries"""
+    return YandexDiskAPIClient(
+        args.token,
+        base_url=args.base_url,
+        pool_connections=args.workers,
+        pool_maxsize=args.workers,
+        rate_limiter=RateLimiter(args.rate, burst=1, max_rate=args.rate) if args.rate else None,
+        throttle_retries=args.retries,
+        retry_policy=RetryPolicy(max_attempts=args.retries + 1, statuses=RETRY_STATUSES) if args.retries else None,
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run Yandex.Disk operation over paths read one per line")
+    parser.add_argument("operation", choices=sorted(OPERATIONS))
+    parser.add_argument("input", nargs="?", default="-", help="file with paths, '-' for stdin (default)")
+    parser.add_argument("--workers", type=int, default=8, help="requests in flight (default 8)")
+    parser.add_argument("--rate", type=float, default=0.0, help="max requests per second, 0 for unlimited")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries of network errors, 5xx and throttling per path (default 2)")
+    parser.add_argument("--timeout", type=int, default=30, help="seconds per request")
+    parser.add_argument("--token", default=os.environ.get("YANDEX_DISK_TOKEN"),
+                        help="OAuth token (default $YANDEX_DISK_TOKEN)")
+    parser.add_argument("--base-url", default="https://cloud-api.yandex.net/v1/disk/resources")
+    args = parser.parse_args(argv)
+    if not args.token:
+        parser.error("token is required: pass --token or set YANDEX_DISK_TOKEN")
+    if args.workers < 1:
+        parser.error("--workers must be positive")
+    return args
+
+
+def run(args: argparse.Namespace, lines: Iterable[str], output: TextIO, errors: TextIO = sys.stderr) -> int:
+    """Stream results of `args.operation` to output; exit code 1 if any path failed"""
+    succeeded = failed = 0
+    client = build_client(args)
+    try:
+        results = client.map_concurrent(OPERATIONS[args.operation], read_paths(lines), workers=args.workers,
+                                        return_exceptions=True, timeout=args.timeout)
+        for path, result in results:
+            record = result_record(args.operation, path, result)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()  # Consumers tail the stream while the job runs
+            if record["ok"]:
+                succeeded += 1
+            else:
+                failed += 1
+    finally:
+        client.close()
+        print(f"{args.operation}: {succeeded} ok, {failed} failed", file=errors)
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    try:
+        if args.input == "-":
+            return run(args, sys.stdin, sys.stdout)
+        with open(args.input, encoding="utf-8") as lines:
+            return run(args, lines, sys.stdout)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:  # E.g. piped into head; silence the flush at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
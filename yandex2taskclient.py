@@ -0,0 +1,2288 @@
+"""
+Yandex.Disk REST API client
+Heavy dependencies (requests, asyncio, sqlite3, ...) are imported on first
+use, so importing this module stays cheap for short-lived processes
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import keyword
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from datetime import timedelta
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional, Union
+
+
+class _LazyModule:
+    """Stand-in for a module global that imports the module on first attribute access
+
+    The real module then replaces the stand-in in this module's globals, so
+    later lookups cost nothing extra.
+    """
+
+    def __init__(self, name: str, alias: Optional[str] = None):
+        self._name = name
+        self._alias = alias or name
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+asyncio = _LazyModule("asyncio")
+futures = _LazyModule("concurrent.futures", "futures")
+hashlib = _LazyModule("hashlib")
+mmap = _LazyModule("mmap")
+random = _LazyModule("random")
+requests = _LazyModule("requests")
+socket = _LazyModule("socket")
+sqlite3 = _LazyModule("sqlite3")
+
+
+def __getattr__(name: str):
+    if name == "CircuitOpenError":
+        return _circuit_open_error()
+    if name == "orjson":
+        return _orjson()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class YandexDiskErrorCodes:
+    """Constants for Yandex.Disk API error codes"""
+    UNAUTHORIZED = "UnauthorizedError"
+    VALIDATION_ERROR = "FieldValidationError"
+    NOT_FOUND = "DiskNotFoundError"
+    ALREADY_EXISTS_DIRECTORY = "DiskPathPointsToExistentDirectoryError"
+    ALREADY_EXISTS_RESOURCE = "DiskPathPointsToExistentResourceError"  # Альтернативное название
+    PATH_POINTS_TO_FILE = "DiskPathPointsToFileError"
+    TOO_MANY_REQUESTS = "TooManyRequestsError"
+    INSUFFICIENT_STORAGE = "DiskSpaceExhaustedError"
+
+
+@lru_cache(maxsize=None)
+def _orjson():
+    """Optional fast JSON backend, None when not installed"""
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
+
+
+def _json_loads(data):
+    """json.loads, through orjson when installed (resolved on first call)"""
+    global _json_loads
+    _json_loads = _orjson().loads if _orjson() else json.loads
+    return _json_loads(data)
+
+DEFAULT_ITEM_FIELDS = ("path", "name", "type")
+
+
+class RateLimiter:
+    """Thread-safe token bucket with AIMD rate adaptation
+
+    Each request takes one token; tokens refill at `rate` per second up to
+    `burst`. Every success raises the rate additively (by about `increase`
+    per second of traffic), every throttled response multiplies it by
+    `decrease` and, when the server sent Retry-After, pauses the bucket.
+    One instance can be shared by several clients and threads.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: Optional[float] = None, min_rate: float = 0.5,
+                 max_rate: Optional[float] = None, increase: float = 1.0, decrease: float = 0.5):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate or float("inf")
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Block until a token is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        """Additive increase after a request went through"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicative decrease after 429/503/TooManyRequestsError"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+
+class RetryPolicy:
+    """Retry transient failures with exponential backoff and full jitter
+
+    Attempt n (from 0) waits a random time in [0, min(max_delay, base_delay * 2**n)].
+    Network errors listed in `exceptions` (connection errors and timeouts by
+    default) and responses with `statuses` are retried until `max_attempts`
+    requests were sent.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.2, max_delay: float = 10.0,
+                 exceptions: Optional[Tuple[type, ...]] = None, statuses: Tuple[int, ...] = (500, 502, 504)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        if exceptions is None:
+            exceptions = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        self.exceptions = exceptions
+        self.statuses = statuses
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to sleep before retrying after failed `attempt`"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+@lru_cache(maxsize=None)
+def _circuit_open_error() -> type:
+    """CircuitOpenError, defined on first use since it derives from requests"""
+
+    class CircuitOpenError(requests.exceptions.RequestException):
+        """Request refused locally because the circuit breaker is open"""
+
+    CircuitOpenError.__module__ = __name__
+    CircuitOpenError.__qualname__ = "CircuitOpenError"
+    return CircuitOpenError
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker over a rolling window of request outcomes
+
+    Closed: requests pass and the last `window` outcomes are kept; a failure
+    is an exception, a 5xx answer or a call slower than `slow_call` seconds.
+    Once at least `min_requests` outcomes are known and failures reach
+    `failure_rate`, the circuit opens and requests fail at once with
+    CircuitOpenError. After `reset_timeout` seconds it turns half-open and
+    lets `half_open_probes` requests through: if all succeed it closes,
+    any failure opens it again. allow() returns a ticket naming the state it
+    admitted the request in; an outcome recorded with a ticket from an
+    earlier state (e.g. a slow request sent before the circuit opened) is
+    ignored. Each transition calls `on_state_change(old, new)` hooks. One
+    instance can be shared by several clients and threads.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_requests: int = 10,
+                 slow_call: Optional[float] = None, reset_timeout: float = 30.0, half_open_probes: int = 1,
+                 on_state_change: Iterable[Callable[[str, str], None]] = ()):
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.slow_call = slow_call
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.on_state_change = tuple(on_state_change)
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)  # True for failures
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0  # Half-open requests in flight
+        self._probe_successes = 0
+        self._generation = 0  # Bumped on every transition; tickets carry it
+        self._changes: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._expire()
+            state = self._state
+        self._notify()
+        return state
+
+    def _set_state(self, state: str):
+        self._changes.append((self._state, state))
+        self._state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._probes = self._probe_successes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+
+    def _expire(self):
+        if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.reset_timeout:
+            self._set_state(self.HALF_OPEN)
+
+    def _notify(self):
+        """Run hooks for transitions made under the lock, outside of it"""
+        with self._lock:
+            changes, self._changes = self._changes, []
+        for old, new in changes:
+            for hook in self.on_state_change:
+                hook(old, new)
+
+    def allow(self) -> int:
+        """Admit one request and return its ticket for record(), or raise CircuitOpenError"""
+        with self._lock:
+            self._expire()
+            state = self._state
+            ticket = self._generation
+            refused = state == self.OPEN or (state == self.HALF_OPEN and self._probes >= self.half_open_probes)
+            if refused:
+                self.rejected += 1
+            elif state == self.HALF_OPEN:
+                self._probes += 1
+        self._notify()
+        if refused:
+            raise _circuit_open_error()(f"Circuit breaker is {state}, request refused")
+        return ticket
+
+    def record(self, failed: bool, ticket: Optional[int] = None):
+        """Account outcome of an admitted request; stale tickets are ignored
+
+        Without a ticket the outcome counts against the current state.
+        """
+        with self._lock:
+            if ticket is not None and ticket != self._generation:
+                pass  # Admitted under an earlier state; not a probe, not in this window
+            elif self._state == self.HALF_OPEN:
+                self._probes -= 1
+                if failed:
+                    self._set_state(self.OPEN)
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._set_state(self.CLOSED)
+            elif self._state == self.CLOSED:
+                self._outcomes.append(failed)
+                if (len(self._outcomes) >= self.min_requests
+                        and sum(self._outcomes) >= self.failure_rate * len(self._outcomes)):
+                    self._set_state(self.OPEN)
+        self._notify()
+
+    def call(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """Send request through the breaker"""
+        ticket = self.allow()
+        started = time.monotonic()
+        try:
+            response = send()
+        except Exception:
+            self.record(True, ticket)
+            raise
+        slow = self.slow_call is not None and time.monotonic() - started > self.slow_call
+        self.record(response.status_code >= 500 or slow, ticket)
+        return response
+
+
+def _validator(response: requests.Response) -> Optional[str]:
+    """Entity tag for conditional requests: ETag header, else body md5/revision"""
+    etag = response.headers.get("ETag")
+    if etag:
+        return etag
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    token = body.get("md5") or body.get("revision")
+    return f'"{token}"' if token else None
+
+
+def _error_code(response: requests.Response) -> str:
+    """API error code from response body, or HTTP status when body has none"""
+    try:
+        error = response.json().get("error")
+    except ValueError:
+        error = None
+    return error or f"HTTP {response.status_code}"
+
+
+def _is_throttled(response: requests.Response) -> bool:
+    """Check response asks client to slow down"""
+    if response.status_code in (429, 503):
+        return True
+    if response.status_code != 403:
+        return False
+    try:
+        return response.json().get("error") == YandexDiskErrorCodes.TOO_MANY_REQUESTS
+    except ValueError:
+        return False
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    """Read Retry-After header in seconds, if present"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class MetadataCache:
+    """Thread-safe LRU cache with TTL for folder metadata responses
+
+    Keeps up to `maxsize` responses for `ttl` seconds. Counts hits, misses
+    and LRU evictions; expired entries count as misses.
+
+    With `revalidate` expired entries are kept so the client can revalidate
+    them with a conditional request (If-None-Match); files listings are then
+    cached too and always revalidated. `revalidated` counts 304 answers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30.0, revalidate: bool = False):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidated = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return path.rstrip("/") or "/"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str) -> Optional[requests.Response]:
+        """Return fresh cached response or None"""
+        key = self._key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None and not self.revalidate:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def peek(self, path: str) -> Optional[requests.Response]:
+        """Return cached response even if expired, without touching counters"""
+        with self._lock:
+            entry = self._entries.get(self._key(path))
+            return entry[1] if entry else None
+
+    def put(self, path: str, response: requests.Response):
+        """Store response, evicting least recently used entries over maxsize"""
+        key = self._key(path)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, path: str, descendants: bool = False):
+        """Drop path and its parent (whose listing embeds it), optionally whole subtree"""
+        key = self._key(path)
+        parent = key.rpartition("/")[0] or "/"
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries.pop(parent, None)
+            if descendants:
+                prefix = key.rstrip("/") + "/"
+                for stale in [k for k in self._entries if k.startswith(prefix)]:
+                    del self._entries[stale]
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+_PHASE_TIMINGS = threading.local()  # Phase durations of the request in flight on this thread
+
+
+@lru_cache(maxsize=None)
+def _timed_adapter_class() -> type:
+    """HTTPAdapter whose pools open connections that report phase timings"""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    from urllib3.exceptions import ConnectTimeoutError
+    from urllib3.util.connection import allowed_gai_family
+
+    class _TimedHTTPConnection(HTTPConnection):
+        """Connection recording DNS and TCP connect time of the current request"""
+
+        def _new_conn(self) -> socket.socket:
+            timings = getattr(_PHASE_TIMINGS, "current", None)
+            if timings is None:
+                return super()._new_conn()
+            host = self._dns_host
+            started = time.perf_counter()
+            try:
+                addresses = list(dict.fromkeys(
+                    info[4][0] for info in socket.getaddrinfo(host, self.port, allowed_gai_family(),
+                                                              socket.SOCK_STREAM)))
+            except socket.gaierror:
+                addresses = [host]  # Let urllib3 raise its own NameResolutionError
+            resolved = time.perf_counter()
+            timings["dns"] = resolved - started
+            try:
+                # Each resolved address in turn, like urllib3 does; TLS still verifies self.host
+                for index, address in enumerate(addresses):
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except ConnectTimeoutError:  # Also NewConnectionError
+                        if index + 1 == len(addresses):
+                            raise
+            finally:
+                self._dns_host = host
+                timings["connect"] = time.perf_counter() - resolved
+
+    class _TimedHTTPSConnection(_TimedHTTPConnection, HTTPSConnection):
+        """HTTPS connection additionally recording TLS handshake time"""
+
+        def connect(self):
+            timings = getattr(_PHASE_TIMINGS, "current", None)
+            if timings is None:
+                return super().connect()
+            started = time.perf_counter()
+            super().connect()
+            socket_time = timings.get("dns", 0.0) + timings.get("connect", 0.0)
+            timings["tls"] = max(time.perf_counter() - started - socket_time, 0.0)
+
+    class _TimedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = _TimedHTTPConnection
+
+    class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = _TimedHTTPSConnection
+
+    class _TimedHTTPAdapter(requests.adapters.HTTPAdapter):
+        """Adapter whose pools open connections that report phase timings"""
+
+        def init_poolmanager(self, *args, **kwargs):
+            super().init_poolmanager(*args, **kwargs)
+            self.poolmanager.pool_classes_by_scheme = {
+                "http": _TimedHTTPConnectionPool,
+                "https": _TimedHTTPSConnectionPool,
+            }
+
+    return _TimedHTTPAdapter
+
+
+class RequestEvent:
+    """One HTTP request as seen by instrumentation hooks
+
+    Phase durations are in seconds; dns, connect and tls are None when a
+    pooled connection was reused, ttfb is None when no response arrived.
+    `error` is the API error code of a 4xx/5xx answer or the exception
+    class name when the request failed before any response. `circuit` is
+    the client's circuit breaker state after the request, if it has one.
+    """
+
+    __slots__ = ("operation", "method", "status_code", "error", "dns", "connect", "tls", "ttfb", "total",
+                 "circuit")
+
+    PHASES = ("dns", "connect", "tls", "ttfb", "total")
+
+    def __init__(self, operation: str, method: str, status_code: Optional[int], error: Optional[str],
+                 timings: Dict[str, float], total: float, circuit: Optional[str] = None):
+        self.operation = operation
+        self.method = method
+        self.status_code = status_code
+        self.error = error
+        self.dns = timings.get("dns")
+        self.connect = timings.get("connect")
+        self.tls = timings.get("tls")
+        self.ttfb = timings.get("ttfb")
+        self.total = total
+        self.circuit = circuit
+
+    def __repr__(self) -> str:
+        return (f"RequestEvent({self.operation!r}, {self.method} -> {self.status_code}, "
+                f"error={self.error!r}, total={self.total:.6f})")
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of durations
+
+    Values are counted in microsecond ticks; each power of two is split into
+    2 ** precision_bits buckets, so reported percentiles are within about
+    2 ** -precision_bits relative error while memory stays logarithmic in
+    the observed range.
+    """
+
+    def __init__(self, precision_bits: int = 6, unit: float = 1e-6):
+        self.precision_bits = precision_bits
+        self.unit = unit
+        self.buckets: Dict[int, int] = {}  # Lowest tick of bucket -> observations
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _width(self, ticks: int) -> int:
+        return 1 << max(ticks.bit_length() - self.precision_bits - 1, 0)
+
+    def record(self, seconds: float):
+        ticks = max(int(seconds / self.unit), 0)
+        width = self._width(ticks)
+        lowest = ticks - ticks % width
+        self.buckets[lowest] = self.buckets.get(lowest, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """Value below which `quantile` (0..1) of observations fall"""
+        if not self.count:
+            return None
+        rank = max(int(quantile * self.count + 0.999999), 1)
+        seen = 0
+        for lowest in sorted(self.buckets):
+            seen += self.buckets[lowest]
+            if seen >= rank:
+                middle = (lowest + (self._width(lowest) - 1) / 2) * self.unit
+                return min(max(middle, self.min), self.max)
+        return self.max
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.9, 0.95, 0.99)) -> dict:
+        result = {"count": self.count, "sum": self.sum, "min": self.min, "max": self.max}
+        for quantile in quantiles:
+            result[f"p{quantile * 100:g}"] = self.percentile(quantile)
+        return result
+
+
+class RequestMetrics:
+    """Instrumentation hook aggregating RequestEvents per operation
+
+    Keeps a LatencyHistogram per operation and phase plus counters of
+    (status, error) outcomes; exports them as JSON or Prometheus text.
+    """
+
+    QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+    def __init__(self, precision_bits: int = 6):
+        self.precision_bits = precision_bits
+        self.histograms: Dict[Tuple[str, str], LatencyHistogram] = {}
+        self.outcomes: Counter = Counter()  # (operation, status, error) -> requests
+        self.circuit_state: Optional[str] = None  # As of the latest event
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent):
+        with self._lock:
+            for phase in RequestEvent.PHASES:
+                value = getattr(event, phase)
+                if value is None:
+                    continue
+                key = (event.operation, phase)
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = LatencyHistogram(self.precision_bits)
+                histogram.record(value)
+            self.outcomes[(event.operation, event.status_code, event.error)] += 1
+            if event.circuit is not None:
+                self.circuit_state = event.circuit
+
+    def snapshot(self) -> dict:
+        """Per operation request counts, outcomes and phase summaries"""
+        with self._lock:
+            result: Dict[str, dict] = {}
+            for (operation, status, error), count in sorted(self.outcomes.items(), key=str):
+                entry = result.setdefault(operation, {"requests": 0, "outcomes": [], "phases": {}})
+                entry["requests"] += count
+                entry["outcomes"].append({"status": status, "error": error, "count": count})
+            for (operation, phase), histogram in sorted(self.histograms.items()):
+                entry = result.setdefault(operation, {"requests": 0, "outcomes": [], "phases": {}})
+                entry["phases"][phase] = histogram.summary(self.QUANTILES)
+            return result
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix: str = "yandex_disk") -> str:
+        """Prometheus text exposition: a latency summary and a request counter"""
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Yandex.Disk API request phase duration",
+            f"# TYPE {prefix}_request_duration_seconds summary",
+        ]
+        with self._lock:
+            for (operation, phase), histogram in sorted(self.histograms.items()):
+                labels = f'operation="{operation}",phase="{phase}"'
+                for quantile in self.QUANTILES:
+                    lines.append(f'{prefix}_request_duration_seconds{{{labels},quantile="{quantile:g}"}} '
+                                 f"{histogram.percentile(quantile):.6f}")
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {histogram.count}")
+            lines.append(f"# HELP {prefix}_requests_total Yandex.Disk API requests by outcome")
+            lines.append(f"# TYPE {prefix}_requests_total counter")
+            for (operation, status, error), count in sorted(self.outcomes.items(), key=str):
+                labels = f'operation="{operation}",status="{status or ""}",error="{error or ""}"'
+                lines.append(f"{prefix}_requests_total{{{labels}}} {count}")
+            if self.circuit_state is not None:
+                lines.append(f"# HELP {prefix}_circuit_state Circuit breaker state (1 for the current one)")
+                lines.append(f"# TYPE {prefix}_circuit_state gauge")
+                for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+                    lines.append(f'{prefix}_circuit_state{{state="{state}"}} {int(state == self.circuit_state)}')
+        return "\n".join(lines) + "\n"
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls into one execution
+
+    While a call for `key` runs, other threads asking for the same key wait
+    for it and receive the same result (or exception) instead of issuing
+    their own. Finished calls are forgotten, so this never serves stale data.
+    """
+
+    def __init__(self):
+        self._calls: Dict[object, futures.Future] = {}
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.shared = 0
+
+    def do(self, key, call: Callable[[], object]):
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.shared += 1
+                leader = False
+            else:
+                future = self._calls[key] = futures.Future()
+                self.executed += 1
+                leader = True
+        if leader:
+            try:
+                future.set_result(call())
+            except BaseException as error:
+                future.set_exception(error)
+            finally:
+                with self._lock:
+                    del self._calls[key]
+        return future.result()
+
+
+class _SiblingBatcher:
+    """Answer existence checks of many siblings with one parent listing
+
+    The first check for a folder's child opens a `window`; checks for other
+    children of the same folder arriving meanwhile join it. When the window
+    closes, more than `threshold` children are resolved from a listing of the
+    parent, fewer fall back to individual (coalesced) info requests.
+    """
+
+    def __init__(self, client: "YandexDiskAPIClient", threshold: int, window: float):
+        self.client = client
+        self.threshold = threshold
+        self.window = window
+        self._groups: Dict[str, Dict[str, futures.Future]] = {}
+        self._lock = threading.Lock()
+
+    def exists(self, path: str, timeout: int) -> bool:
+        parent, _, name = path.rstrip("/").rpartition("/")
+        parent = parent or "/"
+        with self._lock:
+            group = self._groups.get(parent)
+            leader = group is None
+            if leader:
+                group = self._groups[parent] = {}
+            future = group.get(name)
+            if future is None:
+                future = group[name] = futures.Future()
+        if leader:
+            time.sleep(self.window)
+            with self._lock:
+                del self._groups[parent]
+            self._resolve(parent, group, timeout)
+        found = future.result()
+        if found is None:  # Group too small to batch
+            return self.client._info_exists(path, timeout)
+        return found
+
+    def _resolve(self, parent: str, group: Dict[str, futures.Future], timeout: int):
+        if len(group) <= self.threshold:
+            for future in group.values():
+                future.set_result(None)
+            return
+        try:
+            names = self.client._child_names(parent, timeout)
+        except Exception as error:
+            for future in group.values():
+                future.set_exception(error)
+            return
+        for name, future in group.items():
+            future.set_result(name in names)
+
+
+class YandexDiskAPIClient:
+    """Client for Yandex.Disk API operations
+
+    All calls go through one owned ``requests.Session`` whose connection pool
+    keeps TCP/TLS connections to the API alive between requests. Close the
+    client (or use it as a context manager) to release pooled connections.
+
+    With a `rate_limiter` every request takes a token first; throttled
+    responses slow the limiter down and are re-sent up to `throttle_retries`
+    times before being returned to the caller.
+
+    With a `retry_policy` transient network errors are retried with jittered
+    backoff. Folder create/delete are idempotent: if a retried create gets
+    409 "already exists" or a retried delete gets 404, an earlier attempt
+    has already done the job, and the response is reported as 201 / 204.
+
+    With a `metadata_cache` get_folder_info answers 200/404 from cache;
+    create_folder and delete_folder (with its subtree) invalidate entries.
+    A revalidating cache also turns expired info and files listing requests
+    into conditional GETs answered from cache on 304 Not Modified.
+
+    Every HTTP request is reported as a RequestEvent to each callable in
+    `instrumentation` (e.g. a RequestMetrics); without hooks nothing is timed.
+
+    One instance may be shared by any number of threads: headers are
+    read-only, each thread sends through its own pooled session and shared
+    helpers (cache, limiter, poller) lock internally. map_concurrent runs
+    any operation over many paths on a thread pool.
+
+    A `circuit_breaker` stops sending while the API is failing: requests
+    raise CircuitOpenError at once instead of waiting for their timeout.
+
+    Concurrent get_folder_info/get_resource calls for the same path share
+    one request and result. With `batch_siblings=K`, folder_exists checks
+    for more than K children of one folder within `batch_window` seconds
+    are answered by a single listing of the parent.
+    """
+
+    def __init__(self, token: str, base_url: str = "https://cloud-api.yandex.net/v1/disk/resources",
+                 pool_connections: int = 10, pool_maxsize: int = 10, max_retries: int = 0,
+                 keep_alive: bool = True, rate_limiter: Optional[RateLimiter] = None,
+                 throttle_retries: int = 5, retry_policy: Optional[RetryPolicy] = None,
+                 metadata_cache: Optional[MetadataCache] = None,
+                 instrumentation: Iterable[Callable[[RequestEvent], None]] = (),
+                 batch_siblings: Optional[int] = None, batch_window: float = 0.005,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        self.base_url = base_url
+        self.headers = MappingProxyType({
+            "Authorization": f"OAuth {token}",
+            "Content-Type": "application/json"
+        })
+        self.pool_maxsize = pool_maxsize
+        self.rate_limiter = rate_limiter
+        self.throttle_retries = throttle_retries
+        self.retry_policy = retry_policy
+        self.metadata_cache = metadata_cache
+        self.instrumentation = tuple(instrumentation)
+        self.circuit_breaker = circuit_breaker
+        self.keep_alive = keep_alive
+        self._adapter = self._create_adapter(pool_connections, pool_maxsize, max_retries, bool(self.instrumentation))
+        self._local = threading.local()
+        self._sessions: List[Tuple[threading.Thread, requests.Session]] = []
+        self._poller = None
+        self._lock = threading.Lock()
+        self.session  # Creating thread gets its session up front
+        self._inflight = SingleFlight()
+        self._batcher = _SiblingBatcher(self, batch_siblings, batch_window) if batch_siblings else None
+
+    @staticmethod
+    def _create_adapter(pool_connections: int, pool_maxsize: int, max_retries: int,
+                        timed: bool = False) -> requests.adapters.HTTPAdapter:
+        """Create adapter owning the sized connection pools"""
+        return (_timed_adapter_class() if timed else requests.adapters.HTTPAdapter)(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=max_retries
+        )
+
+    def _create_session(self) -> requests.Session:
+        """Create session with the client's adapter mounted for http and https"""
+        session = requests.Session()
+        session.mount("https://", self._adapter)
+        session.mount("http://", self._adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """Pooled session of the calling thread
+
+        requests.Session is not documented as thread-safe, so every thread
+        gets its own; all of them share one adapter, whose urllib3 pools are,
+        so warm keep-alive connections outlive the threads that opened them.
+        Sessions of finished threads are dropped when the next one is created.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = self._create_session()
+            with self._lock:
+                alive = [(thread, other) for thread, other in self._sessions if thread.is_alive()]
+                self._sessions = alive + [(threading.current_thread(), session)]
+        return session
+
+    def close(self):
+        """Stop operation poller and close pooled connections of all threads"""
+        if self._poller is not None:
+            self._poller.close()
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for _, session in sessions:
+            session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _send(self, operation: str, method: str, url: str, params: dict, timeout: int,
+              applied_if: Optional[Callable[[requests.Response], bool]] = None,
+              applied_status: int = 200, headers: Optional[dict] = None) -> requests.Response:
+        """Send request, retrying transient failures per retry policy
+
+        `applied_if` recognises a response to a retried attempt which means an
+        earlier attempt already succeeded; it is reported as `applied_status`.
+        """
+        policy = self.retry_policy
+        retryable = policy.exceptions if policy else ()
+        attempt = 0
+        while True:
+            try:
+                response = self._send_within_rate(operation, method, url, params, timeout, headers)
+            except retryable:
+                if attempt + 1 >= policy.max_attempts:
+                    raise
+            else:
+                if attempt and applied_if and applied_if(response):
+                    return _applied_response(response, applied_status)
+                if not policy or response.status_code not in policy.statuses or attempt + 1 >= policy.max_attempts:
+                    return response
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    def _send_within_rate(self, operation: str, method: str, url: str, params: dict, timeout: int,
+                          headers: Optional[dict] = None) -> requests.Response:
+        """Send request through pooled session, honouring rate limiter if set"""
+        headers = {**self.headers, **headers} if headers else self.headers
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            response = self._request(operation, method, url, headers, params, timeout)
+            if not self.rate_limiter:
+                return response
+            if not _is_throttled(response):
+                self.rate_limiter.on_success()
+                return response
+            self.rate_limiter.on_throttle(_retry_after(response))
+            if attempt >= self.throttle_retries:
+                return response
+            attempt += 1
+
+    def _request(self, operation: str, method: str, url: str, headers: dict, params: dict,
+                 timeout: int) -> requests.Response:
+        """Send one HTTP request through circuit breaker and instrumentation hooks, if any"""
+        breaker = self.circuit_breaker
+        if not self.instrumentation and breaker is None:
+            return getattr(self.session, method)(url, headers=headers, params=params, timeout=timeout)
+
+        def send() -> requests.Response:
+            return getattr(self.session, method)(url, headers=headers, params=params, timeout=timeout)
+
+        if not self.instrumentation:
+            return breaker.call(send)
+        timings = _PHASE_TIMINGS.current = {}
+        started = time.perf_counter()
+        try:
+            response = breaker.call(send) if breaker is not None else send()
+        except Exception as error:
+            self._emit(RequestEvent(operation, method.upper(), None, type(error).__name__, timings,
+                                    time.perf_counter() - started, breaker.state if breaker else None))
+            raise
+        finally:
+            _PHASE_TIMINGS.current = None
+        total = time.perf_counter() - started
+        if isinstance(response.elapsed, timedelta):  # Until headers arrived, including connection setup
+            setup = sum(timings.get(phase, 0.0) for phase in ("dns", "connect", "tls"))
+            timings["ttfb"] = max(response.elapsed.total_seconds() - setup, 0.0)
+        error = _error_code(response) if response.status_code >= 400 else None
+        self._emit(RequestEvent(operation, method.upper(), response.status_code, error, timings, total,
+                                breaker.state if breaker else None))
+        return response
+
+    def _emit(self, event: RequestEvent):
+        for hook in self.instrumentation:
+            hook(event)
+
+    def create_folder(self, path: str, timeout: int = 30) -> requests.Response:
+        """Create folder on Yandex.Disk"""
+        response = self._send("create_folder", "put", self.base_url, {"path": path}, timeout,
+                              applied_if=_is_already_exists, applied_status=201)
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(path)
+        return response
+
+    def get_folder_info(self, path: str, timeout: int = 30) -> requests.Response:
+        """Get folder information; concurrent calls for one path share a request"""
+        return self._inflight.do(("info", path, timeout), lambda: self._get_folder_info(path, timeout))
+
+    def _get_folder_info(self, path: str, timeout: int) -> requests.Response:
+        if self.metadata_cache is None:
+            return self._send("get_folder_info", "get", self.base_url, {"path": path}, timeout)
+        response = self.metadata_cache.get(path)
+        if response is None:
+            response = self._send_conditional("get_folder_info", self.base_url, {"path": path}, timeout, path)
+            if response.status_code in (200, 404):
+                self.metadata_cache.put(path, response)
+        return response
+
+    def _send_conditional(self, operation: str, url: str, params: dict, timeout: int,
+                          cache_key: str) -> requests.Response:
+        """GET revalidating expired cache entry; 304 returns the cached response"""
+        cached = self.metadata_cache.peek(cache_key) if self.metadata_cache.revalidate else None
+        validator = _validator(cached) if cached is not None and cached.status_code == 200 else None
+        if validator is None:
+            return self._send(operation, "get", url, params, timeout)
+        response = self._send(operation, "get", url, params, timeout, headers={"If-None-Match": validator})
+        if response.status_code != 304:
+            return response
+        self.metadata_cache.revalidated += 1
+        return cached
+
+    def delete_folder(self, path: str, timeout: int = 30) -> requests.Response:
+        """Delete folder from Yandex.Disk"""
+        response = self._send("delete_folder", "delete", self.base_url, {"path": path}, timeout,
+                              applied_if=lambda response: response.status_code == 404, applied_status=204)
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(path, descendants=True)
+        return response
+
+    def list_files(self, limit: int = 20, offset: int = 0, timeout: int = 30,
+                   fields: Optional[str] = None, cache: bool = True) -> requests.Response:
+        """List files on Yandex.Disk
+
+        `fields` is the API projection, e.g. "items.name,items.path". With a
+        revalidating metadata cache the page is kept for conditional
+        re-polling unless `cache` is off, as for full scans by iter_files.
+        """
+        params = {"limit": limit, "offset": offset}
+        if fields:
+            params["fields"] = fields
+        if self.metadata_cache is None or not self.metadata_cache.revalidate or not cache:
+            return self._send("list_files", "get", f"{self.base_url}/files", params, timeout)
+        cache_key = f"files?limit={limit}&offset={offset}&fields={fields or ''}"
+        response = self._send_conditional("list_files", f"{self.base_url}/files", params, timeout, cache_key)
+        if response.status_code == 200:
+            self.metadata_cache.put(cache_key, response)
+        return response
+
+    def list_file_items(self, limit: int = 20, offset: int = 0,
+                        fields: Iterable[str] = DEFAULT_ITEM_FIELDS, timeout: int = 30,
+                        cache: bool = True) -> List["FileItem"]:
+        """List files as compact FileItem records with only requested fields
+
+        Decodes raw body with orjson when installed. Raises requests.HTTPError
+        on a non-2xx response.
+        """
+        fields = tuple(fields)
+        response = self.list_files(limit, offset, timeout, fields=_items_projection(fields), cache=cache)
+        response.raise_for_status()
+        return decode_file_items(response.content, fields)
+
+    def iter_files(self, page_size: int = 1000, fields: Optional[Iterable[str]] = None,
+                   prefetch: bool = True, timeout: int = 30, compact: bool = False) -> Iterator:
+        """Iterate over all files page by page
+
+        Only the current page is kept in memory. With `prefetch` the next page
+        is requested in background while the caller consumes the current one.
+        `fields` limits item keys returned by the API, e.g. ("path", "type").
+        With `compact` items are FileItem records (see list_file_items) instead
+        of dicts. Pages are never stored in the metadata cache. Raises
+        requests.HTTPError on a non-2xx page.
+        """
+        if compact:
+            fields = tuple(fields or DEFAULT_ITEM_FIELDS)
+
+        def fetch(offset: int) -> list:
+            if compact:
+                return self.list_file_items(page_size, offset, fields, timeout, cache=False)
+            response = self.list_files(page_size, offset, timeout, fields=_items_projection(fields), cache=False)
+            response.raise_for_status()
+            return response.json()["items"]
+
+        executor = futures.ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            offset = 0
+            items = fetch(offset)
+            while items:
+                offset += len(items)
+                last_page = len(items) < page_size
+                upcoming = executor.submit(fetch, offset) if executor and not last_page else None
+                yield from items
+                if last_page:
+                    return
+                items = upcoming.result() if upcoming else fetch(offset)
+        finally:
+            if executor:
+                executor.shutdown(wait=False)
+
+    def get_operation_status(self, href: str, timeout: int = 30) -> requests.Response:
+        """Get status of async operation by link from 202 answer"""
+        return self._send("get_operation_status", "get", href, {}, timeout)
+
+    @property
+    def operation_poller(self) -> "OperationPoller":
+        """Shared poller for async operations, started on first use"""
+        with self._lock:
+            if self._poller is None:
+                self._poller = OperationPoller(self)
+            return self._poller
+
+    def delete_tree(self, paths: Iterable[str], workers: Optional[int] = None, timeout: int = 30,
+                    wait_timeout: Optional[float] = None,
+                    progress: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """Delete folders in parallel and wait for async deletions to finish
+
+        Paths inside other listed paths are dropped, as their ancestor delete
+        removes them. 202 answers are tracked by the shared operation poller.
+        Returns path -> "success", "failed", the API error code, the
+        exception name (e.g. "ConnectionError") for requests that raised, or
+        "in-progress" for operations not finished within `wait_timeout`.
+        `progress(path, status)` is called as each path completes.
+        """
+        roots = []
+        # Component-wise order puts every folder right before its descendants ("/a", "/a/c", "/a b")
+        for path in sorted({"/" + path.strip("/") for path in paths}, key=lambda path: path.split("/")):
+            if not roots or not path.startswith(roots[-1].rstrip("/") + "/"):
+                roots.append(path)
+
+        results = {}
+        operations = {}
+
+        def finish(path: str, status: str):
+            results[path] = status
+            if progress:
+                progress(path, status)
+
+        for path, response in self.map_concurrent("delete_folder", roots, workers, return_exceptions=True,
+                                                  timeout=timeout):
+            if isinstance(response, Exception):
+                finish(path, type(response).__name__)
+            elif response.status_code == 202:
+                operations[self.operation_poller.track(response.json()["href"])] = path
+            elif response.status_code == 204:
+                finish(path, "success")
+            else:
+                finish(path, _error_code(response))
+
+        done, not_done = futures.wait(operations, timeout=wait_timeout)
+        for future in done:
+            error = future.exception()
+            finish(operations[future], type(error).__name__ if error else future.result())
+        for future in not_done:
+            finish(operations[future], "in-progress")
+        return results
+
+    def upload_file(self, local_path: str, remote_path: str, overwrite: bool = False,
+                    chunk_size: int = 4 * 1024 * 1024, retries: int = 3, timeout: int = 30,
+                    memory_map: bool = False) -> "TransferResult":
+        """Upload local file streaming it from disk in `chunk_size` blocks
+
+        With `memory_map` the file is mapped and sent as memoryview slices of
+        the mapping, so blocks are never copied onto the heap.
+        Upload links accept the whole body in one PUT, so after a network
+        failure the upload restarts with a fresh link, up to `retries` times.
+        Raises requests.HTTPError when the API refuses the upload.
+        """
+        size = os.path.getsize(local_path)
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            link = self._send("upload_file", "get", f"{self.base_url}/upload",
+                              {"path": remote_path, "overwrite": str(overwrite).lower()}, timeout)
+            link.raise_for_status()
+            try:
+                with open(local_path, "rb") as source:
+                    reader_class = _MappedReader if memory_map and size else _ChunkReader
+                    with reader_class(source, size, chunk_size) as body:
+                        # Upload host is not the API: the OAuth token must not be sent there
+                        response = self.session.put(link.json()["href"], data=body, timeout=timeout)
+            except _transfer_errors():
+                if attempt == retries:
+                    raise
+                continue
+            response.raise_for_status()
+            return TransferResult(remote_path, size, time.perf_counter() - started, attempt + 1)
+
+    def download_file(self, remote_path: str, local_path: str, chunk_size: int = 4 * 1024 * 1024,
+                      retries: int = 3, timeout: int = 30) -> "TransferResult":
+        """Download file to disk in `chunk_size` blocks, resuming with Range
+
+        Data goes to `local_path + ".part"`, which is renamed when complete.
+        ETag and size of the remote file are kept in `local_path + ".part.json"`;
+        a leftover part is resumed only under If-Range on that ETag and when the
+        Content-Range total still matches the size, else it starts over.
+        Before the rename the size, and md5 when the ETag carries one, are checked.
+        Raises requests.HTTPError when the API refuses the download and
+        IOError when the received file does not match the remote one.
+        """
+        link = self._send("download_file", "get", f"{self.base_url}/download", {"path": remote_path}, timeout)
+        link.raise_for_status()
+        href = link.json()["href"]
+        part_path = local_path + ".part"
+        started = time.perf_counter()
+        for attempt in range(retries + 1):
+            try:
+                state = self._download_part(href, part_path, chunk_size, timeout)
+            except _transfer_errors():
+                if attempt == retries:
+                    raise
+                continue
+            if _part_matches(part_path, state):
+                os.replace(part_path, local_path)
+                os.remove(part_path + ".json")
+                return TransferResult(remote_path, os.path.getsize(local_path), time.perf_counter() - started,
+                                      attempt + 1)
+            _discard_part(part_path)
+            if attempt == retries:
+                raise IOError(f"Downloaded {remote_path} does not match remote size or md5")
+
+    def _download_part(self, href: str, part_path: str, chunk_size: int, timeout: int) -> dict:
+        """Fill part file from the download link and return its {"etag", "size"} state
+
+        The state is written before any data, so an interrupted part can be
+        resumed later; a part that is not the current remote file is discarded.
+        """
+        state = _read_part_state(part_path)
+        offset = os.path.getsize(part_path) if state else 0
+        if state is None or offset >= state["size"]:
+            _discard_part(part_path)
+            offset = 0
+        headers = None
+        if offset:
+            headers = {"Range": f"bytes={offset}-"}
+            if state["etag"]:
+                headers["If-Range"] = state["etag"]
+        with self.session.get(href, headers=headers, stream=True, timeout=timeout) as response:
+            if offset and response.status_code in (206, 416):
+                resumed = (response.status_code == 206
+                           and _content_range(response) == (offset, state["size"])
+                           and response.headers.get("ETag", state["etag"]) == state["etag"])
+                if not resumed:
+                    _discard_part(part_path)
+                    return self._download_part(href, part_path, chunk_size, timeout)
+            response.raise_for_status()
+            if response.status_code != 206:
+                length = response.headers.get("Content-Length")
+                state = {"etag": response.headers.get("ETag"), "size": int(length) if length else None}
+                with open(part_path + ".json", "w", encoding="utf-8") as f:
+                    json.dump(state, f)
+            with open(part_path, "ab" if response.status_code == 206 else "wb") as target:
+                for chunk in response.iter_content(chunk_size):
+                    target.write(chunk)
+        return state
+
+    def upload_files(self, pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                     **options) -> List["TransferResult"]:
+        """Upload (local_path, remote_path) pairs concurrently over shared pool"""
+        with futures.ThreadPoolExecutor(max_workers=workers or self.pool_maxsize) as executor:
+            return list(executor.map(lambda pair: self.upload_file(*pair, **options), pairs))
+
+    def download_files(self, pairs: Iterable[Tuple[str, str]], workers: Optional[int] = None,
+                       **options) -> List["TransferResult"]:
+        """Download (remote_path, local_path) pairs concurrently over shared pool"""
+        with futures.ThreadPoolExecutor(max_workers=workers or self.pool_maxsize) as executor:
+            return list(executor.map(lambda pair: self.download_file(*pair, **options), pairs))
+
+    def get_resource(self, path: str, timeout: int = 30) -> Union["Resource", "ApiError"]:
+        """Get folder information as parsed Resource (or ApiError)"""
+        return self._inflight.do(("resource", path, timeout),
+                                 lambda: parse_response(self.get_folder_info(path, timeout)))
+
+    def folder_exists(self, path: str, timeout: int = 30) -> bool:
+        """Check resource exists; sibling checks may be batched into one listing"""
+        if self._batcher is not None:
+            return self._batcher.exists(path, timeout)
+        return self._info_exists(path, timeout)
+
+    def _info_exists(self, path: str, timeout: int) -> bool:
+        response = self.get_folder_info(path, timeout)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    def _child_names(self, path: str, timeout: int, page_size: int = 1000) -> Set[str]:
+        """Names of folder children; empty if folder is missing"""
+        return set(self.list_folder(path, timeout, page_size) or ())
+
+    def list_folder(self, path: str, timeout: int = 30, page_size: int = 1000,
+                    dirs_only: bool = False) -> Optional[List[str]]:
+        """Names of all folder children, paging the embedded listing
+
+        Only subfolders with `dirs_only`. None if folder is missing.
+        """
+        projection = "_embedded.items.name,_embedded.items.type" if dirs_only else "_embedded.items.name"
+        names = []
+        offset = 0
+        while True:
+            params = {"path": path, "limit": page_size, "offset": offset,
+                      "fields": f"{projection},_embedded.total"}
+            response = self._send("get_folder_info", "get", self.base_url, params, timeout)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            embedded = response.json().get("_embedded") or {}
+            items = embedded.get("items") or []
+            names.extend(item["name"] for item in items if not dirs_only or item.get("type") == "dir")
+            offset += len(items)
+            if not items or offset >= embedded.get("total", offset):
+                return names
+
+    def list_resources(self, limit: int = 20, offset: int = 0, timeout: int = 30,
+                       fields: Optional[str] = None) -> Union["ResourceList", "ApiError"]:
+        """List files as parsed ResourceList (or ApiError)"""
+        return parse_response(self.list_files(limit, offset, timeout, fields=fields))
+
+    def map_concurrent(self, op: Union[str, Callable], paths: Iterable[str], workers: Optional[int] = None,
+                       return_exceptions: bool = False, **kwargs) -> Iterator[Tuple[str, object]]:
+        """Run client operation over paths in parallel, yielding (path, result) as each completes
+
+        `op` is a method name such as "create_folder" or a callable taking
+        the path; extra keyword arguments are passed on. Paths are consumed
+        lazily with at most 2 * workers in flight, so huge iterables use
+        constant memory. A failure is raised (cancelling queued work) unless
+        `return_exceptions` is set, in which case the exception is yielded as
+        that path's result.
+        """
+        call = getattr(self, op) if isinstance(op, str) else op
+        workers = workers or self.pool_maxsize
+        paths = iter(paths)
+        end = object()
+        pending: Dict[futures.Future, str] = {}
+        exhausted = False
+        with futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yandex-disk-map") as executor:
+            try:
+                while pending or not exhausted:
+                    while not exhausted and len(pending) < 2 * workers:
+                        path = next(paths, end)
+                        if path is end:
+                            exhausted = True
+                        else:
+                            pending[executor.submit(call, path, **kwargs)] = path
+                    if not pending:
+                        break
+                    done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                    for future in done:
+                        path = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as error:
+                            if not return_exceptions:
+                                raise
+                            result = error
+                        yield path, result
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def create_folders(self, paths: Iterable[str], workers: Optional[int] = None,
+                       timeout: int = 30, parents: bool = True,
+                       journal: Optional["OperationJournal"] = None) -> Dict[str, requests.Response]:
+        """Create folders with all missing parents (mkdir -p for many paths)
+
+        Shared prefixes are created once, level by level: siblings are sent
+        concurrently as soon as their parent exists. Descendants of a folder
+        that could not be created are skipped and absent from the result.
+        With `parents=False` only given paths are sent; parents outside the
+        list are assumed to exist.
+
+        With a `journal` the plan and every created folder are recorded, and
+        folders a previous (crashed) run already created are skipped and
+        absent from the result. Completions are committed in groups once per
+        level; losing the last group only means re-sending creates, which
+        the API answers as already existing.
+        """
+        results = {}
+        blocked = set()
+        levels = _folder_levels(paths, parents)
+        if journal is not None:
+            journal.plan("create_folder", [path for level in levels for path in level])
+        with futures.ThreadPoolExecutor(max_workers=workers or self.pool_maxsize) as executor:
+            for level in levels:
+                batch = []
+                for path in level:
+                    if path.rpartition("/")[0] in blocked:
+                        blocked.add(path)
+                    elif journal is None or not journal.is_done("create_folder", path):
+                        batch.append(path)
+                responses = executor.map(lambda path: self.create_folder(path, timeout), batch)
+                for path, response in zip(batch, responses):
+                    results[path] = response
+                    if not _folder_exists_after_create(response):
+                        blocked.add(path)
+                    elif journal is not None:
+                        journal.done("create_folder", path, response.status_code)
+                if journal is not None:
+                    journal.flush()
+        return results
+
+
+class ListingIndex:
+    """Persistent SQLite index of disk paths for offline existence queries
+
+    refresh() walks the files listing and stores every file with its
+    modification time, plus every folder implied by file paths (empty
+    folders are not part of the files listing and stay unknown). Rows whose
+    `modified` did not change are only re-stamped, changed and new ones are
+    rewritten and paths gone from the listing are dropped, so a refresh
+    writes little when little changed. Lookups never touch the network and
+    use their own connection, so they answer from the last committed
+    refresh while a new one is running.
+    """
+
+    ITEM_FIELDS = ("path", "type", "modified", "size", "md5")
+    _BATCH = 500  # Host parameters per IN (...) query
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()  # Serializes refreshes on the writing connection
+        with self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS resources (path TEXT PRIMARY KEY, type TEXT NOT NULL, "
+                "modified TEXT, size INTEGER, md5 TEXT, generation INTEGER NOT NULL) WITHOUT ROWID"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._reader = sqlite3.connect(path, check_same_thread=False)  # WAL readers see committed data only
+        self._read_lock = threading.Lock()
+
+    def close(self):
+        self._reader.close()
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _normalize(path: str) -> str:
+        if path.startswith("disk:"):
+            path = path[len("disk:"):]
+        return "/" + path.strip("/")
+
+    @staticmethod
+    def _meta(db: sqlite3.Connection, key: str) -> Optional[str]:
+        row = db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @property
+    def refreshed_at(self) -> Optional[float]:
+        """Unix time of the last completed refresh"""
+        with self._read_lock:
+            value = self._meta(self._reader, "refreshed_at")
+        return float(value) if value is not None else None
+
+    def refresh(self, client: YandexDiskAPIClient, page_size: int = 1000, timeout: int = 30) -> Dict[str, int]:
+        """Bring index in line with the files listing; returns change counts
+
+        Runs in one transaction, so an interrupted refresh leaves the
+        previous index intact.
+        """
+        counts = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        items = client.iter_files(page_size=page_size, fields=self.ITEM_FIELDS, timeout=timeout, compact=True)
+        with self._lock, self._db:
+            generation = int(self._meta(self._db, "generation") or 0) + 1
+            folders = {"/"}
+            self._store({"/": ("dir", None, None, None)}, generation, counts)
+            while True:
+                page = list(islice(items, page_size))
+                if not page:
+                    break
+                rows = {}
+                for item in page:
+                    path = self._normalize(item.path)
+                    rows[path] = (item.type or "file", item.modified, item.size, item.md5)
+                    parent = path.rpartition("/")[0] or "/"
+                    while parent not in folders:
+                        folders.add(parent)
+                        rows.setdefault(parent, ("dir", None, None, None))
+                        parent = parent.rpartition("/")[0] or "/"
+                self._store(rows, generation, counts)
+            removed = self._db.execute("DELETE FROM resources WHERE generation < ?", (generation,))
+            counts["removed"] = removed.rowcount
+            self._db.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                 [("generation", str(generation)), ("refreshed_at", repr(time.time()))])
+        return counts
+
+    def _select(self, columns: str, paths: List[str], db: Optional[sqlite3.Connection] = None) -> Iterator[tuple]:
+        db = db or self._db
+        for start in range(0, len(paths), self._BATCH):
+            chunk = paths[start:start + self._BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            yield from db.execute(f"SELECT {columns} FROM resources WHERE path IN ({placeholders})", chunk)
+
+    def _store(self, rows: Dict[str, tuple], generation: int, counts: Dict[str, int]):
+        known = {path: (type, modified) for path, type, modified in self._select("path, type, modified", list(rows))}
+        touched, written = [], []
+        for path, (type, modified, size, md5) in rows.items():
+            previous = known.get(path)
+            if previous == (type, modified):
+                counts["unchanged"] += 1
+                touched.append((generation, path))
+            else:
+                counts["added" if previous is None else "updated"] += 1
+                written.append((path, type, modified, size, md5, generation))
+        self._db.executemany("UPDATE resources SET generation = ? WHERE path = ?", touched)
+        self._db.executemany(
+            "INSERT INTO resources (path, type, modified, size, md5, generation) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET type = excluded.type, modified = excluded.modified, "
+            "size = excluded.size, md5 = excluded.md5, generation = excluded.generation",
+            written
+        )
+
+    def lookup(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Type ("file" or "dir") of each path, None when it is not indexed"""
+        originals: Dict[str, List[str]] = {}
+        for path in paths:
+            originals.setdefault(self._normalize(path), []).append(path)
+        result = {path: None for group in originals.values() for path in group}
+        with self._read_lock:
+            for path, type in self._select("path, type", list(originals), self._reader):
+                for original in originals[path]:
+                    result[original] = type
+        return result
+
+    def exists(self, paths: Iterable[str]) -> Dict[str, bool]:
+        """Whether each path is indexed"""
+        return {path: type is not None for path, type in self.lookup(paths).items()}
+
+
+class OperationJournal:
+    """Append-only write-ahead journal of planned and completed operations
+
+    Each record is one JSON line {"op", "path", "state", "status"} with
+    state "planned" or "done". Opening an existing journal replays it, so
+    is_done() tells a restarted job which work to skip; a torn last line
+    left by a crash is cut off. Records are written by one background thread
+    that appends everything queued since its previous write and fsyncs once
+    (group commit): many workers recording at once share a single fsync.
+    done() returns without waiting unless asked to; flush() waits until all
+    earlier records are durable. A failed write is sticky: nothing more is
+    written and every later flush(), waiting done() or close() raises it.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self.completed: Set[Tuple[str, str]] = set()
+        self.planned: Set[Tuple[str, str]] = set()
+        self.commits = 0
+        self.records = 0
+        self._recover()
+        self._file = open(path, "ab")
+        self._queue: List[bytes] = []
+        self._waiters: List[futures.Future] = []
+        self._closed = False
+        self._error: Optional[OSError] = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="yandex-disk-journal", daemon=True)
+        self._thread.start()
+
+    def _recover(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r+b") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                f.truncate(end)  # Torn write from a crash
+        for line in data[:end].splitlines():
+            try:
+                record = json.loads(line)
+                key = (record["op"], record["path"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            (self.completed if record.get("state") == "done" else self.planned).add(key)
+
+    def is_done(self, op: str, path: str) -> bool:
+        return (op, path) in self.completed
+
+    def pending(self, op: Optional[str] = None) -> List[str]:
+        """Planned paths not completed yet, e.g. to report an interrupted run"""
+        return sorted(path for key_op, path in self.planned - self.completed if op is None or key_op == op)
+
+    def plan(self, op: str, paths: Iterable[str], wait: bool = True):
+        """Record intended operations (not yet planned or done ones)"""
+        records = []
+        for path in paths:
+            key = (op, path)
+            if key not in self.planned and key not in self.completed:
+                self.planned.add(key)
+                records.append({"op": op, "path": path, "state": "planned"})
+        self._append(records, wait)
+
+    def done(self, op: str, path: str, status: Optional[int] = None, wait: bool = False):
+        """Record completed operation"""
+        self.completed.add((op, path))
+        self._append([{"op": op, "path": path, "state": "done", "status": status}], wait)
+
+    def flush(self):
+        """Wait until everything recorded so far is written (and fsynced)"""
+        self._append([], wait=True)
+
+    def _append(self, records: List[dict], wait: bool):
+        lines = b"".join(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n" for record in records)
+        future = futures.Future() if wait else None
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Operation journal is closed")
+            if self._error is not None and wait:
+                raise self._error
+            if lines:
+                self._queue.append(lines)
+                self.records += len(records)
+            if future is not None:
+                self._waiters.append(future)
+            self._condition.notify()
+        if future is not None:
+            future.result()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._waiters and not self._closed:
+                    self._condition.wait()
+                if self._closed and not self._queue and not self._waiters:
+                    return
+                queue, self._queue = self._queue, []
+                waiters, self._waiters = self._waiters, []
+                error = self._error
+            try:
+                if error is not None:
+                    raise error  # Records after a failed write are never written
+                if queue:
+                    self._file.write(b"".join(queue))
+                    self._file.flush()
+                    if self.fsync:
+                        os.fsync(self._file.fileno())
+                    self.commits += 1
+            except OSError as failure:
+                with self._condition:
+                    self._error = failure
+                for future in waiters:
+                    future.set_exception(failure)
+                continue
+            for future in waiters:
+                future.set_result(None)
+
+    def close(self):
+        """Write pending records and close the file"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FileItem:
+    """Compact files listing entry holding only projected fields
+
+    Concrete record types with matching __slots__ are made per field set
+    by file_item_type().
+    """
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"FileItem({values})"
+
+
+@lru_cache(maxsize=None)
+def file_item_type(fields: Tuple[str, ...]) -> type:
+    """FileItem subclass with __slots__ for given fields
+
+    Its __init__ and from_item are generated with plain assignments, like
+    dataclasses do, since a generic setattr loop dominates decoding time.
+    """
+    if (len(set(fields)) != len(fields) or "self" in fields or "from_item" in fields
+            or not all(field.isidentifier() and not keyword.iskeyword(field) for field in fields)):
+        raise ValueError(f"Invalid item fields: {fields}")
+    namespace = {}
+    assignments = "".join(f"    self.{field} = {field}\n" for field in fields) or "    pass\n"
+    lookups = ", ".join(f"item.get({field!r})" for field in fields)
+    exec(
+        f"def __init__(self, {', '.join(fields)}):\n{assignments}"
+        f"def from_item(cls, item):\n    return cls({lookups})\n",
+        namespace
+    )
+    return type("FileItem", (FileItem,), {
+        "__slots__": fields,
+        "__init__": namespace["__init__"],
+        "from_item": classmethod(namespace["from_item"]),
+    })
+
+
+def decode_file_items(content: bytes, fields: Tuple[str, ...] = DEFAULT_ITEM_FIELDS) -> List[FileItem]:
+    """Decode files listing body straight into FileItem records"""
+    from_item = file_item_type(fields).from_item
+    return [from_item(item) for item in _json_loads(content)["items"]]
+
+
+class Resource:
+    """Parsed resource (file or folder) metadata"""
+
+    __slots__ = ("path", "name", "type", "size", "created", "modified", "md5",
+                 "revision", "resource_id", "mime_type", "embedded")
+
+    def __init__(self, path: str, name: str, type: str, size: Optional[int] = None,
+                 created: Optional[str] = None, modified: Optional[str] = None, md5: Optional[str] = None,
+                 revision: Optional[int] = None, resource_id: Optional[str] = None,
+                 mime_type: Optional[str] = None, embedded: Optional["ResourceList"] = None):
+        self.path = path
+        self.name = name
+        self.type = type
+        self.size = size
+        self.created = created
+        self.modified = modified
+        self.md5 = md5
+        self.revision = revision
+        self.resource_id = resource_id
+        self.mime_type = mime_type
+        self.embedded = embedded
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Resource":
+        """Build from API JSON; low-cardinality strings are interned"""
+        embedded = data.get("_embedded")
+        mime_type = data.get("mime_type")
+        return cls(
+            data.get("path"),
+            data.get("name"),
+            sys.intern(data.get("type") or ""),
+            data.get("size"),
+            data.get("created"),
+            data.get("modified"),
+            data.get("md5"),
+            data.get("revision"),
+            data.get("resource_id"),
+            sys.intern(mime_type) if mime_type else None,
+            ResourceList.from_dict(embedded) if embedded else None,
+        )
+
+    @property
+    def is_dir(self) -> bool:
+        return self.type == "dir"
+
+    def __repr__(self):
+        return f"Resource(path={self.path!r}, type={self.type!r})"
+
+
+class ResourceList:
+    """Parsed page of resources (files listing or folder contents)"""
+
+    __slots__ = ("items", "limit", "offset", "total", "path")
+
+    def __init__(self, items: List[Resource], limit: Optional[int] = None, offset: Optional[int] = None,
+                 total: Optional[int] = None, path: Optional[str] = None):
+        self.items = items
+        self.limit = limit
+        self.offset = offset
+        self.total = total
+        self.path = path
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ResourceList":
+        return cls(
+            [Resource.from_dict(item) for item in data.get("items", ())],
+            data.get("limit"),
+            data.get("offset"),
+            data.get("total"),
+            data.get("path"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self) -> Iterator[Resource]:
+        return iter(self.items)
+
+    def __repr__(self):
+        return f"ResourceList({len(self.items)} items, offset={self.offset!r})"
+
+
+class Link:
+    """Parsed link answer, e.g. created folder or async operation status"""
+
+    __slots__ = ("href", "method", "templated")
+
+    def __init__(self, href: str, method: str = "GET", templated: bool = False):
+        self.href = href
+        self.method = method
+        self.templated = templated
+
+    def __repr__(self):
+        return f"Link({self.method} {self.href})"
+
+
+class ApiError:
+    """Parsed API error answer"""
+
+    __slots__ = ("status_code", "error", "message", "description")
+
+    def __init__(self, status_code: int, error: Optional[str] = None, message: Optional[str] = None,
+                 description: Optional[str] = None):
+        self.status_code = status_code
+        self.error = error
+        self.message = message
+        self.description = description
+
+    @property
+    def code(self) -> Optional[str]:
+        """YandexDiskErrorCodes constant name for this error, e.g. NOT_FOUND"""
+        for name, value in vars(YandexDiskErrorCodes).items():
+            if value == self.error and not name.startswith("_"):
+                return name
+        return None
+
+    def __repr__(self):
+        return f"ApiError({self.status_code}, {self.error!r})"
+
+
+def parse_response(response: requests.Response) -> Union[Resource, ResourceList, Link, ApiError, None]:
+    """Decode response once into a result object and release the response
+
+    Returns None for empty success answers (204 No Content).
+    """
+    try:
+        try:
+            data = _json_loads(response.content) if response.content else {}
+        except ValueError:
+            data = {}  # E.g. HTML error page from a proxy
+        if response.status_code >= 400:
+            return ApiError(response.status_code, data.get("error"), data.get("message"), data.get("description"))
+        if not data:
+            return None
+        if "href" in data and "method" in data:
+            return Link(data["href"], data["method"], data.get("templated", False))
+        if "items" in data and "type" not in data:
+            return ResourceList.from_dict(data)
+        return Resource.from_dict(data)
+    finally:
+        response.close()
+
+
+def _items_projection(fields: Optional[Iterable[str]]) -> Optional[str]:
+    """API `fields` parameter selecting given keys of listing items"""
+    return ",".join(f"items.{field}" for field in fields) if fields else None
+
+
+def _folder_levels(paths: Iterable[str], parents: bool = True) -> List[List[str]]:
+    """Split paths (and all their parents) into depth levels, deduplicated"""
+    levels = []
+    seen = set()
+    for path in paths:
+        parts = [part for part in path.split("/") if part]
+        for depth in range(1 if parents else max(len(parts), 1), len(parts) + 1):
+            prefix = "/" + "/".join(parts[:depth])
+            if prefix in seen:
+                continue
+            seen.add(prefix)
+            while len(levels) < depth:
+                levels.append([])
+            levels[depth - 1].append(prefix)
+    return levels
+
+
+def _folder_exists_after_create(response: requests.Response) -> bool:
+    """Check create response means folder is there (created or already existed)"""
+    return response.status_code == 201 or _is_already_exists(response)
+
+
+def _applied_response(response: requests.Response, status_code: int) -> requests.Response:
+    """Empty success response replacing the error answer to a retried idempotent request"""
+    applied = requests.Response()
+    applied.status_code = status_code
+    applied._content = b""
+    applied.headers["Content-Length"] = "0"
+    applied.url = response.url
+    applied.request = response.request
+    applied.elapsed = response.elapsed
+    response.close()
+    return applied
+
+
+def _is_already_exists(response: requests.Response) -> bool:
+    """Check response is 409 because folder already exists"""
+    if response.status_code != 409:
+        return False
+    try:
+        error = response.json().get("error")
+    except ValueError:
+        return False
+    return error in (YandexDiskErrorCodes.ALREADY_EXISTS_DIRECTORY, YandexDiskErrorCodes.ALREADY_EXISTS_RESOURCE)
+
+
+def _read_part_state(part_path: str) -> Optional[dict]:
+    """ETag and size recorded for a resumable part file; None when there is no usable part"""
+    if not os.path.exists(part_path):
+        return None
+    try:
+        with open(part_path + ".json", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if isinstance(state, dict) and isinstance(state.get("size"), int) else None
+
+
+def _discard_part(part_path: str):
+    """Remove part file and its state, if any"""
+    for path in (part_path, part_path + ".json"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _content_range(response: requests.Response) -> Optional[Tuple[int, int]]:
+    """First byte and total size from Content-Range of a 206 response"""
+    try:
+        span, total = response.headers["Content-Range"].split(" ", 1)[1].split("/")
+        return int(span.split("-")[0]), int(total)
+    except (KeyError, IndexError, ValueError):
+        return None
+
+
+def _part_matches(part_path: str, state: dict) -> bool:
+    """Check downloaded part against remote size and, when the ETag is an md5, its digest"""
+    if state["size"] is not None and os.path.getsize(part_path) != state["size"]:
+        return False
+    etag = (state["etag"] or "").strip('"').lower()
+    if len(etag) != 32 or any(c not in "0123456789abcdef" for c in etag):
+        return True
+    digest = hashlib.md5()
+    with open(part_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest() == etag
+
+
+def _transfer_errors() -> Tuple[type, ...]:
+    """Network failures after which a transfer is retried"""
+    return (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    )
+
+
+class TransferResult:
+    """Outcome of one file upload or download"""
+
+    __slots__ = ("path", "size", "seconds", "attempts")
+
+    def __init__(self, path: str, size: int, seconds: float, attempts: int = 1):
+        self.path = path
+        self.size = size
+        self.seconds = seconds
+        self.attempts = attempts
+
+    @property
+    def mb_per_second(self) -> float:
+        """Throughput in MB/s (10**6 bytes)"""
+        return self.size / 1_000_000 / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return f"TransferResult({self.path!r}, {self.size} bytes, {self.mb_per_second:.2f} MB/s)"
+
+
+class _ChunkReader:
+    """File-like request body handing out fixed-size blocks
+
+    Has a length so requests sends Content-Length instead of chunked encoding.
+    """
+
+    def __init__(self, source, size: int, chunk_size: int):
+        self._source = source
+        self._size = size
+        self._chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def read(self, size: int = -1) -> bytes:
+        return self._source.read(self._chunk_size)
+
+    def __iter__(self):
+        return iter(lambda: self.read(), b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+class _MappedReader(_ChunkReader):
+    """Request body handing out memoryview slices of a read-only file mapping
+
+    Pages already sent are dropped from the mapping (MADV_DONTNEED where
+    available), so resident memory stays at about one block whatever the
+    file size.
+    """
+
+    def __init__(self, source, size: int, chunk_size: int):
+        super().__init__(source, size, max(mmap.PAGESIZE, chunk_size - chunk_size % mmap.PAGESIZE))
+        self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._offset = 0
+        self._sent = None  # Start of block handed out last, page aligned
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._map.madvise(mmap.MADV_SEQUENTIAL)
+
+    def read(self, size: int = -1) -> memoryview:
+        if self._sent is not None and hasattr(mmap, "MADV_DONTNEED"):
+            self._map.madvise(mmap.MADV_DONTNEED, self._sent, self._offset - self._sent)
+        chunk = self._view[self._offset:self._offset + self._chunk_size]
+        self._sent = self._offset if chunk else None
+        self._offset += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        while True:
+            chunk = self.read()
+            if not chunk:
+                return
+            yield chunk
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._view.release()
+        try:
+            self._map.close()
+        except BufferError:
+            pass  # A slice is still referenced; mapping closes when it is collected
+
+
+class OperationPoller:
+    """Poll async operation links on one background thread
+
+    Each tracked link is polled with its own exponential backoff, from
+    `interval` up to `max_interval` seconds, until the API reports a status
+    other than "in-progress". Network errors are retried on the next poll.
+    """
+
+    def __init__(self, client: YandexDiskAPIClient, interval: float = 0.2, max_interval: float = 5.0,
+                 timeout: int = 30):
+        self.client = client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self._pending = {}  # href -> [future, due time, current interval]
+        self._condition = threading.Condition()
+        self._thread = None
+        self._closed = False
+
+    def track(self, href: str) -> futures.Future:
+        """Start polling link; future resolves to final operation status"""
+        future = futures.Future()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Operation poller is closed")
+            self._pending[href] = [future, time.monotonic() + self.interval, self.interval]
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="yandex-disk-poller", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return future
+
+    def close(self):
+        """Stop polling; unfinished futures are cancelled"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+        for future, _, _ in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._closed:
+                    now = time.monotonic()
+                    next_due = min((entry[1] for entry in self._pending.values()), default=None)
+                    if next_due is not None and next_due <= now:
+                        break
+                    self._condition.wait(None if next_due is None else next_due - now)
+                if self._closed:
+                    return
+                due = [href for href, entry in self._pending.items() if entry[1] <= now]
+            for href in due:
+                status = self._poll(href)
+                with self._condition:
+                    entry = self._pending.get(href)
+                    if entry is None:
+                        continue
+                    if status is None or status == "in-progress":
+                        entry[2] = min(self.max_interval, entry[2] * 2)
+                        entry[1] = time.monotonic() + entry[2]
+                    else:
+                        del self._pending[href]
+                        entry[0].set_result(status)
+
+    def _poll(self, href: str) -> Optional[str]:
+        """Return operation status, error code, or None to try again"""
+        try:
+            response = self.client.get_operation_status(href, self.timeout)
+            if response.status_code != 200:
+                return _error_code(response)
+            return response.json().get("status")
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+
+
+class SyncPlan:
+    """Folder operations needed to make remote tree match local one
+
+    `creates` are ordered parents first; `deletes` hold only top-most
+    extraneous folders since deleting a folder removes its subtree.
+    After apply, `results` maps every sent path to its response.
+    """
+
+    def __init__(self, creates: List[str], deletes: List[str]):
+        self.creates = creates
+        self.deletes = deletes
+        self.results = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.creates or self.deletes)
+
+    def __str__(self) -> str:
+        lines = [f"mkdir {path}" for path in self.creates] + [f"rm -r {path}" for path in self.deletes]
+        return "\n".join(lines) or "Nothing to do"
+
+
+class TreeSync:
+    """Mirror a local directory layout onto Yandex.Disk
+
+    Remote state comes from one paginated files listing: every folder holding
+    a file under the root exists. Local folders the listing does not imply
+    (e.g. empty ones made by an earlier run) are checked one by one, skipping
+    those below a missing parent, so an unchanged tree costs a single listing
+    pass plus one check per empty folder, and no writes. Only with `delete`
+    are remote folder listings walked, level by level and in parallel, to
+    find extraneous (possibly empty) folders; they are not descended into.
+    """
+
+    def __init__(self, client: YandexDiskAPIClient, local_root: str, remote_root: str,
+                 delete: bool = False, workers: Optional[int] = None, page_size: int = 1000):
+        self.client = client
+        self.local_root = local_root
+        self.remote_root = "/" + remote_root.strip("/")
+        self.delete = delete
+        self.workers = workers
+        self.page_size = page_size
+
+    def local_folders(self) -> Set[str]:
+        """Remote paths for the root and every local subdirectory"""
+        folders = {self.remote_root}
+        for dirpath, dirnames, filenames in os.walk(self.local_root):
+            relative = os.path.relpath(dirpath, self.local_root)
+            base = self.remote_root if relative == "." else f"{self.remote_root}/{relative.replace(os.sep, '/')}"
+            folders.update(f"{base.rstrip('/')}/{name}" for name in dirnames)
+        return folders
+
+    def remote_folders(self, local: Optional[Set[str]] = None, timeout: int = 30) -> Set[str]:
+        """Remote root and folders under it that matter for diffing against `local`"""
+        local = self.local_folders() if local is None else local
+        if self.delete:
+            return self._walk_folders(local, timeout)
+        folders = self._listed_folders(timeout)
+        unknown = sorted(local - folders, key=lambda path: (path.count("/"), path))
+        missing = set()
+        while unknown:
+            # A folder whose parent is missing is missing too, so it is checked after its parent
+            depth = unknown[0].count("/")
+            level = [path for path in unknown if path.count("/") == depth]
+            unknown = unknown[len(level):]
+            checks = [path for path in level if path == self.remote_root or path.rpartition("/")[0] not in missing]
+            missing.update(set(level) - set(checks))
+            for path, exists in self.client.map_concurrent("folder_exists", checks, self.workers, timeout=timeout):
+                (folders if exists else missing).add(path)
+        return folders
+
+    def _listed_folders(self, timeout: int) -> Set[str]:
+        """Root and every folder under it holding a file, from one pass over the files listing"""
+        prefix = self.remote_root.rstrip("/") + "/"
+        folders = set()
+        for item in self.client.iter_files(self.page_size, fields=("path",), timeout=timeout, compact=True):
+            path = ListingIndex._normalize(item.path)
+            if not path.startswith(prefix):
+                continue
+            parent = path.rpartition("/")[0] or "/"
+            while parent not in folders:
+                folders.add(parent)
+                if parent == self.remote_root:
+                    break
+                parent = parent.rpartition("/")[0] or "/"
+        return folders
+
+    def _walk_folders(self, local: Set[str], timeout: int) -> Set[str]:
+        """Root and folders under it from folder listings, descending only into folders present in `local`"""
+        folders = set()
+        level = [self.remote_root]
+        while level:
+            upcoming = []
+            for path, names in self.client.map_concurrent("list_folder", level, self.workers, timeout=timeout,
+                                                          page_size=self.page_size, dirs_only=True):
+                if names is None:
+                    continue  # Missing, e.g. root not created yet
+                folders.add(path)
+                for name in names:
+                    child = f"{path.rstrip('/')}/{name}"
+                    if child in local:
+                        upcoming.append(child)
+                    else:
+                        folders.add(child)  # Extraneous: a delete removes its subtree, no need to look inside
+            level = upcoming
+        return folders
+
+    def plan(self) -> SyncPlan:
+        """Diff local and remote trees into minimal operations"""
+        local = self.local_folders()
+        remote = self.remote_folders(local)
+        creates = sorted(local - remote, key=lambda path: (path.count("/"), path))
+        deletes = []
+        if self.delete:
+            for path in sorted(remote - local):
+                if not deletes or not path.startswith(deletes[-1] + "/"):
+                    deletes.append(path)
+        return SyncPlan(creates, deletes)
+
+    def apply(self, plan: SyncPlan, timeout: int = 30) -> SyncPlan:
+        """Execute plan: deletes in parallel, then creates level by level"""
+        if plan.deletes:
+            with futures.ThreadPoolExecutor(max_workers=self.workers or self.client.pool_maxsize) as executor:
+                responses = executor.map(lambda path: self.client.delete_folder(path, timeout), plan.deletes)
+                plan.results.update(zip(plan.deletes, responses))
+        if plan.creates:
+            # Everything below a missing root is missing too, so only root ancestors get added
+            parents = self.remote_root in plan.creates
+            plan.results.update(self.client.create_folders(plan.creates, workers=self.workers,
+                                                           timeout=timeout, parents=parents))
+        return plan
+
+    def run(self, dry_run: bool = False, timeout: int = 30) -> SyncPlan:
+        """Plan and, unless `dry_run`, apply"""
+        plan = self.plan()
+        return plan if dry_run else self.apply(plan, timeout)
+
+
+class AsyncYandexDiskAPIClient:
+    """Asyncio client for Yandex.Disk API operations
+
+    Mirrors YandexDiskAPIClient methods as coroutines. Requests run on a
+    bounded worker pool, each worker with its own pooled session, and a
+    semaphore caps the number of requests in flight, so N awaited calls finish in about
+    N / concurrency round-trips.
+    """
+
+    def __init__(self, token: str, base_url: str = "https://cloud-api.yandex.net/v1/disk/resources",
+                 concurrency: int = 10, max_retries: int = 0, rate_limiter: Optional[RateLimiter] = None,
+                 retry_policy: Optional[RetryPolicy] = None, circuit_breaker: Optional[CircuitBreaker] = None):
+        self.concurrency = concurrency
+        self._client = YandexDiskAPIClient(
+            token,
+            base_url=base_url,
+            pool_connections=1,
+            pool_maxsize=concurrency,
+            max_retries=max_retries,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker
+        )
+        self._executor = futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="yandex-disk")
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    @property
+    def base_url(self) -> str:
+        return self._client.base_url
+
+    @property
+    def headers(self) -> dict:
+        return self._client.headers
+
+    async def _run(self, method, *args) -> requests.Response:
+        """Run blocking client method on worker pool within concurrency limit"""
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, method, *args)
+
+    async def create_folder(self, path: str, timeout: int = 30) -> requests.Response:
+        """Create folder on Yandex.Disk"""
+        return await self._run(self._client.create_folder, path, timeout)
+
+    async def get_folder_info(self, path: str, timeout: int = 30) -> requests.Response:
+        """Get folder information"""
+        return await self._run(self._client.get_folder_info, path, timeout)
+
+    async def delete_folder(self, path: str, timeout: int = 30) -> requests.Response:
+        """Delete folder from Yandex.Disk"""
+        return await self._run(self._client.delete_folder, path, timeout)
+
+    async def list_files(self, limit: int = 20, offset: int = 0, timeout: int = 30,
+                         fields: Optional[str] = None) -> requests.Response:
+        """List files on Yandex.Disk"""
+        return await self._run(self._client.list_files, limit, offset, timeout, fields)
+
+    async def aclose(self):
+        """Wait for workers and close pooled connections without blocking the event loop"""
+        def close():
+            self._executor.shutdown(wait=True)
+            self._client.close()
+
+        await asyncio.get_running_loop().run_in_executor(None, close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
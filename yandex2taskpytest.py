@@ -10,65 +10,31 @@ import requests
 import time
 from typing import List, Tuple, Optional
 
-
-class YandexDiskAPIClient:
-    """Client for Yandex.Disk API operations"""
-
-    def __init__(self, token: str, base_url: str = "https://cloud-api.yandex.net/v1/disk/resources"):
-        self.base_url = base_url
-        self.headers = {
-            "Authorization": f"OAuth {token}",
-            "Content-Type": "application/json"
-        }
-
-    def create_folder(self, path: str, timeout: int = 30) -> requests.Response:
-        """Create folder on Yandex.Disk"""
-        return requests.put(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def get_folder_info(self, path: str, timeout: int = 30) -> requests.Response:
-        """Get folder information"""
-        return requests.get(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def delete_folder(self, path: str, timeout: int = 30) -> requests.Response:
-        """Delete folder from Yandex.Disk"""
-        return requests.delete(
-            self.base_url,
-            headers=self.headers,
-            params={"path": path},
-            timeout=timeout
-        )
-
-    def list_files(self, limit: int = 20, offset: int = 0, timeout: int = 30) -> requests.Response:
-        """List files on Yandex.Disk"""
-        return requests.get(
-            f"{self.base_url}/files",
-            headers=self.headers,
-            params={"limit": limit, "offset": offset},
-            timeout=timeout
-        )
+from yandex2taskclient import RateLimiter, YandexDiskAPIClient
 
 
 # Fixtures
-@pytest.fixture
+@pytest.fixture(scope="session")
 def yandex_token():
     """Fixture for Yandex OAuth token"""
     return "y0__xDIxNzRBhjblgMg9KLG2ROI4da4f-5cTi0XoH0CJ8sWTS3pHA"
 
 
+@pytest.fixture(scope="session")
+def yandex_base_url(yandex_token):
+    """API base URL: offline fake server when YANDEX_DISK_FAKE is set, else real API"""
+    if not os.environ.get("YANDEX_DISK_FAKE"):
+        yield "https://cloud-api.yandex.net/v1/disk/resources"
+        return
+    from yandex2taskserver import FakeYandexDiskServer
+    with FakeYandexDiskServer(tokens=[yandex_token]) as server:
+        yield server.base_url
+
+
 @pytest.fixture
-def api_client(yandex_token):
+def api_client(yandex_token, yandex_base_url):
     """Fixture for YandexDiskAPIClient instance"""
-    return YandexDiskAPIClient(yandex_token)
+    return YandexDiskAPIClient(yandex_token, base_url=yandex_base_url)
 
 
 @pytest.fixture
@@ -106,7 +72,7 @@ class TestYandexDiskAPIMocked:
             "templated": False
         }
 
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             mock_put.return_value = create_mock_response(201, expected_response)
 
             # Act
@@ -131,7 +97,7 @@ class TestYandexDiskAPIMocked:
             "error": "DiskPathPointsToExistentDirectoryError"
         }
 
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             mock_put.return_value = create_mock_response(409, expected_response)
 
             # Act
@@ -144,8 +110,8 @@ class TestYandexDiskAPIMocked:
     def test_folder_appears_in_list_after_creation(self, api_client, test_folder_path):
         """Should find created folder in files list"""
         # Arrange
-        with patch.object(requests, 'put') as mock_put, \
-             patch.object(requests, 'get') as mock_get:
+        with patch.object(requests.Session, 'put') as mock_put, \
+             patch.object(requests.Session, 'get') as mock_get:
 
             mock_put.return_value = create_mock_response(201, {})
 
@@ -228,7 +194,7 @@ class TestYandexDiskAPIMocked:
     ])
     def test_api_error_responses(self, api_client, status_code, expected_error, test_data):
         """Test various API error responses"""
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             mock_put.return_value = create_mock_response(status_code, test_data)
 
             # Use appropriate path based on error type
@@ -247,7 +213,7 @@ class TestYandexDiskAPIMocked:
     ])
     def test_network_errors(self, api_client, test_folder_path, exception_class, exception_msg):
         """Test network-related exceptions"""
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             mock_put.side_effect = exception_class(exception_msg)
 
             with pytest.raises(exception_class):
@@ -270,7 +236,7 @@ class TestYandexDiskAPIReal:
     def _safe_delete_folder(self, path: str):
         """Safely delete folder ignoring errors"""
         try:
-            self.client.delete_folder(path, timeout=5)
+            self.client.delete_tree([path], timeout=5, wait_timeout=30)
         except (requests.exceptions.RequestException, KeyError):
             pass  # Folder might not exist or already deleted
 
@@ -317,7 +283,7 @@ class TestYandexDiskAPIReal:
     def test_create_folder_with_invalid_token(self):
         """Should reject request with invalid token"""
         # Arrange
-        invalid_client = YandexDiskAPIClient("invalid_token_12345")
+        invalid_client = YandexDiskAPIClient("invalid_token_12345", base_url=self.client.base_url)
 
         # Act
         response = invalid_client.create_folder(self.test_folder)
@@ -381,7 +347,7 @@ class TestYandexDiskAPIParametrized:
     ])
     def test_folder_path_validation(self, mock_client, folder_path, expected_success):
         """Test various folder path validations"""
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             if expected_success:
                 mock_put.return_value = create_mock_response(201, {})
             else:
@@ -400,7 +366,7 @@ class TestYandexDiskAPIParametrized:
     @pytest.mark.parametrize("timeout_value", [1, 5, 10, 30, 60])
     def test_request_timeouts(self, mock_client, test_folder_path, timeout_value):
         """Test different timeout values"""
-        with patch.object(requests, 'put') as mock_put:
+        with patch.object(requests.Session, 'put') as mock_put:
             mock_put.return_value = create_mock_response(201, {})
 
             response = mock_client.create_folder(test_folder_path, timeout=timeout_value)
@@ -462,11 +428,27 @@ class TestIntegration:
 class TestSlowOperations:
     """Slow operations that should be run separately"""
 
-    def test_rate_limiting_behavior(self, api_client):
+    def test_rate_limiting_behavior(self, yandex_token):
         """Test behavior under potential rate limiting"""
-        # This would be a test that makes multiple rapid requests
-        # to check rate limiting behavior
-        pass
+        limiter = RateLimiter(rate=200, burst=1)
+        client = YandexDiskAPIClient(yandex_token, rate_limiter=limiter)
+        throttled = create_mock_response(429, {"error": "TooManyRequestsError"})
+        throttled.headers = {"Retry-After": "0.05"}
+        responses = [create_mock_response(201, {})] * 10 + [throttled] + [create_mock_response(201, {})] * 10
+
+        with patch.object(requests.Session, 'put') as mock_put:
+            mock_put.side_effect = responses
+
+            started = time.perf_counter()
+            statuses = [client.create_folder(f"/rapid_{i}").status_code for i in range(20)]
+            elapsed = time.perf_counter() - started
+
+        # Throttled request is resent, every call ends up created
+        assert statuses == [201] * 20
+        assert mock_put.call_count == 21
+        # Rate was cut after 429 and Retry-After pause was honoured
+        assert limiter.rate < 200
+        assert elapsed >= 0.05 + 19 / 200
 
 
 # Custom pytest markers registration
@@ -0,0 +1,480 @@
+"""
+Offline stand-in for Yandex.Disk REST API
+In-process threaded HTTP server with resources, files listing, upload and
+download links, async delete operations, latency and failure injection
+"""
+
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+API_PREFIX = "/v1/disk"
+
+
+class FakeDiskError(Exception):
+    """API error answer: HTTP status, error code and message"""
+
+    def __init__(self, status_code: int, error: str, message: str = ""):
+        super().__init__(message or error)
+        self.status_code = status_code
+        self.error = error
+        self.message = message or error
+
+
+class InjectedFailure:
+    """Scheduled failure answered instead of the next matching requests"""
+
+    __slots__ = ("status_code", "error", "count", "method", "path_prefix", "retry_after", "disconnect")
+
+    def __init__(self, status_code: int, error: Optional[str], count: int, method: Optional[str],
+                 path_prefix: Optional[str], retry_after: Optional[float], disconnect: bool):
+        self.status_code = status_code
+        self.error = error
+        self.count = count
+        self.method = method
+        self.path_prefix = path_prefix
+        self.retry_after = retry_after
+        self.disconnect = disconnect
+
+    def matches(self, method: str, path: str) -> bool:
+        return ((self.method is None or self.method == method)
+                and (self.path_prefix is None or path.startswith(self.path_prefix)))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+
+
+def normalize_path(path: Optional[str]) -> str:
+    """Canonical absolute disk path; FieldValidationError for empty or relative-escaping paths"""
+    if path is None or not path.strip():
+        raise FakeDiskError(400, "FieldValidationError", "Error validating field \"path\"")
+    if path.startswith("disk:"):
+        path = path[len("disk:"):]
+    parts = [part for part in path.split("/") if part]
+    if any(part in (".", "..") for part in parts):
+        raise FakeDiskError(400, "FieldValidationError", "Error validating field \"path\"")
+    return "/" + "/".join(parts)
+
+
+class FakeDisk:
+    """Thread-safe in-memory disk tree answering like the REST API"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revision = itertools.count(1)
+        self.revision = next(self._revision)
+        self.resources: Dict[str, dict] = {"/": self._entry("dir")}
+        self.operations: Dict[str, int] = {}  # id -> polls left before "success"
+
+    def _entry(self, type: str, data: bytes = b"") -> dict:
+        self.revision = next(self._revision)
+        entry = {"type": type, "created": _now(), "modified": _now(), "revision": self.revision}
+        if type == "file":
+            entry.update(data=data, md5=hashlib.md5(data).hexdigest())
+        return entry
+
+    def _touch_parent(self, path: str):
+        parent = self.resources.get(path.rpartition("/")[0] or "/")
+        if parent is not None:
+            parent["revision"] = self.revision
+            parent["modified"] = _now()
+
+    def _check_parent(self, path: str):
+        parent = path.rpartition("/")[0] or "/"
+        if self.resources.get(parent, {}).get("type") != "dir":
+            raise FakeDiskError(404, "DiskNotFoundError", "Resource not found.")
+
+    def children(self, path: str) -> List[Tuple[str, dict]]:
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            return sorted(((p, entry) for p, entry in self.resources.items()
+                           if p.startswith(prefix) and p != prefix and "/" not in p[len(prefix):]),
+                          key=lambda pair: pair[0])
+
+    def create_folder(self, path: str):
+        with self._lock:
+            existing = self.resources.get(path)
+            if existing is not None:
+                if existing["type"] == "dir":
+                    raise FakeDiskError(409, "DiskPathPointsToExistentDirectoryError",
+                                        f"Specified path \"{path}\" points to existent directory.")
+                raise FakeDiskError(409, "DiskPathPointsToFileError",
+                                    f"Specified path \"{path}\" points to file.")
+            self._check_parent(path)
+            self.resources[path] = self._entry("dir")
+            self._touch_parent(path)
+
+    def put_file(self, path: str, data: bytes):
+        with self._lock:
+            self._check_parent(path)
+            self.resources[path] = self._entry("file", data)
+            self._touch_parent(path)
+
+    def check_upload(self, path: str, overwrite: bool):
+        with self._lock:
+            existing = self.resources.get(path)
+            if existing is not None and (existing["type"] == "dir" or not overwrite):
+                raise FakeDiskError(409, "DiskResourceAlreadyExistsError",
+                                    f"Resource \"{path}\" already exists.")
+            self._check_parent(path)
+
+    def get(self, path: str) -> dict:
+        with self._lock:
+            entry = self.resources.get(path)
+            if entry is None:
+                raise FakeDiskError(404, "DiskNotFoundError", "Resource not found.")
+            return entry
+
+    def delete(self, path: str, operation_polls: int) -> Optional[str]:
+        """Remove subtree; returns operation id when the folder was not empty"""
+        if path == "/":
+            raise FakeDiskError(400, "FieldValidationError", "Can not delete disk root.")
+        with self._lock:
+            entry = self.resources.get(path)
+            if entry is None:
+                raise FakeDiskError(404, "DiskNotFoundError", "Resource not found.")
+            prefix = path + "/"
+            subtree = [p for p in self.resources if p.startswith(prefix)]
+            for stale in subtree + [path]:
+                del self.resources[stale]
+            self.revision = next(self._revision)
+            self._touch_parent(path)
+            if not subtree:
+                return None
+            operation = hashlib.md5(f"{path}:{self.revision}".encode()).hexdigest()
+            self.operations[operation] = operation_polls
+            return operation
+
+    def operation_status(self, operation: str) -> str:
+        with self._lock:
+            if operation not in self.operations:
+                raise FakeDiskError(404, "DiskNotFoundError", "Operation not found.")
+            if self.operations[operation] > 0:
+                self.operations[operation] -= 1
+                return "in-progress"
+            return "success"
+
+    def files(self) -> List[Tuple[str, dict]]:
+        with self._lock:
+            return sorted(((p, entry) for p, entry in self.resources.items() if entry["type"] == "file"),
+                          key=lambda pair: pair[0])
+
+    def describe(self, path: str, entry: dict) -> dict:
+        """Resource JSON as returned by the API"""
+        data = {
+            "path": f"disk:{path}",
+            "name": path.rpartition("/")[2] or "disk",
+            "type": entry["type"],
+            "created": entry["created"],
+            "modified": entry["modified"],
+            "revision": entry["revision"],
+            "resource_id": f"0:{hashlib.md5(path.encode('utf-8')).hexdigest()}",
+        }
+        if entry["type"] == "file":
+            data.update(size=len(entry["data"]), md5=entry["md5"], mime_type="application/octet-stream")
+        return data
+
+
+def _project(item: dict, fields: Optional[str], prefix: str) -> dict:
+    """Apply `fields` projection like items.path,items.type"""
+    if not fields:
+        return item
+    names = [field[len(prefix):] for field in fields.split(",") if field.startswith(prefix)]
+    return {name: item[name] for name in names if name in item} if names else item
+
+
+class FakeYandexDiskHandler(BaseHTTPRequestHandler):
+    """Routes REST API calls to the server's FakeDisk"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _json(self, status_code: int, payload: Optional[dict], headers: Optional[dict] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+        self.send_response(status_code)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, error: FakeDiskError, headers: Optional[dict] = None):
+        self._json(error.status_code, {"message": error.message, "description": error.message,
+                                       "error": error.error}, headers)
+
+    def _read_body(self) -> bytes:
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().split(b";")[0], 16)
+                if not size:
+                    self.rfile.readline()
+                    return b"".join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _handle(self, method: str):
+        server: FakeYandexDiskServer = self.server
+        url = urlsplit(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query, keep_blank_values=True).items()}
+        server.record(method, url.path)
+        server.sleep()
+        body = self._read_body() if method == "PUT" else b""
+
+        failure = server.next_failure(method, url.path)
+        if failure is not None:
+            if failure.disconnect:
+                self.close_connection = True
+                return
+            headers = {"Retry-After": f"{failure.retry_after:g}"} if failure.retry_after is not None else None
+            self._error(FakeDiskError(failure.status_code, failure.error or f"HTTP{failure.status_code}"), headers)
+            return
+
+        try:
+            if url.path.startswith(API_PREFIX):
+                if not server.authorized(self.headers.get("Authorization", "")):
+                    raise FakeDiskError(401, "UnauthorizedError", "Unauthorized")
+                self._api(method, url.path[len(API_PREFIX):], query)
+            elif url.path.startswith("/upload-target/") and method == "PUT":
+                server.disk.put_file(normalize_path(unquote(url.path[len("/upload-target"):])), body)
+                self._json(201, None)
+            elif url.path.startswith("/download-target/") and method == "GET":
+                self._download(normalize_path(unquote(url.path[len("/download-target"):])))
+            else:
+                raise FakeDiskError(404, "NotFoundError", "Not found.")
+        except FakeDiskError as error:
+            self._error(error)
+
+    def _api(self, method: str, route: str, query: dict):
+        server: FakeYandexDiskServer = self.server
+        disk = server.disk
+        host = f"http://{self.headers.get('Host') or '127.0.0.1:%d' % server.server_address[1]}"
+        if route == "/resources" and method == "PUT":
+            path = normalize_path(query.get("path"))
+            disk.create_folder(path)
+            self._json(201, {"href": f"{host}{API_PREFIX}/resources?path={quote('disk:' + path)}",
+                             "method": "GET", "templated": False})
+        elif route == "/resources" and method == "GET":
+            self._resource(normalize_path(query.get("path")), query)
+        elif route == "/resources" and method == "DELETE":
+            operation = disk.delete(normalize_path(query.get("path")), server.operation_polls)
+            if operation is None:
+                self._json(204, None)
+            else:
+                self._json(202, {"href": f"{host}{API_PREFIX}/operations/{operation}",
+                                 "method": "GET", "templated": False})
+        elif route == "/resources/files" and method == "GET":
+            self._files(query)
+        elif route == "/resources/upload" and method == "GET":
+            path = normalize_path(query.get("path"))
+            disk.check_upload(path, query.get("overwrite", "false").lower() == "true")
+            self._json(200, {"href": f"{host}/upload-target{quote(path)}", "method": "PUT", "templated": False})
+        elif route == "/resources/download" and method == "GET":
+            path = normalize_path(query.get("path"))
+            if disk.get(path)["type"] != "file":
+                raise FakeDiskError(404, "DiskNotFoundError", "Resource not found.")
+            self._json(200, {"href": f"{host}/download-target{quote(path)}", "method": "GET", "templated": False})
+        elif route.startswith("/operations/") and method == "GET":
+            self._json(200, {"status": disk.operation_status(route[len("/operations/"):])})
+        else:
+            raise FakeDiskError(405, "MethodNotAllowedError", "Method not allowed.")
+
+    def _not_modified(self, etag: str) -> bool:
+        if self.headers.get("If-None-Match") != etag:
+            return False
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+        return True
+
+    def _resource(self, path: str, query: dict):
+        disk = self.server.disk
+        entry = disk.get(path)
+        etag = f'"{entry["revision"]}"'
+        if self._not_modified(etag):
+            return
+        payload = disk.describe(path, entry)
+        if entry["type"] == "dir":
+            limit, offset = int(query.get("limit", 20)), int(query.get("offset", 0))
+            children = disk.children(path)
+            items = [_project(disk.describe(child, child_entry), query.get("fields"), "_embedded.items.")
+                     for child, child_entry in children[offset:offset + limit]]
+            payload["_embedded"] = {"items": items, "path": f"disk:{path}", "limit": limit,
+                                    "offset": offset, "total": len(children)}
+        self._json(200, payload, {"ETag": etag})
+
+    def _files(self, query: dict):
+        disk = self.server.disk
+        etag = f'"{disk.revision}"'
+        if self._not_modified(etag):
+            return
+        limit, offset = int(query.get("limit", 20)), int(query.get("offset", 0))
+        items = [_project(disk.describe(path, entry), query.get("fields"), "items.")
+                 for path, entry in disk.files()[offset:offset + limit]]
+        self._json(200, {"items": items, "limit": limit, "offset": offset}, {"ETag": etag})
+
+    def _download(self, path: str):
+        entry = self.server.disk.get(path)
+        data = entry["data"]
+        offset = 0
+        etag = f'"{entry["md5"]}"'
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (if_range is None or if_range == etag):
+            offset = int(range_header[len("bytes="):].split("-")[0])
+            if offset >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {offset}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(data) - offset))
+        self.end_headers()
+        self.wfile.write(data[offset:])
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeYandexDiskServer(ThreadingHTTPServer):
+    """Fake Yandex.Disk REST API on a local port
+
+    `tokens` limits accepted OAuth tokens (None accepts any non-empty one).
+    `latency` delays every request by fixed seconds or a uniform (low, high)
+    range; `failure_rate` answers that share of requests with 503, and
+    `rate_limit` answers requests above that many per second with 429 and
+    Retry-After. Random choices come from `seed` so runs are repeatable.
+    Non-empty folders are deleted asynchronously: their operation reports
+    "in-progress" for `operation_polls` polls before "success".
+
+        with FakeYandexDiskServer(tokens=["secret"]) as server:
+            client = YandexDiskAPIClient("secret", base_url=server.base_url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, tokens: Optional[Iterable[str]] = None,
+                 latency: Union[float, Tuple[float, float]] = 0.0, failure_rate: float = 0.0,
+                 rate_limit: Optional[float] = None, operation_polls: int = 0, seed: Optional[int] = 0):
+        super().__init__((host, port), FakeYandexDiskHandler)
+        self.disk = FakeDisk()
+        self.tokens = set(tokens) if tokens is not None else None
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.rate_limit = rate_limit
+        self.operation_polls = operation_polls
+        self.requests: List[Tuple[str, str]] = []
+        self._failures: List[InjectedFailure] = []
+        self._random = random.Random(seed)
+        self._window = (0, 0)  # (second, requests seen in it)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.server_address[1]}{API_PREFIX}/resources"
+
+    def start(self) -> "FakeYandexDiskServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-yandex-disk", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self) -> "FakeYandexDiskServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def inject(self, status_code: int, error: Optional[str] = None, count: int = 1, method: Optional[str] = None,
+               path_prefix: Optional[str] = None, retry_after: Optional[float] = None, disconnect: bool = False):
+        """Answer next `count` matching requests with an error (or drop the connection)"""
+        with self._lock:
+            self._failures.append(InjectedFailure(status_code, error, count, method, path_prefix,
+                                                  retry_after, disconnect))
+
+    def reset(self):
+        """Forget disk contents, recorded requests and pending failures"""
+        with self._lock:
+            self.disk = FakeDisk()
+            self.requests.clear()
+            self._failures.clear()
+
+    def record(self, method: str, path: str):
+        with self._lock:
+            self.requests.append((method, path))
+
+    def authorized(self, header: str) -> bool:
+        scheme, _, token = header.partition(" ")
+        if scheme != "OAuth" or not token:
+            return False
+        return self.tokens is None or token in self.tokens
+
+    def sleep(self):
+        with self._lock:
+            latency = self.latency
+            if isinstance(latency, tuple):
+                latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+
+    def next_failure(self, method: str, path: str) -> Optional[InjectedFailure]:
+        with self._lock:
+            for failure in self._failures:
+                if failure.matches(method, path):
+                    failure.count -= 1
+                    if not failure.count:
+                        self._failures.remove(failure)
+                    return failure
+            if self.rate_limit is not None:
+                second = int(time.monotonic())
+                seen = self._window[1] + 1 if self._window[0] == second else 1
+                self._window = (second, seen)
+                if seen > self.rate_limit:
+                    return InjectedFailure(429, "TooManyRequestsError", 1, None, None, 1.0, False)
+            if self.failure_rate and self._random.random() < self.failure_rate:
+                return InjectedFailure(503, "ServiceUnavailableError", 1, None, None, None, False)
+        return None
+
+
+if __name__ == '__main__':
+    with FakeYandexDiskServer(port=8765) as fake:
+        print(f"Fake Yandex.Disk API at {fake.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass